@@ -1,1594 +1,6408 @@
-import re
-import os
-import json
-import csv
-import smtplib
-import threading
-import time
-import gc
-from datetime import datetime
-from collections import defaultdict
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from tkinter import ttk, filedialog, messagebox, simpledialog, scrolledtext
-from tkinter import *
-from threading import Lock, Thread
-from ttkbootstrap import Style
-import pandas as pd
-from tkinter.colorchooser import askcolor
-from tkinter import font as tkfont
-
-class QuantumEmailSuite:
-    def __init__(self, root):
-        self.root = root
-        self.style = Style(theme='cyborg')
-        self.root.title("Quantum Email Suite Pro")
-        self.root.geometry("1400x900")
-        self.root.minsize(1200, 800)  # Minimum window size
-        
-        # Configure grid for main window
-        self.root.grid_rowconfigure(1, weight=1)
-        self.root.grid_columnconfigure(0, weight=1)
-        
-        # Header
-        self.header = ttk.Label(
-            root, 
-            text="QUANTUM EMAIL SUITE PRO", 
-            font=('Arial', 16, 'bold'),
-            foreground='#00ff99',
-            background='#1a1a1a')
-        self.header.grid(row=0, column=0, sticky='ew', pady=(0, 5))
-        
-        # Border
-        self.style.configure('Border.TFrame', background='#00ff99')
-        border = ttk.Frame(root, height=2, style='Border.TFrame')
-        border.grid(row=1, column=0, sticky='ew', pady=(0, 5))
-        
-        # Create main notebook
-        self.notebook = ttk.Notebook(root)
-        self.notebook.grid(row=2, column=0, sticky='nsew', padx=10, pady=(0, 5))
-        
-        # Initialize modules
-        self.email_cleaner = EmailCleanerModule(self)
-        self.email_editor = EmailEditorModule(self)
-        self.email_sender = EmailSenderModule(self)
-        
-        # Add modules as tabs
-        self.notebook.add(self.email_cleaner.frame, text="Email Cleaner")
-        self.notebook.add(self.email_editor.frame, text="Email Editor")
-        self.notebook.add(self.email_sender.frame, text="Email Sender")
-        
-        # Status bar
-        self.status_var = StringVar()
-        self.status_bar = ttk.Label(
-            root, 
-            textvariable=self.status_var, 
-            relief='sunken',
-            background='#1a1a1a',
-            foreground='#00ff99',
-            font=('Helvetica', 9))
-        self.status_bar.grid(row=3, column=0, sticky='ew')
-
-    def update_status(self, message):
-        self.status_var.set(message)
-        self.root.update()
-
-    def on_closing(self):
-        """Handle application closing"""
-        if hasattr(self, 'email_sender'):
-            self.email_sender.save_config()
-        self.root.destroy()
-
-
-class EmailCleanerModule:
-    def __init__(self, parent):
-        self.parent = parent
-        self.frame = ttk.Frame(parent.notebook)
-        
-        # Configuration
-        self.MAX_DISPLAY_ITEMS = 1000
-        self.MAX_EMAILS_IN_MEMORY = 1000000
-        self.FILE_CHUNK_SIZE = 50000
-        
-        # Data storage
-        self.loaded_files = []
-        self.email_db = defaultdict(list)
-        self.clean_emails = set()
-        self.lock = Lock()
-        self.processing = False
-        
-        # Create UI
-        self.create_ui()
-    
-    def create_ui(self):
-        # Configure grid for resizing
-        self.frame.grid_rowconfigure(3, weight=1)
-        self.frame.grid_columnconfigure(0, weight=1)
-        
-        # File Loading Section
-        load_frame = ttk.LabelFrame(self.frame, text="File Loading", padding=10)
-        load_frame.grid(row=0, column=0, sticky='ew', pady=5)
-        load_frame.grid_columnconfigure(0, weight=1)
-        
-        # File list with scrollbar
-        file_list_container = ttk.Frame(load_frame)
-        file_list_container.grid(row=0, column=0, sticky='nsew', pady=5)
-        file_list_container.grid_columnconfigure(0, weight=1)
-        
-        self.file_listbox = Listbox(file_list_container, height=8, selectmode=EXTENDED)
-        self.file_listbox.grid(row=0, column=0, sticky='nsew')
-        
-        scrollbar = ttk.Scrollbar(file_list_container, orient='vertical', command=self.file_listbox.yview)
-        scrollbar.grid(row=0, column=1, sticky='ns')
-        self.file_listbox.config(yscrollcommand=scrollbar.set)
-        
-        # Load buttons
-        btn_frame = ttk.Frame(load_frame)
-        btn_frame.grid(row=1, column=0, sticky='ew')
-        
-        self.add_btn = ttk.Button(btn_frame, text="Add Files", command=self.add_files)
-        self.add_btn.pack(side='left', padx=5)
-        
-        self.remove_btn = ttk.Button(btn_frame, text="Remove Selected", command=self.remove_selected_files)
-        self.remove_btn.pack(side='left', padx=5)
-        
-        self.clear_btn = ttk.Button(btn_frame, text="Clear All", command=self.clear_files)
-        self.clear_btn.pack(side='left', padx=5)
-        
-        self.load_btn = ttk.Button(btn_frame, text="Load Emails", command=self.load_emails_thread)
-        self.load_btn.pack(side='right', padx=5)
-
-        # Processing Section
-        process_frame = ttk.LabelFrame(self.frame, text="Email Processing", padding=10)
-        process_frame.grid(row=1, column=0, sticky='ew', pady=5)
-        process_frame.grid_columnconfigure(0, weight=1)
-
-        # Stats display
-        stats_frame = ttk.Frame(process_frame)
-        stats_frame.grid(row=0, column=0, sticky='ew', pady=5)
-        
-        # Create stats labels
-        self.total_files_var = StringVar(value="0")
-        self.total_emails_var = StringVar(value="0")
-        self.unique_emails_var = StringVar(value="0")
-        self.valid_emails_var = StringVar(value="0")
-        
-        stats_labels = [
-            ("Total Files:", self.total_files_var),
-            ("Total Emails:", self.total_emails_var),
-            ("Unique Emails:", self.unique_emails_var),
-            ("Valid Emails:", self.valid_emails_var)
-        ]
-        
-        for i, (text, var) in enumerate(stats_labels):
-            ttk.Label(stats_frame, text=text).grid(row=0, column=i*2, sticky='e', padx=5)
-            ttk.Label(stats_frame, textvariable=var).grid(row=0, column=i*2+1, sticky='w', padx=5)
-
-        # Action buttons
-        action_frame = ttk.Frame(process_frame)
-        action_frame.grid(row=1, column=0, sticky='ew', pady=5)
-        
-        buttons = [
-            ("Remove Duplicates", self.remove_duplicates),
-            ("Remove Invalid", self.remove_invalid),
-            ("Clean All", self.clean_all),
-            ("Export Clean List", self.export_clean_list)
-        ]
-        
-        for i, (text, command) in enumerate(buttons):
-            if i < len(buttons) - 1:
-                ttk.Button(action_frame, text=text, command=command).pack(side='left', padx=5)
-            else:
-                ttk.Button(action_frame, text=text, command=command).pack(side='right', padx=5)
-
-        # Results Display
-        results_frame = ttk.LabelFrame(self.frame, text="Email Results", padding=10)
-        results_frame.grid(row=2, column=0, sticky='nsew', pady=5)
-        results_frame.grid_rowconfigure(0, weight=1)
-        results_frame.grid_columnconfigure(0, weight=1)
-
-        # Treeview with scrollbars
-        self.tree = ttk.Treeview(results_frame, columns=("email", "status", "sources"), show="headings")
-        self.tree.heading("email", text="Email")
-        self.tree.heading("status", text="Status")
-        self.tree.heading("sources", text="Source Files")
-        self.tree.column("email", width=300, stretch=True)
-        self.tree.column("status", width=100, stretch=False)
-        self.tree.column("sources", width=400, stretch=True)
-        
-        yscroll = ttk.Scrollbar(results_frame, orient="vertical", command=self.tree.yview)
-        xscroll = ttk.Scrollbar(results_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
-        
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        yscroll.grid(row=0, column=1, sticky="ns")
-        xscroll.grid(row=1, column=0, sticky="ew")
-
-        # Progress bar
-        self.progress = ttk.Progressbar(self.frame, mode="determinate")
-        self.progress.grid(row=3, column=0, sticky='ew', padx=10, pady=5)
-
-    def add_files(self):
-        filetypes = [
-            ("Text files", "*.txt"),
-            ("CSV files", "*.csv"),
-            ("Excel files", "*.xls *.xlsx *.ods"),
-            ("All files", "*.*")
-        ]
-        files = filedialog.askopenfilenames(filetypes=filetypes)
-        if files:
-            for file in files:
-                if file not in self.loaded_files:
-                    self.loaded_files.append(file)
-                    self.file_listbox.insert(END, file)
-            self.update_stats()
-
-    def remove_selected_files(self):
-        selected = self.file_listbox.curselection()
-        for i in reversed(selected):
-            self.loaded_files.pop(i)
-            self.file_listbox.delete(i)
-        self.update_stats()
-
-    def clear_files(self):
-        self.loaded_files = []
-        self.file_listbox.delete(0, END)
-        self.email_db.clear()
-        self.clean_emails.clear()
-        self.update_stats()
-        self.update_display()
-        self.parent.update_status("Cleared all files and data")
-
-    def update_stats(self):
-        self.total_files_var.set(str(len(self.loaded_files)))
-        self.total_emails_var.set(str(sum(len(sources) for sources in self.email_db.values())))
-        self.unique_emails_var.set(str(len(self.email_db)))
-        valid_count = sum(1 for email in self.email_db if self.is_valid_email(email))
-        self.valid_emails_var.set(str(valid_count))
-
-    def update_display(self):
-        self.tree.delete(*self.tree.get_children())
-        count = 0
-        for email, sources in list(self.email_db.items())[:self.MAX_DISPLAY_ITEMS]:
-            status = "Valid" if self.is_valid_email(email) else "Invalid"
-            self.tree.insert("", "end", values=(email, status, ", ".join(sources)))
-            count += 1
-        if len(self.email_db) > self.MAX_DISPLAY_ITEMS:
-            self.tree.insert("", "end", values=(f"... showing {self.MAX_DISPLAY_ITEMS} of {len(self.email_db)} emails", "", ""))
-
-    def is_valid_email(self, email):
-        """Basic email validation"""
-        regex = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        return re.fullmatch(regex, email) is not None
-
-    def load_emails_thread(self):
-        if not self.loaded_files:
-            messagebox.showwarning("No Files", "Please add files first")
-            return
-        
-        if self.processing:
-            messagebox.showwarning("Processing", "Already processing files")
-            return
-            
-        self.processing = True
-        self.parent.update_status("Loading emails...")
-        self.progress["value"] = 0
-        self.load_btn.config(state=DISABLED)
-        
-        # Start processing in a separate thread
-        Thread(target=self.load_emails, daemon=True).start()
-
-    def load_emails(self):
-        try:
-            total_files = len(self.loaded_files)
-            email_count = 0
-            
-            for i, filepath in enumerate(self.loaded_files):
-                if not self.processing:  # Check if stopped
-                    break
-                    
-                self.parent.update_status(f"Processing file {i+1}/{total_files}: {os.path.basename(filepath)}")
-                self.progress["value"] = (i / total_files) * 100
-                self.parent.root.update()
-                
-                try:
-                    if filepath.endswith('.csv'):
-                        # Process CSV in chunks
-                        for chunk in pd.read_csv(filepath, chunksize=self.FILE_CHUNK_SIZE, dtype=str, engine='c'):
-                            for col in chunk.columns:
-                                for item in chunk[col].dropna():
-                                    if isinstance(item, str):
-                                        for email in self.extract_emails(item):
-                                            with self.lock:
-                                                if email not in self.email_db:
-                                                    self.email_db[email] = []
-                                                if filepath not in self.email_db[email]:
-                                                    self.email_db[email].append(filepath)
-                                            email_count += 1
-                            del chunk
-                            gc.collect()
-                            
-                    elif filepath.endswith(('.xls', '.xlsx', '.ods')):
-                        # Process Excel file
-                        xl = pd.ExcelFile(filepath)
-                        for sheet in xl.sheet_names:
-                            df = xl.parse(sheet, dtype=str)
-                            for col in df.columns:
-                                for item in df[col].dropna():
-                                    if isinstance(item, str):
-                                        for email in self.extract_emails(item):
-                                            with self.lock:
-                                                if email not in self.email_db:
-                                                    self.email_db[email] = []
-                                                if filepath not in self.email_db[email]:
-                                                    self.email_db[email].append(filepath)
-                                            email_count += 1
-                            del df
-                            gc.collect()
-                        xl.close()
-                        
-                    else:  # Text file
-                        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                            buffer = ""
-                            while True:
-                                chunk = f.read(self.FILE_CHUNK_SIZE)
-                                if not chunk:
-                                    break
-                                buffer += chunk
-                                lines = buffer.split('\n')
-                                buffer = lines.pop()  # Save incomplete line
-                                
-                                for line in lines:
-                                    for email in self.extract_emails(line):
-                                        with self.lock:
-                                            if email not in self.email_db:
-                                                self.email_db[email] = []
-                                            if filepath not in self.email_db[email]:
-                                                self.email_db[email].append(filepath)
-                                        email_count += 1
-                                
-                                if email_count >= self.MAX_EMAILS_IN_MEMORY:
-                                    self.parent.update_status(f"Memory limit reached ({self.MAX_EMAILS_IN_MEMORY} emails)")
-                                    break
-                                
-                            if buffer:  # Process remaining content
-                                for email in self.extract_emails(buffer):
-                                    with self.lock:
-                                        if email not in self.email_db:
-                                            self.email_db[email] = []
-                                        if filepath not in self.email_db[email]:
-                                            self.email_db[email].append(filepath)
-                                    email_count += 1
-                                    
-                except Exception as e:
-                    self.parent.update_status(f"Error processing {filepath}: {str(e)}")
-                    continue
-                    
-                if email_count >= self.MAX_EMAILS_IN_MEMORY:
-                    break
-                    
-            self.parent.update_status(f"Loaded {email_count} emails from {min(i+1, total_files)} files")
-            
-        except Exception as e:
-            self.parent.update_status(f"Error: {str(e)}")
-        finally:
-            self.processing = False
-            self.load_btn.config(state=NORMAL)
-            self.progress["value"] = 100
-            self.update_stats()
-            self.update_display()
-            gc.collect()
-
-    def extract_emails(self, text):
-        """Extract unique emails from text"""
-        emails = set()
-        regex = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        for match in re.finditer(regex, text):
-            email = match.group(0).lower().strip()
-            if email:
-                emails.add(email)
-        return emails
-
-    def remove_duplicates(self):
-        """Keep only one copy of each email"""
-        if not self.email_db:
-            messagebox.showwarning("No Data", "No emails to process")
-            return
-            
-        self.parent.update_status("Removing duplicates...")
-        self.parent.root.update()
-        
-        # Already unique in our database structure
-        self.parent.update_status(f"Found {len(self.email_db)} unique emails")
-        self.update_stats()
-        self.update_display()
-
-    def remove_invalid(self):
-        """Remove emails with invalid syntax"""
-        if not self.email_db:
-            messagebox.showwarning("No Data", "No emails to process")
-            return
-            
-        self.parent.update_status("Removing invalid emails...")
-        self.parent.root.update()
-        
-        initial_count = len(self.email_db)
-        invalid_emails = [email for email in self.email_db if not self.is_valid_email(email)]
-        
-        for email in invalid_emails:
-            del self.email_db[email]
-            
-        removed = initial_count - len(self.email_db)
-        self.parent.update_status(f"Removed {removed} invalid emails, kept {len(self.email_db)} valid ones")
-        self.update_stats()
-        self.update_display()
-
-    def clean_all(self):
-        """Remove duplicates and invalid emails in one step"""
-        self.remove_duplicates()
-        self.remove_invalid()
-
-    def export_clean_list(self):
-        if not self.email_db:
-            messagebox.showwarning("No Data", "No emails to export")
-            return
-            
-        filetypes = [
-            ("CSV files", "*.csv"),
-            ("Text files", "*.txt"),
-            ("All files", "*.*")
-        ]
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=filetypes,
-            title="Save Clean Email List"
-        )
-        
-        if not filename:
-            return
-            
-        try:
-            self.parent.update_status("Exporting clean email list...")
-            self.progress["value"] = 0
-            self.parent.root.update()
-            
-            valid_emails = [email for email in self.email_db if self.is_valid_email(email)]
-            total = len(valid_emails)
-            
-            if filename.endswith('.csv'):
-                with open(filename, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['email'])  # header
-                    
-                    # Write in chunks to handle large files
-                    chunk_size = 10000
-                    for i in range(0, total, chunk_size):
-                        chunk = valid_emails[i:i+chunk_size]
-                        writer.writerows([[email] for email in chunk])
-                        self.progress["value"] = (i / total) * 100
-                        self.parent.root.update()
-                        
-            else:  # Text file
-                with open(filename, 'w', encoding='utf-8') as f:
-                    # Write in chunks
-                    chunk_size = 10000
-                    for i in range(0, total, chunk_size):
-                        chunk = valid_emails[i:i+chunk_size]
-                        f.write('\n'.join(chunk) + '\n')
-                        self.progress["value"] = (i / total) * 100
-                        self.parent.root.update()
-                        
-            self.parent.update_status(f"Exported {total} clean emails to {filename}")
-            self.progress["value"] = 100
-            
-        except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export: {str(e)}")
-            self.parent.update_status("Export failed")
-        finally:
-            gc.collect()
-
-class EmailEditorModule:
-    def __init__(self, parent):
-        self.parent = parent
-        self.frame = ttk.Frame(parent.notebook)
-        
-        # Configure grid for resizing
-        self.frame.grid_rowconfigure(1, weight=1)
-        self.frame.grid_columnconfigure(0, weight=1)
-        
-        # Current font settings
-        self.current_font_family = 'Arial'
-        self.current_font_size = 12
-        self.current_font_weight = 'normal'
-        self.current_font_slant = 'roman'
-        self.current_font_underline = False
-        self.current_font_color = '#000000'
-        self.current_bg_color = '#ffffff'
-        self.current_align = 'left'
-        
-        # Create advanced editor UI
-        self.create_advanced_editor_ui()
-    
-    def create_advanced_editor_ui(self):
-        # Main container with grid configuration
-        main_container = ttk.Frame(self.frame)
-        main_container.pack(fill='both', expand=True, padx=5, pady=5)
-        main_container.grid_rowconfigure(1, weight=1)
-        main_container.grid_columnconfigure(0, weight=1)
-        
-        # Toolbar Frame - Ribbon Style
-        toolbar_frame = ttk.Frame(main_container)  # Correct variable name
-        toolbar_frame.grid(row=0, column=0, sticky='ew', pady=(0, 5))
-
-        # Create ribbon tabs - FIXED THE TYPO HERE (tooler_frame -> toolbar_frame)
-        ribbon_notebook = ttk.Notebook(toolbar_frame)  # This is the corrected line
-        ribbon_notebook.pack(fill='x', expand=True)
-
-        # Home Tab
-        home_tab = ttk.Frame(ribbon_notebook)
-        ribbon_notebook.add(home_tab, text="Home")
-        
-        # Clipboard group
-        clipboard_group = ttk.LabelFrame(home_tab, text="Clipboard", padding=5)
-        clipboard_group.pack(side='left', fill='y', padx=5)
-        
-        ttk.Button(clipboard_group, text="Paste", command=lambda: self.editor.event_generate('<<Paste>>')).pack(side='left', padx=2)
-        ttk.Button(clipboard_group, text="Copy", command=lambda: self.editor.event_generate('<<Copy>>')).pack(side='left', padx=2)
-        ttk.Button(clipboard_group, text="Cut", command=lambda: self.editor.event_generate('<<Cut>>')).pack(side='left', padx=2)
-        
-        # Font group
-        font_group = ttk.LabelFrame(home_tab, text="Font", padding=5)
-        font_group.pack(side='left', fill='y', padx=5)
-        
-        # Font family
-        font_families = sorted(tkfont.families())
-        self.font_family = ttk.Combobox(font_group, values=font_families, width=15)
-        self.font_family.set('Arial')
-        self.font_family.bind('<<ComboboxSelected>>', self.change_font_family)
-        self.font_family.pack(side='left', padx=2)
-        
-        # Font size
-        self.font_size = ttk.Combobox(font_group, values=[8, 9, 10, 11, 12, 14, 16, 18, 20, 22, 24, 26, 28, 36, 48, 72], width=3)
-        self.font_size.set('12')
-        self.font_size.bind('<<ComboboxSelected>>', self.change_font_size)
-        self.font_size.pack(side='left', padx=2)
-        
-        # Font style buttons
-        style_btn_frame = ttk.Frame(font_group)
-        style_btn_frame.pack(side='left', padx=5)
-        
-        self.bold_btn = ttk.Button(style_btn_frame, text="B", width=2, command=self.toggle_bold)
-        self.bold_btn.pack(side='left', padx=1)
-        
-        self.italic_btn = ttk.Button(style_btn_frame, text="I", width=2, command=self.toggle_italic)
-        self.italic_btn.pack(side='left', padx=1)
-        
-        self.underline_btn = ttk.Button(style_btn_frame, text="U", width=2, command=self.toggle_underline)
-        self.underline_btn.pack(side='left', padx=1)
-        
-        # Font color
-        self.color_btn = ttk.Button(font_group, text="Color", command=self.choose_font_color)
-        self.color_btn.pack(side='left', padx=2)
-        
-        # Background color
-        self.bg_color_btn = ttk.Button(font_group, text="BG Color", command=self.choose_bg_color)
-        self.bg_color_btn.pack(side='left', padx=2)
-        
-        # Paragraph group
-        paragraph_group = ttk.LabelFrame(home_tab, text="Paragraph", padding=5)
-        paragraph_group.pack(side='left', fill='y', padx=5)
-        
-        self.align_left_btn = ttk.Button(paragraph_group, text="Left", command=lambda: self.set_alignment('left'))
-        self.align_left_btn.pack(side='left', padx=1)
-        
-        self.align_center_btn = ttk.Button(paragraph_group, text="Center", command=lambda: self.set_alignment('center'))
-        self.align_center_btn.pack(side='left', padx=1)
-        
-        self.align_right_btn = ttk.Button(paragraph_group, text="Right", command=lambda: self.set_alignment('right'))
-        self.align_right_btn.pack(side='left', padx=1)
-        
-        # Lists
-        self.bullet_list_btn = ttk.Button(paragraph_group, text="• List", command=self.insert_bullet)
-        self.bullet_list_btn.pack(side='left', padx=1)
-        
-        # Insert Tab
-        insert_tab = ttk.Frame(ribbon_notebook)
-        ribbon_notebook.add(insert_tab, text="Insert")
-        
-        # Insert group
-        insert_group = ttk.LabelFrame(insert_tab, text="Insert", padding=5)
-        insert_group.pack(side='left', fill='y', padx=5)
-        
-        ttk.Button(insert_group, text="Image", command=self.insert_image).pack(side='left', padx=2)
-        ttk.Button(insert_group, text="Hyperlink", command=self.insert_hyperlink).pack(side='left', padx=2)
-        ttk.Button(insert_group, text="Table", command=self.insert_table).pack(side='left', padx=2)
-        
-        # Text editor with scrollbars
-        editor_frame = ttk.Frame(main_container)
-        editor_frame.grid(row=1, column=0, sticky='nsew')
-        editor_frame.grid_rowconfigure(0, weight=1)
-        editor_frame.grid_columnconfigure(0, weight=1)
-
-        self.editor = scrolledtext.ScrolledText(
-            editor_frame,
-            wrap='word',
-            font=('Arial', 12),
-            undo=True,
-            maxundo=-1,
-            autoseparators=True,
-            padx=10,
-            pady=10
-        )
-        self.editor.grid(row=0, column=0, sticky='nsew')
-        
-        # Configure tags for formatting
-        self.editor.tag_configure('bold', font=('Arial', 12, 'bold'))
-        self.editor.tag_configure('italic', font=('Arial', 12, 'italic'))
-        self.editor.tag_configure('underline', underline=True)
-        self.editor.tag_configure('center', justify='center')
-        self.editor.tag_configure('right', justify='right')
-        self.editor.tag_configure('left', justify='left')
-        
-        # Status bar
-        status_frame = ttk.Frame(main_container)
-        status_frame.grid(row=2, column=0, sticky='ew', pady=(5, 0))
-        
-        self.word_count_label = ttk.Label(status_frame, text="Words: 0")
-        self.word_count_label.pack(side='left', padx=5)
-        
-        self.char_count_label = ttk.Label(status_frame, text="Chars: 0")
-        self.char_count_label.pack(side='left', padx=5)
-        
-        # Export buttons
-        export_frame = ttk.Frame(main_container)
-        export_frame.grid(row=3, column=0, sticky='e', pady=5)
-        
-        ttk.Button(export_frame, text="Export as HTML", command=self.export_html).pack(side='left', padx=5)
-        ttk.Button(export_frame, text="Export as TXT", command=self.export_txt).pack(side='left', padx=5)
-    
-    def update_counts(self, event=None):
-        """Update word and character counts"""
-        content = self.editor.get('1.0', 'end-1c')
-        words = len(content.split())
-        chars = len(content)
-        self.word_count_label.config(text=f"Words: {words}")
-        self.char_count_label.config(text=f"Chars: {chars}")
-    
-    def update_font_display(self, event=None):
-        """Update font display based on current selection"""
-        try:
-            # Get current tags at the insertion cursor
-            tags = self.editor.tag_names("insert")
-            
-            # Update button states based on tags
-            self.bold_btn.state(['!pressed'] if 'bold' in tags else ['pressed'])
-            self.italic_btn.state(['!pressed'] if 'italic' in tags else ['pressed'])
-            self.underline_btn.state(['!pressed'] if 'underline' in tags else ['pressed'])
-            
-            # Update alignment buttons
-            if 'center' in tags:
-                self.current_align = 'center'
-                self.align_center_btn.state(['pressed'])
-                self.align_left_btn.state(['!pressed'])
-                self.align_right_btn.state(['!pressed'])
-            elif 'right' in tags:
-                self.current_align = 'right'
-                self.align_right_btn.state(['pressed'])
-                self.align_left_btn.state(['!pressed'])
-                self.align_center_btn.state(['!pressed'])
-            else:
-                self.current_align = 'left'
-                self.align_left_btn.state(['pressed'])
-                self.align_center_btn.state(['!pressed'])
-                self.align_right_btn.state(['!pressed'])
-                
-        except Exception as e:
-            print(f"Error updating font display: {e}")
-    
-    def change_font_family(self, event=None):
-        """Change font family for selection or new text"""
-        self.current_font_family = self.font_family.get()
-        self.apply_font()
-    
-    def change_font_size(self, event=None):
-        """Change font size for selection or new text"""
-        try:
-            self.current_font_size = int(self.font_size.get())
-            self.apply_font()
-        except ValueError:
-            pass
-    
-    def toggle_bold(self):
-        """Toggle bold style"""
-        self.current_font_weight = 'bold' if self.current_font_weight == 'normal' else 'normal'
-        self.apply_font()
-    
-    def toggle_italic(self):
-        """Toggle italic style"""
-        self.current_font_slant = 'italic' if self.current_font_slant == 'roman' else 'roman'
-        self.apply_font()
-    
-    def toggle_underline(self):
-        """Toggle underline style"""
-        self.current_font_underline = not self.current_font_underline
-        self.apply_font()
-    
-    def choose_font_color(self):
-        """Choose font color"""
-        color = askcolor(title="Select Font Color")
-        if color[1]:  # color[1] is the hex code
-            self.current_font_color = color[1]
-            self.apply_font()
-    
-    def choose_bg_color(self):
-        """Choose background color"""
-        color = askcolor(title="Select Background Color")
-        if color[1]:
-            self.current_bg_color = color[1]
-            self.apply_font()
-    
-    def set_alignment(self, align):
-        """Set text alignment"""
-        self.current_align = align
-        try:
-            # Remove all alignment tags from selection
-            for tag in ['left', 'center', 'right']:
-                self.editor.tag_remove(tag, "sel.first", "sel.last")
-            
-            # Apply new alignment tag
-            if self.current_align != 'left':  # left is default
-                self.editor.tag_add(self.current_align, "sel.first", "sel.last")
-        except:
-            pass
-    
-    def apply_font(self):
-        """Apply current font settings to selection"""
-        try:
-            # Create or update font configuration
-            font_config = (self.current_font_family, self.current_font_size, 
-                          self.current_font_weight, self.current_font_slant)
-            
-            # Create a unique tag name based on font settings
-            tag_name = f"font_{self.current_font_family}_{self.current_font_size}_{self.current_font_weight}_{self.current_font_slant}"
-            
-            # Configure the tag if it doesn't exist
-            if tag_name not in self.editor.tag_names():
-                self.editor.tag_configure(tag_name, 
-                                        font=font_config,
-                                        underline=self.current_font_underline,
-                                        foreground=self.current_font_color,
-                                        background=self.current_bg_color)
-            
-            # Apply the tag to the current selection
-            self.editor.tag_add(tag_name, "sel.first", "sel.last")
-            
-            # Update button states
-            self.update_font_display()
-            
-        except Exception as e:
-            print(f"Error applying font: {e}")
-    
-    def insert_bullet(self):
-        """Insert bullet point at current position"""
-        self.editor.insert('insert', '• ')
-    
-    def insert_image(self):
-        """Insert image placeholder"""
-        file_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.png *.jpg *.jpeg *.gif")])
-        if file_path:
-            self.editor.insert('insert', f'\n[Image: {os.path.basename(file_path)}]\n')
-    
-    def insert_hyperlink(self):
-        """Insert hyperlink"""
-        url = simpledialog.askstring("Insert Hyperlink", "Enter URL:")
-        if url:
-            text = simpledialog.askstring("Insert Hyperlink", "Enter display text:", initialvalue=url)
-            if text:
-                self.editor.insert('insert', f'<a href="{url}">{text}</a>')
-    
-    def insert_table(self):
-        """Insert table placeholder"""
-        rows = simpledialog.askinteger("Insert Table", "Number of rows:", minvalue=1, maxvalue=20)
-        cols = simpledialog.askinteger("Insert Table", "Number of columns:", minvalue=1, maxvalue=10)
-        
-        if rows and cols:
-            table = "\n" + "+-----" * cols + "+\n"
-            for _ in range(rows):
-                table += "|     " * cols + "|\n"
-                table += "+-----" * cols + "+\n"
-            self.editor.insert('insert', table)
-    
-    def export_html(self):
-        """Export content as HTML"""
-        text = self.editor.get('1.0', 'end-1c')
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".html",
-            filetypes=[("HTML Files", "*.html")]
-        )
-        if file_path:
-            try:
-                # Enhanced HTML conversion with basic styling
-                html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Exported Email</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; }}
-        .bold {{ font-weight: bold; }}
-        .italic {{ font-style: italic; }}
-        .underline {{ text-decoration: underline; }}
-        .center {{ text-align: center; }}
-        .right {{ text-align: right; }}
-    </style>
-</head>
-<body>
-{text}
-</body>
-</html>"""
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                messagebox.showinfo("Success", f"Exported to {file_path}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to export: {str(e)}")
-    
-    def export_txt(self):
-        """Export content as plain text"""
-        text = self.editor.get('1.0', 'end-1c')
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text Files", "*.txt")]
-        )
-        if file_path:
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(text)
-                messagebox.showinfo("Success", f"Exported to {file_path}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to export: {str(e)}")
-
-
-class EmailSenderModule:
-    def __init__(self, parent):
-        self.parent = parent
-        self.frame = ttk.Frame(parent.notebook)
-        
-        # Configure grid for resizing
-        self.frame.grid_rowconfigure(2, weight=1)
-        self.frame.grid_columnconfigure(0, weight=1)
-        
-        # Initialize variables
-        self.email_list = []
-        self.smtp_accounts = []
-        self.current_account_index = 0
-        self.email_counters = {}
-        self.sending_active = False
-        self.pause_sending = False
-        self.last_sent_times = {}
-        
-        # Load configuration
-        self.config_file = "quantum_email_config.json"
-        self.load_config()
-        
-        # Create UI with notebook for tabs
-        self.create_ui_with_tabs()
-    
-    def create_ui_with_tabs(self):
-        # Create notebook for tabs
-        self.module_notebook = ttk.Notebook(self.frame)
-        self.module_notebook.pack(fill='both', expand=True, padx=5, pady=5)
-        
-        # Create tabs
-        self.create_compose_tab()
-        self.create_smtp_tab()
-        self.create_status_tab()
-        
-        # Add tabs to notebook
-        self.module_notebook.add(self.compose_tab, text="Compose")
-        self.module_notebook.add(self.smtp_tab, text="SMTP Accounts")
-        self.module_notebook.add(self.status_tab, text="Sending Status")
-    
-    def create_compose_tab(self):
-        self.compose_tab = ttk.Frame(self.module_notebook)
-        
-        # Configure grid
-        self.compose_tab.grid_rowconfigure(1, weight=1)
-        self.compose_tab.grid_columnconfigure(0, weight=1)
-        
-        # Email List Section
-        email_list_frame = ttk.LabelFrame(self.compose_tab, text="Email List", padding=10)
-        email_list_frame.grid(row=0, column=0, sticky='ew', pady=5)
-        email_list_frame.grid_columnconfigure(0, weight=1)
-        
-        # Email List with scrollbar
-        list_container = ttk.Frame(email_list_frame)
-        list_container.grid(row=0, column=0, sticky='nsew')
-        list_container.grid_columnconfigure(0, weight=1)
-        
-        self.email_listbox = Listbox(list_container, height=8, selectmode=EXTENDED)
-        self.email_listbox.grid(row=0, column=0, sticky='nsew')
-        
-        scrollbar = ttk.Scrollbar(list_container, orient='vertical', command=self.email_listbox.yview)
-        scrollbar.grid(row=0, column=1, sticky='ns')
-        self.email_listbox.config(yscrollcommand=scrollbar.set)
-        
-        # Load button
-        ttk.Button(
-            email_list_frame, 
-            text="Load Email List (CSV)", 
-            command=self.load_email_list,
-            cursor="hand2"
-        ).grid(row=1, column=0, sticky='w', pady=5)
-        
-        # Email Content Section
-        content_frame = ttk.LabelFrame(self.compose_tab, text="Email Content", padding=10)
-        content_frame.grid(row=1, column=0, sticky='nsew', pady=5)
-        content_frame.grid_rowconfigure(1, weight=1)
-        content_frame.grid_columnconfigure(0, weight=1)
-        
-        # Subject Field
-        ttk.Label(content_frame, text="Subject:").grid(row=0, column=0, sticky='w', pady=2)
-        self.subject_entry = ttk.Entry(content_frame)
-        self.subject_entry.grid(row=0, column=1, sticky='ew', pady=2)
-        content_frame.grid_columnconfigure(1, weight=1)
-        
-        # Message Body with scrollbars
-        editor_frame = ttk.Frame(content_frame)
-        editor_frame.grid(row=1, column=0, columnspan=2, sticky='nsew', pady=5)
-        editor_frame.grid_rowconfigure(0, weight=1)
-        editor_frame.grid_columnconfigure(0, weight=1)
-        
-        self.message_text = scrolledtext.ScrolledText(
-            editor_frame, 
-            wrap='word', 
-            height=15,
-            font=('Arial', 11)
-        )
-        self.message_text.grid(row=0, column=0, sticky='nsew')
-        
-        # Control Buttons
-        btn_frame = ttk.Frame(self.compose_tab)
-        btn_frame.grid(row=2, column=0, sticky='e', pady=5)
-        
-        self.btn_start = ttk.Button(
-            btn_frame, 
-            text="Start Sending", 
-            command=self.start_sending,
-            style='success.TButton',
-            cursor="hand2"
-        )
-        self.btn_start.pack(side='left', padx=5)
-        
-        self.btn_pause = ttk.Button(
-            btn_frame, 
-            text="Pause", 
-            command=self.toggle_pause,
-            style='warning.TButton',
-            cursor="hand2",
-            state='disabled'
-        )
-        self.btn_pause.pack(side='left', padx=5)
-        
-        self.btn_stop = ttk.Button(
-            btn_frame, 
-            text="Stop", 
-            command=self.stop_sending,
-            style='danger.TButton',
-            cursor="hand2",
-            state='disabled'
-        )
-        self.btn_stop.pack(side='left', padx=5)
-    
-    def create_smtp_tab(self):
-        self.smtp_tab = ttk.Frame(self.module_notebook)
-        
-        # Configure grid
-        self.smtp_tab.grid_rowconfigure(1, weight=1)
-        self.smtp_tab.grid_columnconfigure(0, weight=1)
-        
-        # SMTP Accounts List
-        list_frame = ttk.LabelFrame(self.smtp_tab, text="SMTP Accounts", padding=10)
-        list_frame.grid(row=0, column=0, sticky='nsew', pady=5)
-        list_frame.grid_rowconfigure(0, weight=1)
-        list_frame.grid_columnconfigure(0, weight=1)
-        
-        # Listbox with scrollbar
-        list_container = ttk.Frame(list_frame)
-        list_container.grid(row=0, column=0, sticky='nsew')
-        list_container.grid_rowconfigure(0, weight=1)
-        list_container.grid_columnconfigure(0, weight=1)
-        
-        self.smtp_listbox = Listbox(list_container, height=10, selectmode=SINGLE)
-        self.smtp_listbox.grid(row=0, column=0, sticky='nsew')
-        
-        scrollbar = ttk.Scrollbar(list_container, orient='vertical', command=self.smtp_listbox.yview)
-        scrollbar.grid(row=0, column=1, sticky='ns')
-        self.smtp_listbox.config(yscrollcommand=scrollbar.set)
-        
-        # Account Management Buttons
-        btn_frame = ttk.Frame(list_frame)
-        btn_frame.grid(row=1, column=0, sticky='ew', pady=5)
-        
-        ttk.Button(
-            btn_frame, 
-            text="Add Account", 
-            command=self.add_smtp_account
-        ).pack(side='left', padx=2)
-        
-        ttk.Button(
-            btn_frame, 
-            text="Remove Account", 
-            command=self.remove_smtp_account
-        ).pack(side='left', padx=2)
-        
-        ttk.Button(
-            btn_frame, 
-            text="Edit Account", 
-            command=self.edit_smtp_account
-        ).pack(side='left', padx=2)
-        
-        ttk.Button(
-            btn_frame, 
-            text="Test Connection", 
-            command=self.test_connection,
-            style='info.TButton'
-        ).pack(side='right', padx=2)
-        
-        # SMTP Configuration Fields
-        config_frame = ttk.LabelFrame(self.smtp_tab, text="SMTP Configuration", padding=10)
-        config_frame.grid(row=1, column=0, sticky='nsew', pady=5)
-        config_frame.grid_columnconfigure(1, weight=1)
-        
-        # Server
-        ttk.Label(config_frame, text="SMTP Server:").grid(row=0, column=0, sticky='e', padx=5, pady=2)
-        self.smtp_server = ttk.Entry(config_frame)
-        self.smtp_server.grid(row=0, column=1, sticky='ew', padx=5, pady=2)
-        
-        # Port
-        ttk.Label(config_frame, text="Port:").grid(row=1, column=0, sticky='e', padx=5, pady=2)
-        self.smtp_port = ttk.Entry(config_frame)
-        self.smtp_port.grid(row=1, column=1, sticky='ew', padx=5, pady=2)
-        self.smtp_port.insert(0, "587")  # Default port
-        
-        # Email
-        ttk.Label(config_frame, text="Email:").grid(row=2, column=0, sticky='e', padx=5, pady=2)
-        self.smtp_email = ttk.Entry(config_frame)
-        self.smtp_email.grid(row=2, column=1, sticky='ew', padx=5, pady=2)
-        
-        # Display Name
-        ttk.Label(config_frame, text="Display Name:").grid(row=3, column=0, sticky='e', padx=5, pady=2)
-        self.smtp_display_name = ttk.Entry(config_frame)
-        self.smtp_display_name.grid(row=3, column=1, sticky='ew', padx=5, pady=2)
-        
-        # Password
-        ttk.Label(config_frame, text="Password:").grid(row=4, column=0, sticky='e', padx=5, pady=2)
-        self.smtp_password = ttk.Entry(config_frame, show="•")
-        self.smtp_password.grid(row=4, column=1, sticky='ew', padx=5, pady=2)
-        
-        # Daily Limit
-        ttk.Label(config_frame, text="Daily Limit:").grid(row=5, column=0, sticky='e', padx=5, pady=2)
-        self.daily_limit = ttk.Entry(config_frame)
-        self.daily_limit.grid(row=5, column=1, sticky='ew', padx=5, pady=2)
-        self.daily_limit.insert(0, "100")  # Default limit
-        
-        # Delay between emails
-        ttk.Label(config_frame, text="Delay (seconds):").grid(row=6, column=0, sticky='e', padx=5, pady=2)
-        self.email_delay = ttk.Entry(config_frame)
-        self.email_delay.grid(row=6, column=1, sticky='ew', padx=5, pady=2)
-        self.email_delay.insert(0, "5")  # Default delay
-    
-    def create_status_tab(self):
-        self.status_tab = ttk.Frame(self.module_notebook)
-        
-        # Configure grid
-        self.status_tab.grid_rowconfigure(0, weight=1)
-        self.status_tab.grid_columnconfigure(0, weight=1)
-        
-        # Status Treeview
-        columns = ("#", "Email", "Status", "Timestamp", "SMTP Account", "Details")
-        self.status_tree = ttk.Treeview(
-            self.status_tab, 
-            columns=columns, 
-            show="headings",
-            selectmode='extended',
-            height=20
-        )
-        
-        for col in columns:
-            self.status_tree.heading(col, text=col)
-            self.status_tree.column(col, width=100, anchor='w')
-        
-        self.status_tree.column("#", width=40)
-        self.status_tree.column("Email", width=180)
-        self.status_tree.column("Status", width=100)
-        self.status_tree.column("Timestamp", width=140)
-        self.status_tree.column("SMTP Account", width=150)
-        self.status_tree.column("Details", width=300)
-        
-        # Add scrollbars
-        yscroll = ttk.Scrollbar(self.status_tab, orient="vertical", command=self.status_tree.yview)
-        xscroll = ttk.Scrollbar(self.status_tab, orient="horizontal", command=self.status_tree.xview)
-        self.status_tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
-        
-        self.status_tree.grid(row=0, column=0, sticky="nsew")
-        yscroll.grid(row=0, column=1, sticky="ns")
-        xscroll.grid(row=1, column=0, sticky="ew")
-        
-        # Action buttons
-        btn_frame = ttk.Frame(self.status_tab)
-        btn_frame.grid(row=2, column=0, columnspan=2, sticky='ew', pady=5)
-        
-        ttk.Button(
-            btn_frame, 
-            text="Clear Status", 
-            command=self.clear_status
-        ).pack(side='left', padx=5)
-        
-        ttk.Button(
-            btn_frame, 
-            text="Export to CSV", 
-            command=self.export_status
-        ).pack(side='left', padx=5)
-        
-        # Progress bar
-        self.progress_var = DoubleVar()
-        self.progress_bar = ttk.Progressbar(
-            self.status_tab, 
-            variable=self.progress_var, 
-            maximum=100
-        )
-        self.progress_bar.grid(row=3, column=0, columnspan=2, sticky='ew', padx=5, pady=5)
-        
-        # Progress label
-        self.progress_label = ttk.Label(self.status_tab, text="Ready")
-        self.progress_label.grid(row=4, column=0, columnspan=2, sticky='ew', padx=5, pady=2)
-    
-    def load_config(self):
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    self.smtp_accounts = config.get('smtp_accounts', [])
-                    self.last_sent_times = config.get('last_sent_times', {})
-                    
-                    # Initialize counters
-                    for i, account in enumerate(self.smtp_accounts):
-                        self.email_counters[i] = account.get('sent_today', 0)
-                        self.smtp_listbox.insert('end', self.format_account_display(account))
-                    
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load config: {str(e)}")
-
-    def save_config(self):
-        try:
-            # Update sent counts in accounts before saving
-            for i, account in enumerate(self.smtp_accounts):
-                account['sent_today'] = self.email_counters.get(i, 0)
-            
-            config = {
-                'smtp_accounts': self.smtp_accounts,
-                'last_sent_times': self.last_sent_times
-            }
-            
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save config: {str(e)}")
-
-    def format_account_display(self, account):
-        return f"{account['email']} (Limit: {account['limit']}/day, Sent: {account.get('sent_today', 0)})"
-
-    def load_email_list(self):
-        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv"), ("Text Files", "*.txt")])
-        if file_path:
-            try:
-                with open(file_path, 'r') as f:
-                    reader = csv.reader(f)
-                    self.email_list = [row[0].strip() for row in reader if row and row[0].strip()]
-                
-                # Update listbox
-                self.email_listbox.delete(0, 'end')
-                for email in self.email_list[:100]:  # Show first 100 as preview
-                    self.email_listbox.insert('end', email)
-                if len(self.email_list) > 100:
-                    self.email_listbox.insert('end', f"... and {len(self.email_list) - 100} more")
-                
-                self.parent.update_status(f"Loaded {len(self.email_list)} emails from {os.path.basename(file_path)}")
-                self.update_progress()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load file: {str(e)}")
-
-    def add_smtp_account(self):
-        # Get all field values
-        server = self.smtp_server.get().strip()
-        port = self.smtp_port.get().strip()
-        email = self.smtp_email.get().strip()
-        display_name = self.smtp_display_name.get().strip()
-        password = self.smtp_password.get().strip()
-        limit = self.daily_limit.get().strip()
-        delay = self.email_delay.get().strip()
-        
-        # Validate fields
-        if not all([server, port, email, password, limit, delay]):
-            messagebox.showerror("Error", "All fields are required!")
-            return
-            
-        try:
-            limit = int(limit)
-            if limit <= 0:
-                raise ValueError
-        except ValueError:
-            messagebox.showerror("Error", "Daily limit must be a positive number")
-            return
-            
-        try:
-            port = int(port)
-            if port <= 0 or port > 65535:
-                raise ValueError
-        except ValueError:
-            messagebox.showerror("Error", "Port must be a valid number (1-65535)")
-            return
-            
-        try:
-            delay = int(delay)
-            if delay < 0:
-                raise ValueError
-        except ValueError:
-            messagebox.showerror("Error", "Delay must be a positive number")
-            return
-            
-        # Add account
-        account = {
-            'server': server,
-            'port': port,
-            'email': email,
-            'display_name': display_name,
-            'password': password,
-            'limit': limit,
-            'delay': delay,
-            'sent_today': 0
-        }
-        
-        self.smtp_accounts.append(account)
-        index = len(self.smtp_accounts) - 1
-        self.email_counters[index] = 0
-        self.smtp_listbox.insert('end', self.format_account_display(account))
-        
-        # Clear fields
-        self.smtp_password.delete(0, 'end')
-        
-        # Save config
-        self.save_config()
-
-    def remove_smtp_account(self):
-        if selected := self.smtp_listbox.curselection():
-            index = selected[0]
-            self.smtp_listbox.delete(index)
-            del self.smtp_accounts[index]
-            
-            # Rebuild counters
-            new_counters = {}
-            for i, account in enumerate(self.smtp_accounts):
-                new_counters[i] = self.email_counters.get(i, 0)
-            self.email_counters = new_counters
-            
-            self.save_config()
-
-    def edit_smtp_account(self):
-        if selected := self.smtp_listbox.curselection():
-            index = selected[0]
-            account = self.smtp_accounts[index]
-            
-            # Fill fields with selected account
-            self.smtp_server.delete(0, 'end')
-            self.smtp_server.insert(0, account['server'])
-            
-            self.smtp_port.delete(0, 'end')
-            self.smtp_port.insert(0, str(account['port']))
-            
-            self.smtp_email.delete(0, 'end')
-            self.smtp_email.insert(0, account['email'])
-            
-            self.smtp_display_name.delete(0, 'end')
-            self.smtp_display_name.insert(0, account.get('display_name', ''))
-            
-            self.smtp_password.delete(0, 'end')
-            self.smtp_password.insert(0, account['password'])
-            
-            self.daily_limit.delete(0, 'end')
-            self.daily_limit.insert(0, str(account['limit']))
-            
-            self.email_delay.delete(0, 'end')
-            self.email_delay.insert(0, str(account.get('delay', 5)))
-            
-            # Remove the account (will be re-added if save is clicked)
-            self.smtp_listbox.delete(index)
-            del self.smtp_accounts[index]
-            del self.email_counters[index]
-
-    def test_connection(self):
-        # Get current values
-        server = self.smtp_server.get().strip()
-        port = self.smtp_port.get().strip()
-        email = self.smtp_email.get().strip()
-        password = self.smtp_password.get().strip()
-        
-        if not all([server, port, email, password]):
-            messagebox.showerror("Error", "All fields are required to test connection")
-            return
-            
-        try:
-            port = int(port)
-        except ValueError:
-            messagebox.showerror("Error", "Port must be a valid number")
-            return
-            
-        server_obj = None
-        try:
-            if port == 465:
-                server_obj = smtplib.SMTP_SSL(server, port, timeout=10)
-            else:
-                server_obj = smtplib.SMTP(server, port, timeout=10)
-                server_obj.starttls()
-                
-            server_obj.login(email, password)
-            messagebox.showinfo("Success", "Connection successful!")
-        except smtplib.SMTPAuthenticationError:
-            messagebox.showerror("Error", "Authentication failed. Check your email and password.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Connection failed: {str(e)}")
-        finally:
-            if server_obj:
-                server_obj.quit()
-
-    def start_sending(self):
-        if not self.email_list:
-            messagebox.showerror("Error", "Please load email list first!")
-            return
-        if not self.smtp_accounts:
-            messagebox.showerror("Error", "Please add SMTP accounts first!")
-            return
-        if not self.subject_entry.get().strip():
-            messagebox.showerror("Error", "Please enter a subject!")
-            return
-        if not self.message_text.get("1.0", "end-1c").strip():
-            messagebox.showerror("Error", "Please enter a message!")
-            return
-        
-        # Check if any accounts have available quota
-        available_accounts = False
-        for i, account in enumerate(self.smtp_accounts):
-            if self.check_account_limit(i):
-                available_accounts = True
-                break
-        
-        if not available_accounts:
-            messagebox.showinfo("Limit Reached", 
-                "All accounts have reached their daily limits. Please add more accounts or wait 24 hours.")
-            return
-        
-        # Update UI
-        self.btn_start['state'] = 'disabled'
-        self.btn_pause['state'] = 'normal'
-        self.btn_stop['state'] = 'normal'
-        self.sending_active = True
-        self.pause_sending = False
-        
-        # Start sending thread
-        thread = threading.Thread(target=self.send_emails)
-        thread.daemon = True
-        thread.start()
-
-    def toggle_pause(self):
-        self.pause_sending = not self.pause_sending
-        if self.pause_sending:
-            self.btn_pause.config(text="Resume", style='success.TButton')
-            self.parent.update_status("Sending paused")
-        else:
-            self.btn_pause.config(text="Pause", style='warning.TButton')
-            self.parent.update_status("Resuming sending...")
-
-    def stop_sending(self):
-        self.sending_active = False
-        self.btn_start['state'] = 'normal'
-        self.btn_pause['state'] = 'disabled'
-        self.btn_stop['state'] = 'disabled'
-        self.parent.update_status("Sending stopped by user")
-
-    def send_emails(self):
-        total_sent = 0
-        total_emails = len(self.email_list)
-        
-        try:
-            for i, email in enumerate(self.email_list):
-                if not self.sending_active:
-                    break
-                
-                while self.pause_sending and self.sending_active:
-                    time.sleep(1)
-                
-                # Find next available account
-                account_index = self.get_next_available_account()
-                if account_index is None:
-                    messagebox.showinfo("Limit Reached", 
-                        "All accounts have reached their daily limits. Please add more accounts or wait 24 hours.")
-                    break
-                
-                account = self.smtp_accounts[account_index]
-                
-                # Create message
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = self.subject_entry.get()
-                
-                # Set From address
-                if account.get('display_name'):
-                    msg['From'] = f"{account['display_name']} <{account['email']}>"
-                else:
-                    msg['From'] = account['email']
-                
-                msg['To'] = email
-                
-                # Add message body
-                text_content = self.message_text.get("1.0", "end-1c").strip()
-                msg.attach(MIMEText(text_content, 'plain'))
-                
-                try:
-                    # Connect to server
-                    if account['port'] == 465:
-                        server = smtplib.SMTP_SSL(account['server'], account['port'])
-                    else:
-                        server = smtplib.SMTP(account['server'], account['port'])
-                        server.starttls()
-                    
-                    server.login(account['email'], account['password'])
-                    server.sendmail(account['email'], [email], msg.as_string())
-                    server.quit()
-                    
-                    # Update counters
-                    total_sent += 1
-                    self.email_counters[account_index] += 1
-                    
-                    # Update last sent time
-                    self.last_sent_times[account_index] = datetime.now().timestamp()
-                    
-                    # Update status
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    self.status_tree.insert('', 'end', values=(
-                        i + 1,
-                        email,
-                        "Sent",
-                        timestamp,
-                        account['email'],
-                        ""
-                    ))
-                    
-                    # Update UI
-                    self.parent.update_status(f"Sent: {total_sent}/{total_emails} | Using: {account['email']} ({self.email_counters[account_index]}/{account['limit']})")
-                    self.update_progress(i + 1, total_emails)
-                    
-                    # Update account display
-                    self.smtp_listbox.delete(account_index)
-                    self.smtp_listbox.insert(account_index, self.format_account_display(account))
-                    
-                    # Save progress
-                    self.save_config()
-                    
-                    # Apply delay between emails
-                    time.sleep(account.get('delay', 5))
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    self.status_tree.insert('', 'end', values=(
-                        i + 1,
-                        email,
-                        "Failed",
-                        timestamp,
-                        account['email'],
-                        error_msg
-                    ))
-                    continue
-            
-            # Sending complete
-            self.parent.update_status(f"Finished sending {total_sent} emails")
-            self.btn_start['state'] = 'normal'
-            self.btn_pause['state'] = 'disabled'
-            self.btn_stop['state'] = 'disabled'
-            self.sending_active = False
-            
-            if total_sent == total_emails:
-                messagebox.showinfo("Complete", f"Successfully sent all {total_sent} emails!")
-            else:
-                messagebox.showinfo("Stopped", f"Sent {total_sent} out of {total_emails} emails")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Sending failed: {str(e)}")
-            self.btn_start['state'] = 'normal'
-            self.btn_pause['state'] = 'disabled'
-            self.btn_stop['state'] = 'disabled'
-            self.sending_active = False
-
-    def get_next_available_account(self):
-        """Find the next available account that hasn't reached its daily limit"""
-        for i in range(len(self.smtp_accounts)):
-            if self.check_account_limit(i):
-                return i
-        
-        # If all accounts are at limit, check if any have passed 24 hours
-        for i in range(len(self.smtp_accounts)):
-            last_sent = self.last_sent_times.get(i, 0)
-            if datetime.now().timestamp() - last_sent > 24 * 60 * 60:
-                # Reset counter for this account
-                self.email_counters[i] = 0
-                account = self.smtp_accounts[i]
-                account['sent_today'] = 0
-                self.smtp_listbox.delete(i)
-                self.smtp_listbox.insert(i, self.format_account_display(account))
-                return i
-        
-        return None
-
-    def check_account_limit(self, account_index):
-        """Check if account hasn't reached its daily limit"""
-        account = self.smtp_accounts[account_index]
-        sent_today = self.email_counters.get(account_index, 0)
-        
-        # Check if we've passed 24 hours since last send
-        last_sent = self.last_sent_times.get(account_index, 0)
-        if datetime.now().timestamp() - last_sent > 24 * 60 * 60:
-            # Reset counter
-            self.email_counters[account_index] = 0
-            account['sent_today'] = 0
-            self.smtp_listbox.delete(account_index)
-            self.smtp_listbox.insert(account_index, self.format_account_display(account))
-            return True
-        
-        return sent_today < account['limit']
-
-    def update_progress(self, current=0, total=1):
-        """Update progress bar and label"""
-        if total == 0:
-            percent = 0
-        else:
-            percent = (current / total) * 100
-        
-        self.progress_var.set(percent)
-        self.progress_label.config(text=f"{current}/{total} ({percent:.1f}%)")
-
-    def clear_status(self):
-        """Clear the status treeview"""
-        for item in self.status_tree.get_children():
-            self.status_tree.delete(item)
-        self.update_progress(0, 1)
-
-    def export_status(self):
-        """Export status to CSV file"""
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV Files", "*.csv")]
-        )
-        
-        if file_path:
-            try:
-                with open(file_path, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["#", "Email", "Status", "Timestamp", "SMTP Account", "Details"])
-                    
-                    for item in self.status_tree.get_children():
-                        writer.writerow(self.status_tree.item(item)['values'])
-                
-                messagebox.showinfo("Success", f"Status exported to {file_path}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to export status: {str(e)}")
-
-    def on_closing(self):
-        """Handle module closing"""
-        self.save_config()
-
-
-if __name__ == "__main__":
-    root = Tk()
-    app = QuantumEmailSuite(root)
-    root.protocol("WM_DELETE_WINDOW", app.on_closing)
-    root.mainloop()
\ No newline at end of file
+import re
+import os
+import json
+import csv
+import smtplib
+import threading
+import time
+import gc
+import mmap
+import sys
+import heapq
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+import importlib.util
+import io
+import gzip
+import bz2
+import lzma
+import zipfile
+import tarfile
+import ipaddress
+import struct
+import zlib
+from datetime import datetime
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import add, gt, itemgetter, ne, not_
+from contextlib import ExitStack, contextmanager
+from itertools import accumulate, compress, groupby, islice, repeat
+from bisect import bisect_left, bisect_right
+from fnmatch import fnmatch
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+import glob
+import argparse
+from threading import Lock, Thread
+import numpy as np
+import pandas as pd
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, simpledialog, scrolledtext
+    from tkinter import font as tkfont
+    from tkinter.colorchooser import askcolor
+except ImportError:  # a Python built without Tk still runs the headless CLI
+    tk = None
+
+
+def load_style():
+    """Import ttkbootstrap's Style on first use; only the GUI needs it"""
+    try:
+        from ttkbootstrap import Style
+    except ImportError:
+        raise RuntimeError("The GUI needs the ttkbootstrap package (pip install ttkbootstrap)") from None
+    return Style
+
+
+EMAIL_PATTERN = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.(?:xn--[A-Za-z0-9-]+|[A-Za-z]{2,})\b"
+EMAIL_HEADER_HINTS = ("email", "e-mail", "mail", "correo", "courriel")
+COMPRESSED_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+COLUMNAR_SUFFIXES = ('.parquet', '.arrow', '.feather', '.ipc')
+
+
+def load_pyarrow():
+    """Import pyarrow and the submodules used here on first use; Parquet/Arrow support is optional"""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet/Arrow files need the pyarrow package (pip install pyarrow)") from None
+    return pyarrow
+
+
+class EmailValidator:
+    """RFC 5321/5322 address checks with IDN support and a per-domain cache
+
+    The local part must be a dot-atom (UTF-8 allowed, per RFC 6531) or a
+    quoted string of at most 64 octets, and the whole address at most 254.
+    The domain is checked in its IDNA (punycode) form for label syntax and
+    length once per distinct domain; the verdict is cached.
+
+    validate_many() vets a whole chunk in a few C-level passes over the
+    joined batch, rejects over-long local parts on their length and only
+    checks the other addresses that trip them one by one.
+
+    Only addresses given directly get the UTF-8 and U-label checks: the
+    extractor's EMAIL_PATTERN is ASCII-only, so files yield IDN addresses
+    only when their domain is already in punycode (xn--) form.
+    """
+
+    MAX_ADDRESS = 254
+    MAX_LOCAL = 64
+    MAX_DOMAIN = 253
+    MAX_LABEL = 63
+    DOMAIN_CACHE_SIZE = 1 << 16
+    BATCH_FLOOR = 16  # chunks this small are checked address by address
+    BATCH_BLOCK = 4096  # addresses per pass, so each joined block stays in cache
+
+    ATOM = re.compile(r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~.\u0080-\U0010ffff-]+")
+    QUOTED = re.compile(r'"(?:[\x20\x21\x23-\x5b\x5d-\x7e\u0080-\U0010ffff]|\\[\x20-\x7e])*"')
+    LABEL = re.compile(r"[a-z0-9](?:[a-z0-9-]*[a-z0-9])?")
+    # Every byte of the joined batch becomes "a" (atext), "." (dot, @ or newline) or "!" (anything else),
+    # so a non-ASCII or quoted address shows up as "!" and two adjacent separators as ".."
+    MARKS = bytes(46 if c in b".@\n" else 97 if re.fullmatch(rb"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]", bytes([c]))
+                  else 33 for c in range(256))
+    DOT_ATOM = bytes(c for c in range(256) if re.fullmatch(rb"[A-Za-z0-9!#$%&'*+/=?^_`{|}~.-]", bytes([c])))
+    NOT_SEPARATORS = bytes(c for c in range(256) if c not in b"@\n")
+
+    def __init__(self):
+        self._domains = {}  # domain as written -> octets of its ASCII form, 0 if invalid
+
+    def __call__(self, email):
+        return self.is_valid(email)
+
+    def is_valid(self, email):
+        """Check a single address"""
+        local, at, domain = email.rpartition('@')
+        if not at or not local:
+            return False
+        size = self._domains.get(domain)
+        if size is None:
+            size = self._check_domain(domain)
+        if not size:
+            return False
+        octets = len(local) if local.isascii() else len(local.encode('utf-8'))
+        if octets > self.MAX_LOCAL or octets + 1 + size > self.MAX_ADDRESS:
+            return False
+        if local[0] == '"':
+            return self.QUOTED.fullmatch(local) is not None
+        return (self.ATOM.fullmatch(local) is not None and local[0] != '.' and local[-1] != '.'
+                and '..' not in local)
+
+    def validate_many(self, emails):
+        """Validity flags for a list of addresses, in order"""
+        if len(emails) <= self.BATCH_FLOOR:
+            return [self.is_valid(email) for email in emails]
+        flags = [True] * len(emails)
+        for start in range(0, len(emails), self.BATCH_BLOCK):
+            block = emails[start:start + self.BATCH_BLOCK]
+            invalid, suspects = self._screen(block)
+            for i in invalid:
+                flags[start + i] = False
+            for i in suspects - invalid:
+                flags[start + i] = self.is_valid(block[i])
+        return flags
+
+    def _screen(self, emails):
+        """Indexes in a batch of addresses that are plainly invalid, and of those to check one by one
+
+        A few C-level passes over the batch and its joined bytes find both:
+        an over-long local part settles an address on its length alone,
+        anything that is not a plain ASCII dot-atom is a suspect, and
+        everything else is valid without a per-address check.
+        """
+        n = len(emails)
+        data = "\n".join(emails).encode('utf-8', 'surrogatepass')
+        skeleton = b"@\n" * (n - 1) + b"@"  # what is left of a clean batch once atext and dots are gone
+        rest = data.translate(None, self.DOT_ATOM)
+        if rest != skeleton and rest.translate(None, self.NOT_SEPARATORS) != skeleton:
+            # Some address has no @, several, or a newline: set those aside and vet the rest
+            odd = {i for i, email in enumerate(emails) if email.count("@") != 1 or "\n" in email}
+            rest = [i for i in range(n) if i not in odd]
+            if not rest:
+                return set(), odd
+            invalid, suspects = self._screen([emails[i] for i in rest])
+            return {rest[i] for i in invalid}, odd.union(rest[i] for i in suspects)
+        parts = data.replace(b"\n", b"@").split(b"@")
+        local_parts = parts[0::2]
+        domains = parts[1::2]
+        invalid = set(compress(range(n), map(gt, map(len, local_parts), repeat(self.MAX_LOCAL))))
+        if b"" in local_parts:
+            invalid.update(compress(range(n), map(not_, local_parts)))
+        suspects = set()
+
+        # Joined by dots, the local parts show a leading or trailing dot and ".." alike as ".."
+        dotted = b".".join(local_parts)
+        if rest != skeleton or b".." in dotted or dotted[:1] == b"." or dotted[-1:] == b".":
+            marks = data.translate(self.MARKS)
+            ends = list(accumulate(map(add, map(len, data.split(b"\n")), repeat(1))))  # offset past each line
+            if marks[:1] == b".":
+                suspects.add(0)
+            if marks[-1:] == b".":
+                suspects.add(n - 1)
+            for needle in (b"!", b".."):
+                found = marks.find(needle)
+                while found != -1:
+                    # A ".." straddling a newline marks the lines on both sides of it
+                    line = bisect_right(ends, found)
+                    last = bisect_right(ends, found + len(needle) - 1, line)
+                    suspects.update(range(line, last + 1))
+                    found = marks.find(needle, ends[last] - 1)  # from the newline, for a ".." across it
+
+        cache = self._domains
+        bad = set()
+        largest = 0
+        for domain in set(domains):
+            text = domain.decode('utf-8', 'surrogatepass')
+            size = cache.get(text)
+            if size is None:
+                size = self._check_domain(text)
+            if not size:
+                bad.add(domain)
+            largest = max(largest, size)
+        if bad:
+            suspects.update(i for i, domain in enumerate(domains) if domain in bad)
+        if self.MAX_LOCAL + 1 + largest > self.MAX_ADDRESS:  # longer local parts are invalid already
+            suspects.update(compress(range(n), map(gt, map(len, emails), repeat(self.MAX_ADDRESS))))
+        return invalid, suspects
+
+    def _check_domain(self, domain):
+        """Octets in the domain's ASCII form, or 0 if it is no valid mail domain; cached"""
+        if len(self._domains) >= self.DOMAIN_CACHE_SIZE:
+            self._domains.clear()
+        self._domains[domain] = size = self._domain_size(domain)
+        return size
+
+    def _domain_size(self, domain):
+        if domain.startswith('[') and domain.endswith(']'):
+            literal = domain[1:-1]
+            try:
+                if literal[:5].lower() == 'ipv6:':
+                    ipaddress.IPv6Address(literal[5:])
+                else:
+                    ipaddress.IPv4Address(literal)
+            except ValueError:
+                return 0
+            return len(domain)
+        if not domain.isascii():
+            try:
+                domain = domain.encode('idna').decode('ascii')
+            except UnicodeError:
+                return 0
+        domain = domain.lower()
+        if len(domain) > self.MAX_DOMAIN:
+            return 0
+        labels = domain.split('.')
+        if len(labels) < 2:
+            return 0
+        for label in labels:
+            if len(label) > self.MAX_LABEL or self.LABEL.fullmatch(label) is None:
+                return 0
+            if label[2:4] == '--':
+                # Only the IDNA ACE prefix may put hyphens there, and its payload must decode
+                if label[:2] != 'xn':
+                    return 0
+                try:
+                    label.encode('ascii').decode('idna')
+                except UnicodeError:
+                    return 0
+        tld = labels[-1]
+        if not (tld.isalpha() and len(tld) >= 2) and tld[:4] != 'xn--':
+            return 0
+        return len(domain)
+
+
+class EmailExtractor:
+    """Precompiled email extraction over text, raw bytes and mmap'd files
+
+    For CSV and Excel inputs only the columns picked by select_columns get a
+    full scan, unless scan_all_columns is set or email_columns names them.
+    """
+
+    COLUMN_SAMPLE_ROWS = 1000
+    MIN_MATCH_RATE = 0.05
+
+    def __init__(self, pattern=EMAIL_PATTERN, scan_all_columns=False, email_columns=()):
+        self.text_regex = re.compile(pattern)
+        self.bytes_regex = re.compile(pattern.encode('ascii'))
+        self.validator = EmailValidator()
+        self.scan_all_columns = scan_all_columns
+        self.email_columns = list(email_columns)  # user override, matched case-insensitively
+        self.metrics = None  # PipelineMetrics counting rows parsed, set by serial loads only
+
+    def extract(self, text):
+        """Extract unique emails from a single string"""
+        return {email.lower() for email in self.text_regex.findall(text)}
+
+    def extract_batch(self, items):
+        """Extract unique emails from a whole chunk of strings in one regex pass"""
+        text = "\n".join(item for item in items if isinstance(item, str))
+        return set(self.text_regex.findall(text.lower()))
+
+    def select_columns(self, sample):
+        """Score the columns of a sample chunk by header name and email-match rate"""
+        columns = list(sample.columns)
+        if self.scan_all_columns:
+            return columns
+        if self.email_columns:
+            wanted = {name.strip().lower() for name in self.email_columns}
+            chosen = [col for col in columns if str(col).strip().lower() in wanted]
+            if chosen:
+                return chosen
+
+        sample = sample.head(self.COLUMN_SAMPLE_ROWS)
+        scores = {}
+        for col in columns:
+            cells = sample[col].dropna().astype(str)
+            rate = cells.str.contains(self.text_regex).mean() if len(cells) else 0.0
+            header = str(col).lower()
+            hinted = any(hint in header for hint in EMAIL_HEADER_HINTS)
+            if hinted or rate >= self.MIN_MATCH_RATE:
+                scores[col] = rate + (1.0 if hinted else 0.0)
+        # Nothing looked like email in the sample: scan everything rather than miss it
+        return sorted(scores, key=scores.get, reverse=True) or columns
+
+    def extract_frame(self, df, columns=None):
+        """Vectorized extraction of unique emails from the given columns of a DataFrame chunk"""
+        columns = df.columns if columns is None else columns
+        cells = pd.concat([df[col] for col in columns], ignore_index=True).dropna()
+        if cells.empty:
+            return set()
+        # Column-wide filter and in-chunk dedupe before any regex work
+        cells = cells[cells.str.contains('@', regex=False, na=False)].drop_duplicates()
+        if cells.empty:
+            return set()
+        matches = cells.str.lower().str.findall(self.text_regex).explode().dropna()
+        return set(matches.drop_duplicates())
+
+    def extract_bytes(self, data):
+        """Extract unique emails from a raw bytes buffer without decoding it first"""
+        matches = set(self.bytes_regex.findall(data.lower()))
+        if not matches:
+            return set()
+        # Matches are pure ASCII, so one joined decode beats decoding each match
+        return set(b"\n".join(matches).decode('ascii').split("\n"))
+
+    def extract_chunk(self, data):
+        """extract_bytes over a run of whole lines, counting them when metrics are on"""
+        if self.metrics is not None:
+            self.metrics.add("rows_parsed", data.count(b"\n") or 1)
+        return self.extract_bytes(data)
+
+    def is_valid(self, email):
+        """RFC/IDN check of a single address; see EmailValidator"""
+        return self.validator.is_valid(email)
+
+    def scan_file(self, filepath, chunk_size, start=0, end=None):
+        """Yield (bytes_done, emails) for newline-aligned chunks of an mmap'd file
+
+        When a byte range is given, only lines that begin inside [start, end)
+        are scanned, so adjacent ranges cover a file exactly once.
+        """
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = self._line_start(mm, start, size)
+                end = self._line_start(mm, size if end is None else min(end, size), size)
+                while pos < end:
+                    stop = min(pos + chunk_size, end)
+                    if stop < end:
+                        # Never cut a line (and so an address) in half
+                        newline = mm.rfind(b'\n', pos, stop)
+                        if newline == -1:
+                            newline = mm.find(b'\n', stop, end)
+                        stop = end if newline == -1 else newline + 1
+                    yield stop, self.extract_chunk(mm[pos:stop])
+                    pos = stop
+
+    @staticmethod
+    def _line_start(mm, offset, size):
+        """First line boundary at or after offset"""
+        if offset <= 0 or offset >= size or mm[offset - 1] == 0x0A:
+            return max(0, min(offset, size))
+        newline = mm.find(b'\n', offset)
+        return size if newline == -1 else newline + 1
+
+    def scan_stream(self, stream, chunk_size):
+        """Yield emails for newline-aligned chunks read from a binary stream"""
+        tail = b""
+        while True:
+            block = stream.read(chunk_size)
+            if not block:
+                break
+            block = tail + block
+            newline = block.rfind(b'\n')
+            if newline == -1:
+                tail = block
+                continue
+            tail = block[newline + 1:]
+            yield self.extract_chunk(block[:newline + 1])
+        if tail:
+            yield self.extract_chunk(tail)
+
+    def iter_file(self, filepath, row_chunk_size, byte_chunk_size, start=0, end=None, progress=None):
+        """Yield batches of unique emails from a CSV, Excel, text or compressed file
+
+        progress, if given, is called with a short status message as sheets
+        and row batches go by.
+        """
+        if is_compressed(filepath):
+            yield from self.iter_archive(filepath, row_chunk_size, byte_chunk_size, progress)
+
+        elif filepath.endswith('.csv'):
+            yield from self._iter_csv(filepath, row_chunk_size)
+
+        elif filepath.endswith(COLUMNAR_SUFFIXES):
+            yield from self._iter_columnar(filepath, row_chunk_size)
+
+        elif filepath.endswith(('.xlsx', '.ods')):
+            # Stream sheets row by row so peak memory is one batch, not one sheet
+            for sheet, rows in self.iter_sheet_rows(filepath):
+                yield from self.extract_rows(rows, row_chunk_size, sheet, progress)
+
+        elif filepath.endswith('.xls'):
+            yield from self._iter_xls(filepath)
+
+        else:  # Text file, scanned as raw bytes straight from an mmap
+            for _, emails in self.scan_file(filepath, byte_chunk_size, start, end):
+                yield emails
+
+    def iter_offsets(self, filepath, row_chunk_size, byte_chunk_size, start=0, progress=None):
+        """Yield (resume offset, emails) pairs for checkpointed loads
+
+        Plain text reports the byte offset after each chunk and can restart
+        from it; every other format reports None and restarts from the top.
+        """
+        if is_plain_text(filepath):
+            yield from self.scan_file(filepath, byte_chunk_size, start)
+        else:
+            for emails in self.iter_file(filepath, row_chunk_size, byte_chunk_size, progress=progress):
+                yield None, emails
+
+    def iter_appended(self, filepath, row_chunk_size, byte_chunk_size, start, end):
+        """Yield batches of emails from bytes [start, end) of a growing text or CSV file
+
+        A CSV tail is parsed under the column names of the file's header row,
+        so the same columns are picked as for its first rows.
+        """
+        if not filepath.endswith('.csv'):
+            for _, emails in self.scan_file(filepath, byte_chunk_size, start, end):
+                yield emails
+            return
+        with open(filepath, 'rb') as f:
+            names = None
+            if start > 0:
+                names = list(pd.read_csv(io.BytesIO(f.readline()), dtype=str, nrows=0).columns)
+                f.seek(start)
+            try:
+                yield from self._iter_csv(io.BufferedReader(ForwardReader(f, end - start)), row_chunk_size, names)
+            except pd.errors.EmptyDataError:
+                return
+
+    def iter_archive(self, filepath, row_chunk_size, byte_chunk_size, progress=None):
+        """Yield batches of emails from a .gz/.bz2/.xz file or each member of a zip/tar archive
+
+        Everything is decompressed as a stream, so nothing is unpacked to disk;
+        progress is reported in compressed bytes read.
+        """
+        size = os.path.getsize(filepath) or 1
+        label = os.path.basename(filepath)
+        with open(filepath, 'rb') as raw:
+            def report(name):
+                if progress:
+                    progress(f"{label} [{name}]: {min(raw.tell() / size, 1):.0%} of compressed input read")
+
+            for name, stream in iter_archive_members(filepath, raw):
+                for emails in self.iter_stream(name, stream, row_chunk_size, byte_chunk_size):
+                    report(name)
+                    yield emails
+
+    def iter_stream(self, name, stream, row_chunk_size, byte_chunk_size):
+        """Yield batches of emails from one decompressed stream, dispatched on its name"""
+        lower = name.lower()
+        if is_compressed(lower) and not lower.endswith(ARCHIVE_SUFFIXES):
+            # A .gz inside a zip or tar is unwrapped one more level
+            suffix = os.path.splitext(lower)[1]
+            with COMPRESSED_OPENERS[suffix](stream) as inner:
+                yield from self.iter_stream(name[:-len(suffix)], inner, row_chunk_size, byte_chunk_size)
+
+        elif lower.endswith('.csv'):
+            yield from self._iter_csv(stream, row_chunk_size)
+
+        elif lower.endswith(COLUMNAR_SUFFIXES):
+            # Parquet keeps its footer at the end, so the member is buffered like a workbook
+            yield from self._iter_columnar(load_pyarrow().py_buffer(stream.read()), row_chunk_size, lower)
+
+        elif lower.endswith(('.xlsx', '.ods', '.xls')):
+            # Workbooks are zip containers themselves and need random access, so
+            # the member is buffered in memory rather than on disk
+            buffer = io.BytesIO(stream.read())
+            if lower.endswith('.xls'):
+                yield from self._iter_xls(buffer)
+            else:
+                for sheet, rows in self.iter_sheet_rows(buffer, lower):
+                    yield from self.extract_rows(rows, row_chunk_size, sheet)
+
+        else:
+            yield from self.scan_stream(stream, byte_chunk_size)
+
+    def _iter_csv(self, source, row_chunk_size, names=None):
+        """Yield batches of emails from a CSV path or binary stream in row chunks
+
+        names are the column names for a stream that starts past the header.
+        """
+        columns = None
+        for chunk in pd.read_csv(source, chunksize=row_chunk_size, dtype=str, engine='c',
+                                 header='infer' if names is None else None, names=names):
+            if self.metrics is not None:
+                self.metrics.add("rows_parsed", len(chunk))
+            emails = set()
+            if columns is None:
+                columns = self.select_columns(chunk)
+                if names is None:
+                    # A header-less list loses its first address to the header row
+                    emails |= self.extract_batch(str(col) for col in chunk.columns)
+            emails |= self.extract_frame(chunk, columns)
+            del chunk
+            yield emails
+
+    def _iter_columnar(self, source, row_chunk_size, name=None):
+        """Yield batches of emails from a Parquet or Arrow IPC file (path) or buffer
+
+        Files are memory-mapped. The columns to scan are picked from a sample
+        as for CSV, and Parquet then decodes only those; Arrow batches are
+        sliced in place. Each column is scanned as one UTF-8 buffer by
+        extract_arrow, never as Python strings.
+        """
+        pa = load_pyarrow()
+        name = name or source
+        if name.endswith('.parquet'):
+            parquet = pa.parquet.ParquetFile(source if isinstance(source, str) else pa.BufferReader(source),
+                                             memory_map=isinstance(source, str))
+            sample = next(parquet.iter_batches(batch_size=self.COLUMN_SAMPLE_ROWS), None)
+            columns = self._columnar_columns(pa, sample)
+            batches = parquet.iter_batches(batch_size=row_chunk_size, columns=columns) if columns else ()
+        else:
+            batches = self._iter_arrow_batches(pa, source, row_chunk_size)
+            columns = None
+            
+        for batch in batches:
+            if columns is None:
+                columns = self._columnar_columns(pa, batch.slice(0, self.COLUMN_SAMPLE_ROWS))
+            if self.metrics is not None:
+                self.metrics.add("rows_parsed", batch.num_rows)
+            emails = set()
+            for column in columns:
+                emails |= self.extract_arrow(batch.column(column))
+            yield emails
+
+    @staticmethod
+    def _iter_arrow_batches(pa, source, row_chunk_size):
+        """Record batches of an Arrow IPC file or stream, sliced to row_chunk_size without copying"""
+        buffer = pa.memory_map(source) if isinstance(source, str) else pa.BufferReader(source)
+        try:
+            try:
+                reader = pa.ipc.open_file(buffer)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                buffer.seek(0)
+                batches = pa.ipc.open_stream(buffer)
+            for batch in batches:
+                for start in range(0, batch.num_rows, row_chunk_size):
+                    yield batch.slice(start, row_chunk_size)
+        finally:
+            buffer.close()
+
+    def _columnar_columns(self, pa, sample):
+        """select_columns over the text columns of a sample record batch"""
+        if sample is None:
+            return []
+        text = [field.name for field in sample.schema
+                if pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+                or (pa.types.is_dictionary(field.type) and pa.types.is_string(field.type.value_type))]
+        if not text:
+            return []
+        return self.select_columns(sample.select(text).to_pandas())
+
+    def extract_arrow(self, column):
+        """Extract unique emails from an Arrow string column with one regex pass over a lowercased copy
+
+        The copy's values are newline-terminated (ascii_lower and the join
+        each write a new buffer) so matches cannot run across values; it is
+        scanned as one buffer rather than converted to Python strings.
+        """
+        pc = load_pyarrow().compute
+        # Lowercase and newline-terminate every value; nulls drop out
+        text = pc.binary_join_element_wise(pc.ascii_lower(column.cast("string")), "\n", "")
+        if text.null_count == len(text):
+            return set()
+        offsets = np.frombuffer(text.buffers()[1], np.int32)[text.offset:text.offset + len(text) + 1]
+        data = memoryview(text.buffers()[2])[offsets[0]:offsets[-1]]
+        matches = set(self.bytes_regex.findall(data))
+        if not matches:
+            return set()
+        return set(b"\n".join(matches).decode('ascii').split("\n"))
+
+    def _iter_xls(self, source):
+        """Yield one batch of emails per sheet of a legacy .xls workbook"""
+        # Legacy .xls has no streaming reader; it is parsed a sheet at a time
+        xl = pd.ExcelFile(source)
+        try:
+            for sheet in xl.sheet_names:
+                df = xl.parse(sheet, dtype=str)
+                if self.metrics is not None:
+                    self.metrics.add("rows_parsed", len(df))
+                emails = self.extract_batch(str(col) for col in df.columns)
+                emails |= self.extract_frame(df, self.select_columns(df))
+                del df
+                yield emails
+        finally:
+            xl.close()
+
+    def extract_rows(self, rows, batch_size, sheet="", progress=None):
+        """Feed an iterator of row tuples (header first) through extract_frame in fixed-size batches"""
+        header = next(rows, None)
+        if header is None:
+            return
+        names = self._column_names(header)
+        emails = self.extract_batch(str(cell) for cell in header if cell is not None)
+        columns = None
+        done = 0
+        batch = list(islice(rows, batch_size))
+        while batch:
+            width = max(len(row) for row in batch)
+            if width > len(names):
+                names += [f"column{i + 1}" for i in range(len(names), width)]
+            # Read-only rows stop at their last filled cell, so a batch may be narrower than the header
+            df = pd.DataFrame(batch, columns=names[:width], dtype=object)
+            if self.metrics is not None:
+                self.metrics.add("rows_parsed", len(batch))
+            if columns is None:
+                columns = self.select_columns(df)
+            present = [col for col in columns if col in df.columns]
+            if present:
+                emails |= self.extract_frame(df, present)
+            done += len(batch)
+            del df, batch
+            if progress:
+                progress(f"Sheet '{sheet}': {done:,} rows")
+            yield emails
+            emails = set()
+            batch = list(islice(rows, batch_size))
+        if emails:
+            yield emails
+
+    @staticmethod
+    def _column_names(header):
+        """Unique string column names for a header row that may hold blanks or repeats"""
+        names = []
+        seen = set()
+        for i, cell in enumerate(header):
+            name = str(cell).strip() if cell is not None and str(cell).strip() else f"column{i + 1}"
+            while name in seen:
+                name = f"{name}_{i + 1}"
+            seen.add(name)
+            names.append(name)
+        return names
+
+    def iter_sheet_rows(self, filepath, name=None):
+        """Yield (sheet name, row iterator) for each sheet of an .xlsx or .ods workbook
+
+        filepath may also be a seekable file object, with name giving its type.
+        """
+        if (name or filepath).endswith('.xlsx'):
+            import openpyxl
+            wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+            try:
+                for ws in wb.worksheets:
+                    yield ws.title, ws.iter_rows(values_only=True)
+            finally:
+                wb.close()
+        else:
+            for sheet, rows in groupby(self._iter_ods_rows(filepath), key=lambda item: item[0]):
+                yield sheet, (row for _, row in rows)
+
+    @staticmethod
+    def _iter_ods_rows(filepath):
+        """Stream (sheet name, row tuple) pairs out of an .ods content.xml with iterparse"""
+        import xml.etree.ElementTree as ET
+        table_ns = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+        text_ns = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+        office_ns = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+        with zipfile.ZipFile(filepath) as archive, archive.open('content.xml') as content:
+            sheet = ""
+            parents = []
+            for event, elem in ET.iterparse(content, events=('start', 'end')):
+                if event == 'start':
+                    parents.append(elem)
+                    if elem.tag == table_ns + 'table':
+                        sheet = elem.get(table_ns + 'name', "")
+                    continue
+                parents.pop()
+                if elem.tag != table_ns + 'table-row':
+                    continue
+                row = []
+                blanks = 0
+                for cell in elem:
+                    repeat = int(cell.get(table_ns + 'number-columns-repeated', 1))
+                    value = ("\n".join("".join(p.itertext()) for p in cell.iter(text_ns + 'p'))
+                             or cell.get(office_ns + 'value'))
+                    if not value:
+                        # Trailing blank cells are often "repeated" thousands of times
+                        blanks += repeat
+                        continue
+                    row.extend([None] * blanks)
+                    row.extend([value] * repeat)
+                    blanks = 0
+                if row:
+                    for _ in range(int(elem.get(table_ns + 'number-rows-repeated', 1))):
+                        yield sheet, tuple(row)
+                # Drop the parsed row so the tree never grows past one row
+                parents[-1].remove(elem)
+
+
+class ForwardReader(io.RawIOBase):
+    """Forward-only raw view of a stream, optionally cut off after limit bytes
+
+    Wraps stream-mode tar members, which cannot answer seekable(), and the
+    complete lines at the end of a growing file.
+    """
+
+    def __init__(self, stream, limit=None):
+        self.stream = stream
+        self.remaining = limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = len(buffer) if self.remaining is None else min(len(buffer), self.remaining)
+        data = self.stream.read(size)
+        buffer[:len(data)] = data
+        if self.remaining is not None:
+            self.remaining -= len(data)
+        return len(data)
+
+
+def is_compressed(filepath):
+    """True for the compressed files and archives iter_archive can stream"""
+    return filepath.lower().endswith(ARCHIVE_SUFFIXES + tuple(COMPRESSED_OPENERS))
+
+
+def is_plain_text(filepath):
+    """True for inputs scanned as raw text, which can be entered at a byte offset"""
+    return (not filepath.endswith(('.csv', '.xls', '.xlsx', '.ods') + COLUMNAR_SUFFIXES)
+            and not is_compressed(filepath))
+
+
+def iter_archive_members(filepath, raw):
+    """Yield (member name, decompressed stream) for each file in a compressed input
+
+    raw is the open compressed file; a plain .gz/.bz2/.xz file is a single
+    member named after itself minus the suffix.
+    """
+    lower = filepath.lower()
+    if lower.endswith('.zip'):
+        with zipfile.ZipFile(raw) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as member:
+                        yield info.filename, member
+    elif lower.endswith(ARCHIVE_SUFFIXES):
+        # 'r|*' reads the tar as a forward-only stream, whatever its compression
+        with tarfile.open(fileobj=raw, mode='r|*') as archive:
+            for info in archive:
+                if info.isfile():
+                    yield info.name, io.BufferedReader(ForwardReader(archive.extractfile(info)))
+    else:
+        suffix = os.path.splitext(lower)[1]
+        with COMPRESSED_OPENERS[suffix](raw) as stream:
+            yield os.path.basename(filepath)[:-len(suffix)], stream
+
+
+def plan_ingest_tasks(pending, extractor, row_chunk_size, byte_chunk_size, split_size):
+    """Split (index, path, fingerprint, start) entries into process-pool tasks, large text files by byte range"""
+    tasks = []
+    for i, filepath, _, resume in pending:
+        size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        if is_plain_text(filepath) and size - resume > split_size:
+            for start in range(resume, size, split_size):
+                end = min(start + split_size, size)
+                tasks.append((i, filepath, start, end, row_chunk_size, byte_chunk_size, extractor))
+        else:
+            tasks.append((i, filepath, resume, None, row_chunk_size, byte_chunk_size, extractor))
+    return tasks
+
+
+def ingest_shard(task):
+    """Process-pool worker: extract one file or byte range into a local shard"""
+    file_index, filepath, start, end, row_chunk_size, byte_chunk_size, extractor = task
+    shard = set()
+    count = 0
+    for emails in extractor.iter_file(filepath, row_chunk_size, byte_chunk_size, start, end):
+        count += len(emails)
+        shard |= emails
+    return file_index, shard, count
+
+
+def write_emails(emails, f, as_csv, chunk_size=10000, progress=None):
+    """Write emails to an open text file as a one-column CSV or one per line
+
+    progress, if given, is called with the running count after each chunk.
+    Returns the number written.
+    """
+    emails = iter(emails)
+    writer = None
+    if as_csv:
+        writer = csv.writer(f)
+        writer.writerow(['email'])  # header
+    written = 0
+    # Write in chunks to handle large lists
+    for chunk in iter(lambda: list(islice(emails, chunk_size)), []):
+        if writer is not None:
+            writer.writerows([email] for email in chunk)
+        else:
+            f.write('\n'.join(chunk) + '\n')
+        written += len(chunk)
+        if progress:
+            progress(written)
+    return written
+
+
+EXPORT_COLUMNS = ("email", "domain", "sources")
+EXPORT_COMPRESSION = {'.gz': "gzip", '.zst': "zstd"}
+
+
+def split_compression(path):
+    """(path without any .gz/.zst suffix, that suffix or "")"""
+    stem, suffix = os.path.splitext(path)
+    return (stem, suffix) if suffix.lower() in EXPORT_COMPRESSION else (path, "")
+
+
+def open_export(path, compression=None):
+    """Open path for writing text, gzip- or zstd-compressed when asked or when its suffix says so"""
+    if compression is None:
+        compression = EXPORT_COMPRESSION.get(split_compression(path)[1].lower())
+    if compression == "gzip":
+        return gzip.open(path, 'wt', compresslevel=6, encoding='utf-8', newline='')
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd output needs the zstandard package (pip install zstandard)") from None
+        return zstandard.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def shard_paths(path, shards):
+    """list.csv.gz -> list_part1of4.csv.gz ... list_part4of4.csv.gz"""
+    if shards <= 1:
+        return [path]
+    stem, compressed = split_compression(path)
+    stem, ext = os.path.splitext(stem)
+    return [f"{stem}_part{i + 1}of{shards}{ext}{compressed}" for i in range(shards)]
+
+
+class ColumnarWriter:
+    """Parquet or Arrow IPC sink for export_records
+
+    Rows carry email, domain, valid and source_ids columns, with the source
+    paths stored in the schema metadata under "sources". domain is
+    dictionary-encoded against one running dictionary that each batch only
+    extends, which the Arrow file format needs (it can take dictionary
+    deltas but not replacements) and which keeps codes stable across
+    batches. valid is True for every row of a clean export.
+    """
+
+    def __init__(self, path, paths=(), compression=None):
+        pa = self.pa = load_pyarrow()
+        self.schema = pa.schema([
+            ("email", pa.string()),
+            ("domain", pa.dictionary(pa.int32(), pa.string())),
+            ("valid", pa.bool_()),
+            ("source_ids", pa.list_(pa.int32())),
+        ], metadata={"sources": json.dumps(list(paths))})
+        self.codes = {}  # domain -> dictionary code
+        self.dictionary = pa.array([], pa.string())
+        self.source_ids = {}  # source bits -> [source ids]
+        if path.lower().endswith('.parquet'):
+            self.writer = pa.parquet.ParquetWriter(path, self.schema, compression=compression or "snappy",
+                                                   use_dictionary=["domain"])
+        else:
+            if compression not in (None, "zstd", "lz4"):
+                raise ValueError("Arrow IPC output supports zstd or lz4 compression only")
+            options = pa.ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+            self.writer = pa.ipc.new_file(path, self.schema, options=options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.writer.close()
+
+    def writerows(self, rows):
+        """Write (email, domain, bits) rows as one record batch"""
+        pa = self.pa
+        take = pa.compute.take
+        emails, domains, bits = (list(map(itemgetter(column), rows)) for column in range(3))
+        # Encode the batch in C, then remap its few distinct domains onto the running dictionary
+        encoded = pa.array(domains).dictionary_encode()
+        batch_domains = encoded.dictionary.to_pylist()
+        codes = self.codes
+        added = [domain for domain in batch_domains if domain not in codes]
+        if added:
+            codes.update(zip(added, range(len(codes), len(codes) + len(added))))
+            self.dictionary = pa.concat_arrays([self.dictionary, pa.array(added, pa.string())])
+        remap = pa.array([codes[domain] for domain in batch_domains], pa.int32())
+        # Likewise source ids: one list per distinct bits value, taken out per row
+        positions = {}
+        rows_at = [positions.setdefault(value, len(positions)) for value in bits]
+        source_ids = self.source_ids
+        for value in positions:
+            if value not in source_ids:
+                source_ids[value] = [source_id for source_id in range(value.bit_length()) if value >> source_id & 1]
+        batch = pa.record_batch([
+            pa.array(emails),  # inferring the type converts far faster than being given pa.string()
+            pa.DictionaryArray.from_arrays(take(remap, encoded.indices), self.dictionary),
+            pa.repeat(True, len(emails)),
+            take(pa.array([source_ids[value] for value in positions], pa.list_(pa.int32())), pa.array(rows_at)),
+        ], schema=self.schema)
+        self.writer.write_batch(batch)
+
+
+def export_records(records, path, paths=(), columns=("email",), shards=1, shard_by="count", as_csv=None,
+                   compression=None, chunk_size=10000, progress=None):
+    """Stream (email, source bits) records to path, or split across shards of it
+
+    Output is CSV when as_csv is set or, by default, when the path ends in
+    .csv (ahead of any .gz/.zst suffix); otherwise one row per line, with
+    extra columns tab-separated. columns picks from EXPORT_COLUMNS, sources
+    being the ;-joined source files looked up in paths. path "-" writes to
+    stdout. With shards > 1, chunks are dealt round-robin ("count") or rows
+    go by a stable hash of their domain ("domain"), so a domain stays on one
+    shard. Only one chunk is held in memory whatever the list size.
+    Paths ending in .parquet or an Arrow suffix are written columnar through
+    ColumnarWriter instead, with its fixed columns whatever columns says.
+
+    progress, if given, is called with the running count after each chunk.
+    Returns (rows written, files written).
+    """
+    unknown = set(columns) - set(EXPORT_COLUMNS)
+    if unknown or "email" not in columns:
+        raise ValueError(f"Export columns must include email and come from {', '.join(EXPORT_COLUMNS)}")
+    if shard_by not in ("count", "domain"):
+        raise ValueError(f"Unknown shard mode {shard_by!r}")
+    columnar = path.lower().endswith(COLUMNAR_SUFFIXES)
+    if as_csv is None:
+        as_csv = split_compression(path)[0].lower().endswith('.csv')
+    as_csv = as_csv and not columnar
+    targets = ['-'] if path == '-' else shard_paths(path, shards)
+    
+    source_names = {}  # source bits -> ";"-joined paths
+    shard_of = {}  # domain -> shard
+    
+    def names(bits):
+        joined = source_names.get(bits)
+        if joined is None:
+            joined = source_names[bits] = ";".join(
+                paths[source_id] for source_id in range(bits.bit_length()) if bits >> source_id & 1)
+        return joined
+    
+    with ExitStack() as stack:
+        if columnar:
+            files = [stack.enter_context(ColumnarWriter(target, paths, compression)) for target in targets]
+        else:
+            files = [sys.stdout if target == '-' else stack.enter_context(open_export(target, compression))
+                     for target in targets]
+        writers = files if columnar else [csv.writer(f) if as_csv else None for f in files]
+        if as_csv:
+            for writer in writers:
+                writer.writerow(columns)  # header
+
+        def write(shard, rows):
+            if columnar:
+                writers[shard].writerows(rows)
+            elif writers[shard] is not None:
+                writers[shard].writerows(rows if len(columns) > 1 else ([email] for email in rows))
+            elif len(columns) > 1:
+                files[shard].write("".join("\t".join(values) + "\n" for values in rows))
+            else:
+                files[shard].write('\n'.join(rows) + '\n')
+
+        records = iter(records)
+        written = 0
+        for number, chunk in enumerate(iter(lambda: list(islice(records, chunk_size)), [])):
+            # Build the chunk column by column, then zip it into rows
+            emails = list(map(itemgetter(0), chunk))
+            domains = None
+            if columnar or "domain" in columns or (shard_by == "domain" and len(files) > 1):
+                domains = [email[email.rfind('@') + 1:].lower() for email in emails]
+            if columnar:
+                rows = list(zip(emails, domains, map(itemgetter(1), chunk)))
+            else:
+                values = {"email": emails, "domain": domains}
+                if "sources" in columns:
+                    values["sources"] = [names(bits) for _, bits in chunk]
+                rows = list(zip(*(values[column] for column in columns))) if len(columns) > 1 else emails
+            
+            if len(files) == 1 or shard_by == "count":
+                write(number % len(files), rows)
+            else:
+                by_shard = {}
+                for domain, row in zip(domains, rows):
+                    shard = shard_of.get(domain)
+                    if shard is None:
+                        shard = shard_of[domain] = zlib.crc32(domain.encode('utf-8')) % len(files)
+                    by_shard.setdefault(shard, []).append(row)
+                for shard, shard_rows in by_shard.items():
+                    write(shard, shard_rows)
+            written += len(chunk)
+            if progress:
+                progress(written)
+    return written, targets
+
+
+def file_fingerprint(path, content_hash=False):
+    """(size, mtime_ns, digest) identity of a file for the reload cache
+
+    The optional digest hashes the first and last MiB rather than the whole
+    file, which is enough to catch in-place rewrites that keep size and mtime.
+    """
+    stat = os.stat(path)
+    digest = ""
+    if content_hash:
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            hasher.update(f.read(1 << 20))
+            if stat.st_size > 2 << 20:
+                f.seek(-(1 << 20), os.SEEK_END)
+                hasher.update(f.read())
+        digest = hasher.hexdigest()
+    return (stat.st_size, stat.st_mtime_ns, digest)
+
+
+class FolderWatcher:
+    """Poll directories for lead files that are new or have grown
+
+    poll() compares a listing with what has been read and returns the reads
+    due as (path, start, end, replace). Text and CSV files are read up to
+    their last complete line, then from there on each time they grow; a
+    trailing line without a newline is left for later, since more of it may
+    still be coming, and only tails() reads it once watching ends. Other formats are read whole (end None) once their size and
+    mtime hold still for a poll, and again if they change. A text file that
+    shrinks, or whose bytes before the last offset change, was rewritten
+    and is read from 0. replace means what the file gave before should be
+    dropped first. Deleted files keep what they gave, and a read that fails
+    is not retried until the file changes again.
+    """
+
+    IGNORE = ('.*', '~$*', '*.tmp', '*.part', '*.partial', '*.crdownload', '*.swp')  # hidden and in-flight files
+    CHECK_BYTES = 256  # bytes kept from before each offset to tell appends from rewrites
+
+    def __init__(self, directories, patterns=("*",), recursive=False, known=None):
+        self.directories = list(directories)
+        self.patterns = tuple(patterns)
+        self.recursive = recursive
+        # path -> [bytes read (None: whole-file read due), (size, mtime_ns) last polled, CHECK_BYTES, read before]
+        self.files = {}
+        # Files already loaded (path -> file_fingerprint) are picked up where they ended
+        for path, fingerprint in (known or {}).items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns) == tuple(fingerprint[:2]):
+                self.files[path] = [stat.st_size, (stat.st_size, stat.st_mtime_ns),
+                                    self._check(path, stat.st_size), True]
+            else:
+                self.files[path] = [0 if self.appendable(path) else None, None, b"", True]
+
+    @staticmethod
+    def appendable(path):
+        """True for files that can be read on from an offset as they grow"""
+        return is_plain_text(path) or path.endswith('.csv')
+
+    def listing(self):
+        """(path, size, mtime_ns) of every matching file in the watched directories"""
+        found = []
+        pending = list(self.directories)
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if any(fnmatch(entry.name, pattern) for pattern in self.IGNORE):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            if self.recursive:
+                                pending.append(entry.path)
+                        elif entry.is_file() and any(fnmatch(entry.name, pattern) for pattern in self.patterns):
+                            stat = entry.stat()
+                            found.append((entry.path, stat.st_size, stat.st_mtime_ns))
+                    except OSError:
+                        continue  # gone between listing and stat
+        return found
+
+    def poll(self):
+        """Return the reads due since the last poll, as (path, start, end, replace)"""
+        reads = []
+        listed = self.listing()
+        for path in set(self.files) - {path for path, _, _ in listed}:
+            del self.files[path]
+        for path, size, mtime in listed:
+            appendable = self.appendable(path)
+            state = self.files.setdefault(path, [0 if appendable else None, None, b"", False])
+            try:
+                if state[1] == (size, mtime):
+                    # Held still since the last poll
+                    if state[0] is None:
+                        reads.append((path, 0, None, state[3]))
+                        state[0], state[3] = size, True
+                    continue
+                state[1] = (size, mtime)
+                if not appendable:
+                    state[0] = None  # read once it settles
+                    continue
+                offset = state[0]
+                if offset and (size < offset or self._check(path, offset) != state[2]):
+                    offset = 0
+                end = self._complete(path, offset, size)
+                if end > offset or (offset == 0 and state[3]):
+                    reads.append((path, offset, end, offset == 0 and state[3]))
+                    state[0], state[2], state[3] = end, self._check(path, end), end > 0
+            except OSError:
+                continue  # gone or locked; looked at again next poll
+        return reads
+
+    def tails(self):
+        """Reads of the unterminated last lines of text files, as (path, start, end, replace)
+
+        For when watching ends and the files are taken as final; the offsets
+        are not moved past them.
+        """
+        reads = []
+        for path, state in self.files.items():
+            if state[0] is not None and state[1] is not None and state[0] < state[1][0] and self.appendable(path):
+                reads.append((path, state[0], state[1][0], False))
+        return reads
+
+    def fingerprint(self, path, content_hash=False):
+        """file_fingerprint of path if all of it has been read, else None"""
+        state = self.files.get(path)
+        try:
+            fingerprint = file_fingerprint(path, content_hash)
+        except OSError:
+            return None
+        return fingerprint if state is not None and state[0] == fingerprint[0] else None
+
+    @classmethod
+    def _check(cls, path, offset):
+        """The CHECK_BYTES before offset"""
+        with open(path, 'rb') as f:
+            f.seek(max(0, offset - cls.CHECK_BYTES))
+            return f.read(min(offset, cls.CHECK_BYTES))
+
+    @staticmethod
+    def _complete(path, start, size, block_size=65536):
+        """Offset just past the last newline in [start, size), or start if there is none"""
+        with open(path, 'rb') as f:
+            stop = size
+            while stop > start:
+                block_start = max(start, stop - block_size)
+                f.seek(block_start)
+                newline = f.read(stop - block_start).rfind(b'\n')
+                if newline != -1:
+                    return block_start + newline + 1
+                stop = block_start
+        return start
+
+
+CANONICAL_RULES = (
+    # domain, alias_of, strip_dots, tag_separator
+    ("gmail.com", "", True, "+"),
+    ("googlemail.com", "gmail.com", True, "+"),
+    ("outlook.com", "", False, "+"),
+    ("hotmail.com", "", False, "+"),
+    ("live.com", "", False, "+"),
+    ("icloud.com", "", False, "+"),
+    ("me.com", "icloud.com", False, "+"),
+    ("mac.com", "icloud.com", False, "+"),
+    ("fastmail.com", "", False, "+"),
+    ("protonmail.com", "", False, "+"),
+    ("proton.me", "", False, "+"),
+    ("yahoo.com", "", False, "-"),
+)
+
+
+class AddressCanonicalizer:
+    """Map an address to the key of the mailbox it delivers to
+
+    Each domain rule can alias the domain to another, drop dots from the
+    local part and cut a sub-address tag at a separator. Domains without a
+    rule are only lowercased. Rules are one dict lookup per address.
+    """
+
+    FIELDS = ("domain", "alias_of", "strip_dots", "tag_separator")
+
+    def __init__(self, rules=CANONICAL_RULES):
+        self.rules = {}
+        for domain, alias_of, strip_dots, tag_separator in rules:
+            domain = domain.strip().lower()
+            self.rules[domain] = ((alias_of or "").strip().lower() or domain, bool(strip_dots), tag_separator or "")
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load rules from a CSV table with a domain,alias_of,strip_dots,tag_separator header"""
+        with open(path, newline='', encoding='utf-8') as f:
+            rules = [(row["domain"], row.get("alias_of") or "",
+                      (row.get("strip_dots") or "").strip().lower() in ("1", "true", "yes"),
+                      (row.get("tag_separator") or "").strip())
+                     for row in csv.DictReader(f) if row.get("domain")]
+        return cls(rules)
+
+    def __call__(self, email):
+        email = email.lower()
+        at = email.rfind('@')
+        rule = self.rules.get(email[at + 1:]) if at > 0 else None
+        if rule is None:
+            return email
+        domain, strip_dots, separator = rule
+        local = email[:at]
+        if separator:
+            cut = local.find(separator)
+            if cut > 0:
+                local = local[:cut]
+        if strip_dots:
+            local = local.replace('.', '')
+        return f"{local}@{domain}"
+
+
+KNOWN_DOMAINS = (
+    "gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "aol.com", "icloud.com", "live.com", "msn.com",
+    "mail.com", "gmx.com", "gmx.de", "gmx.net", "web.de", "yandex.ru", "mail.ru", "protonmail.com", "proton.me",
+    "zoho.com", "ymail.com", "rocketmail.com", "me.com", "mac.com", "googlemail.com", "fastmail.com",
+    "comcast.net", "verizon.net", "att.net", "sbcglobal.net", "bellsouth.net", "cox.net", "charter.net",
+    "earthlink.net", "btinternet.com", "sky.com", "virginmedia.com", "yahoo.co.uk", "hotmail.co.uk",
+    "outlook.de", "hotmail.fr", "orange.fr", "free.fr", "laposte.net", "libero.it", "t-online.de",
+    "qq.com", "163.com", "126.com", "naver.com", "rediffmail.com", "shaw.ca", "rogers.com", "bigpond.com",
+    "email.com", "usa.com", "post.com", "gmx.at", "gmx.ch", "yandex.com", "inbox.ru", "list.ru", "bk.ru",
+)
+
+
+class DomainCorrector:
+    """Suggest the known-good domain a typo'd one was meant to be
+
+    Only the label in front of the public suffix is compared, against known
+    domains with the same suffix, so "hotmial.fr" can become "hotmail.fr"
+    but never "hotmail.com". A domain whose label is itself a known one
+    (hotmail.de, yahoo.co.jp) is taken to be real and left alone.
+
+    Every known label's deletes up to max_distance are indexed up front
+    (SymSpell), so a lookup only generates the unknown label's own deletes
+    and checks the few candidates sharing one with a true Damerau
+    (optimal string alignment) distance. Labels shorter than SHORT_LABEL
+    only get distance 1, and results are cached per domain.
+    """
+
+    SHORT_LABEL = 5
+    # Second-level labels that sit under a country code as part of its public suffix (co.uk, com.au)
+    SECOND_LEVEL = frozenset(("ac", "co", "com", "edu", "gov", "ne", "net", "or", "org"))
+
+    def __init__(self, domains=KNOWN_DOMAINS, max_distance=2):
+        self.max_distance = max_distance
+        self.known = {}     # domain -> rank; earlier (more common) domains win ties
+        self.labels = set()  # the label of every known domain, under any suffix
+        self._deletes = {}  # (suffix, delete string of a label) -> known domains producing it
+        self._cache = {}
+        for domain in domains:
+            domain = domain.strip().lower()
+            if domain and domain not in self.known:
+                self.known[domain] = len(self.known)
+                label, suffix = self.split(domain)
+                self.labels.add(label)
+                for variant in self._variants(label, max_distance):
+                    self._deletes.setdefault((suffix, variant), []).append(domain)
+
+    @classmethod
+    def from_file(cls, path, max_distance=2):
+        """Load known domains, one per line, most common first"""
+        with open(path, encoding='utf-8') as f:
+            return cls([line.split(',')[0] for line in f if line.strip() and not line.startswith('#')],
+                       max_distance)
+
+    @classmethod
+    def split(cls, domain):
+        """(label, public suffix) of a lowercase domain: ("yahoo", "co.uk") for yahoo.co.uk"""
+        parts = domain.split('.')
+        size = 2 if len(parts) > 2 and parts[-2] in cls.SECOND_LEVEL and len(parts[-1]) == 2 else 1
+        if len(parts) <= size:
+            return domain, ""
+        return '.'.join(parts[:-size]), '.'.join(parts[-size:])
+
+    @staticmethod
+    def _variants(word, distance):
+        """word and every string reachable from it by up to distance deletions"""
+        found = {word}
+        frontier = [word]
+        for _ in range(distance):
+            frontier = [item[:i] + item[i + 1:] for item in frontier for i in range(len(item))]
+            frontier = [item for item in frontier if item not in found]
+            found.update(frontier)
+        return found
+
+    @staticmethod
+    def distance(a, b):
+        """Optimal string alignment distance (edits plus adjacent transpositions)"""
+        previous2, previous = None, list(range(len(b) + 1))
+        for i in range(1, len(a) + 1):
+            current = [i] + [0] * len(b)
+            for j in range(1, len(b) + 1):
+                cost = a[i - 1] != b[j - 1]
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+                if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                    current[j] = min(current[j], previous2[j - 2] + 1)
+            previous2, previous = previous, current
+        return previous[-1]
+
+    def suggest(self, domain, max_distance=None):
+        """The known domain closest to domain on the same suffix, or None if it is real or nothing is close enough
+
+        max_distance, when given, caps the edits below the corrector's own
+        limit (1 applies only single-typo fixes).
+        """
+        domain = domain.lower()
+        if domain in self.known:
+            return None
+        if domain not in self._cache:
+            self._cache[domain] = self._closest(domain)
+        best = self._cache[domain]
+        if best is None or (max_distance is not None and best[0] > max_distance):
+            return None
+        return best[1]
+
+    def _closest(self, domain):
+        """(distance, known domain) nearest to domain, or None"""
+        label, suffix = self.split(domain)
+        if label in self.labels:
+            return None  # a known provider under another suffix, not a typo
+        limit = 1 if len(label) < self.SHORT_LABEL else self.max_distance
+        candidates = {candidate for variant in self._variants(label, limit)
+                      for candidate in self._deletes.get((suffix, variant), ())}
+        scored = [(self.distance(label, self.split(candidate)[0]), self.known[candidate], candidate)
+                  for candidate in candidates]
+        best = min(scored, default=None)
+        return (best[0], best[2]) if best and best[0] <= limit else None
+
+
+def correct_domain(store, domain, target):
+    """Move every address on domain over to target in an EmailStore or SQLiteEmailStore
+
+    Sources carry over and each address is revalidated on the way in; every
+    move is recorded on the store as corrected -> original. Returns how many
+    addresses moved.
+    """
+    moved = store.page(0, store.domain_count(domain), "insertion", domain)
+    store.remove_domain(domain)
+    by_source = {}
+    corrections = []
+    for email, _, sources in moved:
+        corrected = f"{email.rpartition('@')[0]}@{target}"
+        corrections.append((corrected, email))
+        for path in sources:
+            by_source.setdefault(path, []).append(corrected)
+    for path, emails in by_source.items():
+        store.add_many(emails, store.intern_path(path))
+    store.record_corrections(corrections)
+    return len(moved)
+
+
+GROUP_NAME = re.compile(r"\w+")
+
+
+def compile_group_expression(expression, groups, paths):
+    """Turn a group expression such as "A - B" or "crm1 & crm2 | leads" into a test on source bits
+
+    Each group stands for "came from any of its files"; groups combine left
+    to right with | (union), & (intersect) and - (subtract). paths is the
+    store's source list, bit i standing for paths[i]. Raises ValueError for
+    malformed expressions, unknown groups and groups with no loaded files.
+    """
+    tokens = re.findall(r"\w+|\S", expression)
+    if not tokens or len(tokens) % 2 == 0:
+        raise ValueError(f"Expected group names joined by |, & or -, got {expression!r}")
+    source_ids = {path: source_id for source_id, path in enumerate(paths)}
+    terms = []
+    for i in range(0, len(tokens), 2):
+        operator, name = tokens[i - 1] if i else "|", tokens[i]
+        if operator not in "|&-" or not GROUP_NAME.fullmatch(name):
+            raise ValueError(f"Expected group names joined by |, & or -, got {expression!r}")
+        if name not in groups:
+            raise ValueError(f"No group named {name}")
+        mask = 0
+        for path in groups[name]:
+            if path in source_ids:
+                mask |= 1 << source_ids[path]
+        if not mask:
+            raise ValueError(f"Group {name} has no loaded files")
+        terms.append((operator, mask))
+
+    def keep(bits):
+        result = False
+        for operator, mask in terms:
+            if operator == "|":
+                result = result or bool(bits & mask)
+            elif operator == "&":
+                result = result and bool(bits & mask)
+            else:
+                result = result and not bits & mask
+        return result
+    return keep
+
+
+def select_groups(store, expression, groups, valid_only=True):
+    """Yield (email, source bits) for the addresses matching a group expression (see compile_group_expression)
+
+    One streaming pass over the deduplicated store, so an address that sits
+    in several files is matched by its mailbox key. Verdicts are cached per
+    distinct source set, which is small however many addresses share it.
+    """
+    keep = compile_group_expression(expression, groups, store.paths)
+    verdicts = {}
+    for email, bits in store.iter_source_bits(valid_only):
+        verdict = verdicts.get(bits)
+        if verdict is None:
+            verdict = verdicts[bits] = keep(bits)
+        if verdict:
+            yield email, bits
+
+
+class EmailStore:
+    """Compact email -> source files store
+
+    Addresses are packed back to back in a bytearray arena and found through
+    an open-addressing hash table of entry ids. Source paths are interned to
+    small integer ids (a removed source's id is handed out again) and each
+    entry keeps its one source id in a flat array; only addresses seen in
+    several sources get an int bitset, in a side dict. There are no
+    per-email lists or repeated path references.
+
+    Validity is decided once at insert time by the validator (an
+    EmailValidator; add_many checks each batch's new addresses in one
+    validate_many call), and the total/unique/valid counters are kept up to date on every insert and
+    delete so stats never need a rescan.
+
+    Each source also keeps the ids of the entries it contributed, so a file
+    can be taken back out with remove_source() without rebuilding the store.
+
+    With a canonicalizer, entries are keyed on the canonical address, so
+    aliases of one mailbox dedupe to a single entry. The first form seen is
+    kept beside the key (only when it differs) and is what gets displayed
+    and exported.
+
+    A domain index (domain -> entry ids, plus how many of those have since
+    been deleted) is kept the same way as the per-source lists, so
+    per-domain counts, views, exports and removals never scan the whole
+    store.
+    """
+
+    EMPTY = -1
+    DELETED = -2
+    NO_SOURCE = -1  # _sources value of a deleted entry
+    SEVERAL = -2    # _sources value of an entry whose sources are a bitset in _several
+
+    SORT_KEYS = ("insertion", "email", "domain", "source")
+
+    def __init__(self, validator, capacity=1024, canonicalizer=None):
+        self.validator = validator
+        self.canonicalizer = canonicalizer
+        self.paths = []      # source id -> file path
+        self.path_ids = {}   # file path -> source id
+        self.fingerprints = {}  # file path -> file_fingerprint() when it was last fully loaded
+        self.corrections = {}  # canonical corrected address -> address as loaded, for accepted domain typo fixes
+        self.version = 0     # bumped on every mutation
+        self._free_ids = []  # heap of the ids of removed sources, reused lowest first
+        self._init_entries(capacity)
+
+    def _init_entries(self, capacity):
+        self._arena = bytearray()
+        self._offsets = array('Q', [0])  # entry id -> arena start; id + 1 -> end
+        self._hashes = array('q')        # entry id -> hash of the address bytes
+        self._sources = array('i')       # entry id -> its source id, SEVERAL, or NO_SOURCE once deleted
+        self._several = {}               # entry id -> source bitset, for entries from more than one source
+        self._valid = bytearray()        # entry id -> 1 if the address passed validation
+        self._invalid_ids = set()        # live entry ids flagged invalid
+        self._originals = {}             # entry id -> address as first seen, if not its canonical key
+        self._members = [array('i') for _ in self.paths]  # source id -> entry ids it contributed
+        self._domains = {}               # domain bytes -> entry ids on it; dead ids are skipped on read
+        self._domain_dead = {}           # domain bytes -> dead ids still listed in _domains
+        self._table = array('i', [self.EMPTY]) * capacity
+        self._mask = capacity - 1
+        self._live = 0
+        self._filled = 0                 # table slots holding an id or a tombstone
+        # (sort_by, domain) -> [sorted ids, (sort key, id) pairs appended since, entries covered,
+        # {covered id: lowest source id it is filed under} for entries whose lowest source changed since];
+        # appends extend a view, deletions drop them all
+        self._views = {}
+        self.total_count = 0             # (email, source) pairs
+        self.valid_count = 0
+
+    def intern_path(self, path):
+        """Return the small integer id for a source path"""
+        source_id = self.path_ids.get(path)
+        if source_id is None:
+            if self._free_ids:
+                source_id = heapq.heappop(self._free_ids)
+                self.paths[source_id] = path
+            else:
+                source_id = len(self.paths)
+                self.paths.append(path)
+                self._members.append(array('i'))
+            self.path_ids[path] = source_id
+        return source_id
+
+    def adopt_paths(self, paths):
+        """Give an empty store another store's source list, keeping its ids and the gaps of removed sources"""
+        self.paths = list(paths)
+        self.path_ids = {path: source_id for source_id, path in enumerate(paths) if path is not None}
+        self._free_ids = [source_id for source_id, path in enumerate(paths) if path is None]  # sorted, so a heap
+        self._members = [array('i') for _ in self.paths]
+
+    def fingerprint(self, path):
+        return self.fingerprints.get(path)
+
+    def set_fingerprint(self, path, fingerprint):
+        self.fingerprints[path] = fingerprint
+
+    def record_corrections(self, pairs):
+        self.corrections.update((self.canonical(corrected), original) for corrected, original in pairs)
+
+    def correction_of(self, email):
+        """The address as loaded, if email is a corrected one"""
+        return self.corrections.get(self.canonical(email))
+
+    def _key(self, entry_id):
+        return self._arena[self._offsets[entry_id]:self._offsets[entry_id + 1]]
+
+    def _address(self, entry_id):
+        """The address to show and export for an entry: its original form"""
+        original = self._originals.get(entry_id)
+        return original if original is not None else self._key(entry_id).decode('utf-8')
+
+    def canonical(self, email):
+        return self.canonicalizer(email) if self.canonicalizer else email
+
+    def _lookup(self, key, key_hash):
+        """Return (slot, entry id) for key; entry id is EMPTY if absent and slot is free"""
+        table = self._table
+        mask = self._mask
+        hashes = self._hashes
+        slot = key_hash & mask
+        free = -1
+        while True:
+            entry_id = table[slot]
+            if entry_id == self.EMPTY:
+                return (slot if free == -1 else free), self.EMPTY
+            if entry_id == self.DELETED:
+                if free == -1:
+                    free = slot
+            elif hashes[entry_id] == key_hash and self._key(entry_id) == key:
+                return slot, entry_id
+            slot = (slot + 1) & mask
+
+    def _resize(self):
+        capacity = len(self._table)
+        while capacity < self._live * 3:
+            capacity *= 2
+        table = array('i', [self.EMPTY]) * capacity
+        mask = capacity - 1
+        hashes = self._hashes
+        for entry_id, source_id in enumerate(self._sources):
+            if source_id != self.NO_SOURCE:
+                slot = hashes[entry_id] & mask
+                while table[slot] != self.EMPTY:
+                    slot = (slot + 1) & mask
+                table[slot] = entry_id
+        self._table = table
+        self._mask = mask
+        self._filled = self._live
+
+    def add(self, email, source_id):
+        """Record email as seen in source_id; returns True if the address is new"""
+        entry_id = self._insert(email, source_id)
+        if entry_id is None:
+            return False
+        self._set_valid(entry_id, self.validator(email))
+        return True
+
+    def add_many(self, emails, source_id):
+        """Record a batch of emails from one source; returns the number of new addresses"""
+        new_ids, new_emails = [], []
+        for email in emails:
+            entry_id = self._insert(email, source_id)
+            if entry_id is not None:
+                new_ids.append(entry_id)
+                new_emails.append(email)
+        for entry_id, valid in zip(new_ids, self.validator.validate_many(new_emails)):
+            self._set_valid(entry_id, valid)
+        return len(new_ids)
+
+    def _set_valid(self, entry_id, valid):
+        if valid:
+            self._valid[entry_id] = 1
+            self.valid_count += 1
+        else:
+            self._invalid_ids.add(entry_id)
+
+    def _insert(self, email, source_id):
+        """Record email as seen in source_id; returns the entry id if it is new, still unvalidated"""
+        canonical = self.canonicalizer(email) if self.canonicalizer else email
+        key = canonical.encode('utf-8')
+        key_hash = hash(key)
+        slot, entry_id = self._lookup(key, key_hash)
+        if entry_id != self.EMPTY:
+            first = self._sources[entry_id]
+            if first == source_id:
+                return None
+            if first == self.SEVERAL:
+                bits = self._several[entry_id]
+                if bits >> source_id & 1:
+                    return None
+                self._several[entry_id] = bits | 1 << source_id
+                first = (bits & -bits).bit_length() - 1
+            else:
+                self._sources[entry_id] = self.SEVERAL
+                self._several[entry_id] = 1 << first | 1 << source_id
+            if source_id < first:
+                self._source_moved(entry_id, first)
+            self._members[source_id].append(entry_id)
+            self.total_count += 1
+            self.version += 1
+            return None
+        entry_id = len(self._sources)
+        self._arena += key
+        self._offsets.append(len(self._arena))
+        self._hashes.append(key_hash)
+        self._sources.append(source_id)
+        self._members[source_id].append(entry_id)
+        if canonical != email:
+            self._originals[entry_id] = email
+        self._valid.append(0)
+        domain = key.rpartition(b'@')[2]
+        try:
+            self._domains[domain].append(entry_id)
+        except KeyError:
+            self._domains[domain] = array('i', [entry_id])
+        self.total_count += 1
+        self.version += 1
+        if self._table[slot] == self.EMPTY:
+            self._filled += 1
+        self._table[slot] = entry_id
+        self._live += 1
+        if self._filled * 3 >= len(self._table) * 2:
+            self._resize()
+        return entry_id
+
+    def _find(self, email):
+        key = self.canonical(email).encode('utf-8')
+        return self._lookup(key, hash(key))
+
+    def __contains__(self, email):
+        return self._find(email)[1] != self.EMPTY
+
+    def __getitem__(self, email):
+        entry_id = self._find(email)[1]
+        if entry_id == self.EMPTY:
+            raise KeyError(email)
+        return self._entry_paths(entry_id)
+
+    def __delitem__(self, email):
+        slot, entry_id = self._find(email)
+        if entry_id == self.EMPTY:
+            raise KeyError(email)
+        self._delete(slot, entry_id)
+
+    def _delete(self, slot, entry_id):
+        self._table[slot] = self.DELETED
+        several = self._several.pop(entry_id, None)
+        self.total_count -= 1 if several is None else bin(several).count('1')
+        self._sources[entry_id] = self.NO_SOURCE
+        self._originals.pop(entry_id, None)
+        domain = bytes(self._key(entry_id).rpartition(b'@')[2])
+        dead = self._domain_dead.get(domain, 0) + 1
+        if dead == len(self._domains[domain]):
+            del self._domains[domain]
+            self._domain_dead.pop(domain, None)
+        else:
+            self._domain_dead[domain] = dead
+        if self._valid[entry_id]:
+            self.valid_count -= 1
+        else:
+            self._invalid_ids.discard(entry_id)
+        self._live -= 1
+        self._views.clear()
+        self.version += 1
+
+    def remove_source(self, path):
+        """Take one file's contribution back out; returns how many addresses went with it"""
+        self.fingerprints.pop(path, None)
+        source_id = self.path_ids.get(path)
+        if source_id is None:
+            return 0
+        removed = 0
+        for entry_id in self._members[source_id]:
+            first = self._sources[entry_id]
+            if first == source_id:
+                slot, found = self._lookup(bytes(self._key(entry_id)), self._hashes[entry_id])
+                self._delete(slot, found)
+                removed += 1
+            elif first == self.SEVERAL and self._several[entry_id] >> source_id & 1:
+                bits = self._several[entry_id] & ~(1 << source_id)
+                if not bits & ((1 << source_id) - 1):  # it was the lowest source
+                    self._source_moved(entry_id, source_id)
+                if bits & (bits - 1):
+                    self._several[entry_id] = bits
+                else:
+                    del self._several[entry_id]
+                    self._sources[entry_id] = bits.bit_length() - 1
+                self.total_count -= 1
+        # Nothing carries the id any more, so the next new source can have it
+        self._members[source_id] = array('i')
+        del self.path_ids[path]
+        self.paths[source_id] = None
+        heapq.heappush(self._free_ids, source_id)
+        self.version += 1
+        self.compact()
+        return removed
+
+    def remove_invalid(self):
+        """Delete every entry flagged invalid at insert time; returns how many went"""
+        removed = 0
+        for entry_id in list(self._invalid_ids):
+            slot, found = self._lookup(bytes(self._key(entry_id)), self._hashes[entry_id])
+            self._delete(slot, found)
+            removed += 1
+        self.compact()
+        return removed
+
+    def remove_domain(self, domain):
+        """Delete every address on one domain; returns how many went"""
+        removed = 0
+        for entry_id in self._domain_ids(domain):
+            slot, found = self._lookup(bytes(self._key(entry_id)), self._hashes[entry_id])
+            self._delete(slot, found)
+            removed += 1
+        self.compact()
+        return removed
+
+    def _domain_ids(self, domain):
+        """Live entry ids on a domain, in insertion order"""
+        sources = self._sources
+        return [entry_id for entry_id in self._domains.get(domain.encode('utf-8'), ())
+                if sources[entry_id] != self.NO_SOURCE]
+
+    def domain_count(self, domain):
+        domain = domain.encode('utf-8')
+        return len(self._domains.get(domain, ())) - self._domain_dead.get(domain, 0)
+
+    def _domain_items(self):
+        dead = self._domain_dead
+        for domain, ids in self._domains.items():
+            yield domain.decode('utf-8'), len(ids) - dead.get(domain, 0)
+
+    def domain_counts(self):
+        """Live addresses per domain"""
+        return dict(self._domain_items())
+
+    def top_domains(self, n=10):
+        """The n domains with the most addresses, as (domain, count) pairs"""
+        return heapq.nlargest(n, self._domain_items(), key=itemgetter(1))
+
+    def iter_domain(self, domain, valid_only=False):
+        """Yield the addresses on one domain in insertion order"""
+        valid = self._valid
+        for entry_id in self._domain_ids(domain):
+            if not valid_only or valid[entry_id]:
+                yield self._address(entry_id)
+
+    def __len__(self):
+        return self._live
+
+    def _bits(self, entry_id):
+        """A live entry's sources as a bitset, bit i standing for paths[i]"""
+        first = self._sources[entry_id]
+        return self._several[entry_id] if first == self.SEVERAL else 1 << first
+
+    def _entry_paths(self, entry_id):
+        first = self._sources[entry_id]
+        if first != self.SEVERAL:
+            return [self.paths[first]]
+        paths = []
+        bits = self._several[entry_id]
+        while bits:
+            low = bits & -bits
+            paths.append(self.paths[low.bit_length() - 1])
+            bits ^= low
+        return paths
+
+    def _live_ids(self, start=0):
+        """Iterate the ids of live entries from start on, in insertion order"""
+        sources = self._sources
+        return compress(range(start, len(sources)), map(ne, islice(sources, start, None), repeat(self.NO_SOURCE)))
+
+    def __iter__(self):
+        for entry_id in self._live_ids():
+            yield self._address(entry_id)
+
+    def items(self):
+        """Yield (email, [source paths]) in insertion order"""
+        for entry_id in self._live_ids():
+            yield self._address(entry_id), self._entry_paths(entry_id)
+
+    def entries(self):
+        """Yield (email, valid, [source paths]) in insertion order"""
+        for entry_id in self._live_ids():
+            yield self._address(entry_id), bool(self._valid[entry_id]), self._entry_paths(entry_id)
+
+    def row(self, entry_id):
+        """Return (email, valid, [source paths]) for one entry id"""
+        return self._address(entry_id), bool(self._valid[entry_id]), self._entry_paths(entry_id)
+
+    def _domain_order(self, entry_id):
+        key = self._key(entry_id)
+        return key[key.rfind(b'@') + 1:], key
+
+    def _source_order(self, entry_id):
+        first = self._sources[entry_id]
+        if first == self.SEVERAL:
+            bits = self._several[entry_id]
+            first = (bits & -bits).bit_length() - 1
+        return first, self._key(entry_id)
+
+    def _sort_key(self, sort_by):
+        return {"email": self._key, "domain": self._domain_order, "source": self._source_order}[sort_by]
+
+    def _build_order(self, sort_by, domain):
+        """Live entry ids (on one domain, if given) sorted from scratch"""
+        sources = self._sources
+        if sort_by == "domain" and domain is None:
+            # Domain by domain, so only each domain's own ids are sorted by address
+            ids = []
+            for name in sorted(self._domains):
+                group = [entry_id for entry_id in self._domains[name] if sources[entry_id] != self.NO_SOURCE]
+                group.sort(key=self._key)
+                ids += group
+            return array('i', ids)
+        if domain is not None:
+            ids = self._domain_ids(domain)
+        else:
+            ids = list(self._live_ids())
+        if sort_by != "insertion":
+            ids.sort(key=self._sort_key(sort_by))
+        return array('i', ids)
+
+    def _source_moved(self, entry_id, first):
+        """Tell the source views that an entry filed under lowest source first has a new lowest source"""
+        for (sort_by, _), view in self._views.items():
+            if sort_by == "source":
+                view[3].setdefault(entry_id, first)
+
+    def _view(self, sort_by, domain):
+        """The cached view for a display order, brought up to date
+
+        Entries appended since it was built are appended to an insertion
+        view, and kept as a separately sorted tail of (key, id) pairs for the
+        sorted views until the tail outgrows an eighth of the view, so adding
+        a batch costs its own sort rather than a re-sort of the store. An old
+        address whose lowest source changes is taken out of a source view
+        and re-filed in the tail the same way.
+        """
+        view = self._views.get((sort_by, domain))
+        if view is None:
+            if len(self._views) >= 4:
+                del self._views[next(iter(self._views))]
+            view = [self._build_order(sort_by, domain), [], len(self._sources), {}]
+            self._views[(sort_by, domain)] = view
+            return view
+        if view[3]:
+            self._refile(view, domain)
+        if view[2] < len(self._sources):
+            if domain is None:
+                new = list(self._live_ids(view[2]))
+            else:
+                ids = self._domains.get(domain.encode('utf-8'), ())
+                new = ids[bisect_left(ids, view[2]):].tolist() if ids else []
+            view[2] = len(self._sources)
+            if sort_by == "insertion":
+                view[0].extend(new)
+            elif len(view[1]) + len(new) > len(view[0]) // 8:
+                view[0], view[1] = self._build_order(sort_by, domain), []
+            elif new:
+                key = self._sort_key(sort_by)
+                view[1] += [(key(entry_id), entry_id) for entry_id in new]
+                view[1].sort()
+        return view
+
+    def _refile(self, view, domain):
+        """Move the entries of a source view whose lowest source changed from where they were filed to the tail"""
+        order, tail, covered, moved = view
+        view[3] = {}
+        # Entries appended since the last update are filed with their current key anyway
+        name = None if domain is None else domain.encode('utf-8')
+        moved = {entry_id: first for entry_id, first in moved.items()
+                 if entry_id < covered and (name is None or self._key(entry_id).rpartition(b'@')[2] == name)}
+        if not moved:
+            return
+        if len(tail) + len(moved) > len(order) // 8:
+            view[0], view[1] = self._build_order("source", domain), []
+            return
+
+        def filed(entry_id):
+            first = moved.get(entry_id)
+            return self._source_order(entry_id) if first is None else (first, self._key(entry_id))
+
+        dropped = []
+        for entry_id in moved:
+            key = filed(entry_id)
+            at = bisect_left(order, key, key=filed)
+            if at < len(order) and order[at] == entry_id:
+                dropped.append(at)
+            else:
+                del tail[bisect_left(tail, (key, entry_id))]
+        if dropped:
+            dropped.sort()
+            kept = array('i')
+            start = 0
+            for at in dropped:
+                kept += order[start:at]
+                start = at + 1
+            view[0] = kept + order[start:]
+        tail += [(self._source_order(entry_id), entry_id) for entry_id in moved]
+        tail.sort()
+
+    def ordered_ids(self, sort_by="insertion", domain=None):
+        """Live entry ids (on one domain, if given) in display order"""
+        view = self._view(sort_by, domain)
+        if view[1]:
+            view[0], view[1] = self._build_order(sort_by, domain), []
+        return view[0]
+
+    def _page_ids(self, offset, count, sort_by, domain):
+        """Entry ids of rows [offset, offset + count) in display order, without merging a view's tail"""
+        if sort_by == "insertion" and domain is None and self._live == len(self._sources):
+            return range(offset, min(offset + count, self._live))  # nothing deleted: ids are positions
+        order, tail = self._view(sort_by, domain)[:2]
+        if not tail:
+            return order[offset:offset + count]
+        # Find how many of the first offset rows come from order, then merge forward from there
+        key = self._sort_key(sort_by)
+        lo, hi = max(0, offset - len(tail)), min(offset, len(order))
+        while lo < hi:
+            taken = (lo + hi) // 2
+            if tail[offset - taken - 1][0] > key(order[taken]):
+                lo = taken + 1
+            else:
+                hi = taken
+        i, j = lo, offset - lo
+        ids = []
+        while len(ids) < count and (i < len(order) or j < len(tail)):
+            if j == len(tail) or (i < len(order) and key(order[i]) < tail[j][0]):
+                ids.append(order[i])
+                i += 1
+            else:
+                ids.append(tail[j][1])
+                j += 1
+        return ids
+
+    def page(self, offset, count, sort_by="insertion", domain=None):
+        """Rows [offset, offset + count) of the store (or of one domain) in the given order"""
+        return [self.row(entry_id) for entry_id in self._page_ids(offset, count, sort_by, domain)]
+
+    def sorted_records(self):
+        """Yield (key bytes, source bits, valid, original bytes or b"") for live entries in key order"""
+        originals = self._originals
+        for entry_id in self.ordered_ids("email"):
+            original = originals.get(entry_id)
+            yield (bytes(self._key(entry_id)), self._bits(entry_id), self._valid[entry_id],
+                   b"" if original is None else original.encode('utf-8'))
+
+    def iter_valid(self):
+        """Yield addresses that passed validation, in insertion order"""
+        valid = self._valid
+        for entry_id in self._live_ids():
+            if valid[entry_id]:
+                yield self._address(entry_id)
+
+    def iter_source_bits(self, valid_only=False, domain=None):
+        """Yield (email, source bits) (on one domain, if given) in insertion order, bit i standing for paths[i]"""
+        valid = self._valid
+        for entry_id in self._live_ids() if domain is None else self._domain_ids(domain):
+            if valid[entry_id] or not valid_only:
+                yield self._address(entry_id), self._bits(entry_id)
+
+    def compact(self):
+        """Rebuild the arena without deleted entries once they outnumber live ones"""
+        if len(self._sources) - self._live <= self._live:
+            return
+        live = [(self._key(i), self._hashes[i], self._sources[i], self._several.get(i), self._valid[i],
+                 self._originals.get(i)) for i in self._live_ids()]
+        total_count, valid_count = self.total_count, self.valid_count
+        capacity = 1024
+        while capacity < len(live) * 3:
+            capacity *= 2
+        self._init_entries(capacity)
+        for entry_id, (key, key_hash, first, several, valid, original) in enumerate(live):
+            if original is not None:
+                self._originals[entry_id] = original
+            self._arena += key
+            self._offsets.append(len(self._arena))
+            self._hashes.append(key_hash)
+            self._sources.append(first)
+            self._valid.append(valid)
+            if not valid:
+                self._invalid_ids.add(entry_id)
+            self._domains.setdefault(bytes(key.rpartition(b'@')[2]), array('i')).append(entry_id)
+            if several is None:
+                self._members[first].append(entry_id)
+                continue
+            self._several[entry_id] = several
+            while several:
+                low = several & -several
+                self._members[low.bit_length() - 1].append(entry_id)
+                several ^= low
+        self._live = len(live)
+        self.total_count, self.valid_count = total_count, valid_count
+        self.version += 1
+        self._resize()
+
+    def clear(self):
+        self.paths = []
+        self.path_ids = {}
+        self._free_ids = []
+        self.fingerprints = {}
+        self.corrections = {}
+        self.clear_entries()
+
+    def clear_entries(self):
+        """Drop every entry but keep the interned source paths and fingerprints"""
+        self.version += 1
+        self._init_entries(1024)
+
+
+class SQLiteEmailStore:
+    """On-disk email store in SQLite (WAL mode) with the EmailStore interface
+
+    Addresses, their domain and validity live in an indexed emails table and
+    source files in a sources table joined through email_sources. Counters
+    are kept in a meta table, live addresses per domain in a domains table
+    and each address's lowest source id in its first_source column (indexed
+    for the source order), inside the same transactions as the inserts and
+    deletes, so opening a store of any size is instant.
+
+    page() scrolls by keyset: a page next to the one served before is read
+    from the sort key of the row beside it, so its cost does not grow with
+    the offset; other offsets, such as a jump to a row, use OFFSET.
+
+    With a canonicalizer the unique email column holds the canonical key and
+    original the first form seen, when different; rows written before a
+    canonicalizer was used keep their exact-match keys.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL);
+        CREATE TABLE IF NOT EXISTS emails (
+            id INTEGER PRIMARY KEY,
+            email TEXT UNIQUE NOT NULL,
+            domain TEXT NOT NULL,
+            valid INTEGER NOT NULL,
+            original TEXT,
+            first_source INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS email_sources (
+            email_id INTEGER NOT NULL,
+            source_id INTEGER NOT NULL,
+            PRIMARY KEY (email_id, source_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_emails_domain ON emails(domain, email);
+        CREATE INDEX IF NOT EXISTS idx_emails_valid ON emails(valid);
+        CREATE INDEX IF NOT EXISTS idx_email_sources_source ON email_sources(source_id);
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            digest TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        INSERT OR IGNORE INTO meta VALUES ('unique', 0), ('valid', 0), ('total', 0);
+        CREATE TABLE IF NOT EXISTS domains (domain TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS corrections (corrected TEXT PRIMARY KEY, original TEXT NOT NULL);
+    """
+    ORDER_BY = {
+        "insertion": "id",
+        "email": "email",
+        "domain": "domain, email",
+        "source": "first_source, email",
+    }
+    SORT_KEYS = EmailStore.SORT_KEYS
+
+    def __init__(self, path, validator, canonicalizer=None):
+        self.path = path
+        self.validator = validator
+        self.canonicalizer = canonicalizer
+        self.version = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(emails)")]
+        if "original" not in columns:
+            self.conn.execute("ALTER TABLE emails ADD COLUMN original TEXT")  # stores from before canonical keys
+        if "first_source" not in columns:
+            # Store from before first_source: fill it once, then keep it up to date
+            self.conn.execute("ALTER TABLE emails ADD COLUMN first_source INTEGER")
+            self.conn.execute("UPDATE emails SET first_source = "
+                              "(SELECT MIN(source_id) FROM email_sources WHERE email_id = emails.id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_emails_first_source ON emails(first_source, email)")
+        if self.conn.execute("SELECT NOT EXISTS (SELECT 1 FROM domains) AND EXISTS (SELECT 1 FROM emails)").fetchone()[0]:
+            # Store from before the domains table: count once, then keep it up to date
+            self.conn.execute("INSERT INTO domains SELECT domain, COUNT(*) FROM emails GROUP BY domain")
+        self.conn.commit()
+        self.paths = [row[0] for row in self.conn.execute("SELECT path FROM sources ORDER BY id")]
+        self.path_ids = {path: i for i, path in enumerate(self.paths)}
+        self.fingerprints = {row[0]: tuple(row[1:]) for row in
+                             self.conn.execute("SELECT path, size, mtime_ns, digest FROM fingerprints")}
+        self._last_page = None  # (sort_by, domain, version, offset, sort keys of its rows) of the last page served
+
+    def close(self):
+        self.conn.close()
+
+    def canonical(self, email):
+        return self.canonicalizer(email) if self.canonicalizer else email
+
+    def _counter(self, key):
+        return self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def _bump_counters(self, unique=0, valid=0, total=0):
+        self.conn.executemany("UPDATE meta SET value = value + ? WHERE key = ?",
+                              [(unique, 'unique'), (valid, 'valid'), (total, 'total')])
+        self.version += 1
+
+    def _bump_domains(self, counts):
+        """Apply (domain, delta) pairs to the domains table, dropping domains that reach zero"""
+        self.conn.executemany("INSERT INTO domains VALUES (?, ?) "
+                              "ON CONFLICT(domain) DO UPDATE SET count = count + excluded.count", counts)
+        self.conn.execute("DELETE FROM domains WHERE count <= 0")
+
+    @property
+    def total_count(self):
+        return self._counter('total')
+
+    @property
+    def valid_count(self):
+        return self._counter('valid')
+
+    def __len__(self):
+        return self._counter('unique')
+
+    def intern_path(self, path):
+        """Return the source id for a path, adding it to the sources table if new"""
+        source_id = self.path_ids.get(path)
+        if source_id is None:
+            source_id = len(self.paths)
+            with self.conn:
+                self.conn.execute("INSERT INTO sources(id, path) VALUES (?, ?)", (source_id, path))
+            self.paths.append(path)
+            self.path_ids[path] = source_id
+        return source_id
+
+    def fingerprint(self, path):
+        return self.fingerprints.get(path)
+
+    def set_fingerprint(self, path, fingerprint):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)", (path, *fingerprint))
+        self.fingerprints[path] = fingerprint
+
+    def record_corrections(self, pairs):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO corrections VALUES (?, ?)",
+                                  [(self.canonical(corrected), original) for corrected, original in pairs])
+
+    def correction_of(self, email):
+        """The address as loaded, if email is a corrected one"""
+        row = self.conn.execute("SELECT original FROM corrections WHERE corrected = ?",
+                                (self.canonical(email),)).fetchone()
+        return row[0] if row else None
+
+    def remove_source(self, path):
+        """Take one file's contribution back out; returns how many addresses went with it"""
+        source_id = self.path_ids.get(path)
+        with self.conn:
+            self.conn.execute("DELETE FROM fingerprints WHERE path = ?", (path,))
+            self.fingerprints.pop(path, None)
+            if source_id is None:
+                return 0
+            self.conn.execute("DROP TABLE IF EXISTS temp.touched")
+            self.conn.execute("CREATE TEMP TABLE touched AS SELECT email_id FROM email_sources WHERE source_id = ?",
+                              (source_id,))
+            pairs = self.conn.execute("DELETE FROM email_sources WHERE source_id = ?", (source_id,)).rowcount
+            orphans = ("id IN (SELECT email_id FROM temp.touched) AND NOT EXISTS "
+                       "(SELECT 1 FROM email_sources WHERE email_id = emails.id)")
+            valid = self.conn.execute(f"SELECT COUNT(*) FROM emails WHERE valid = 1 AND {orphans}").fetchone()[0]
+            self._bump_domains(self.conn.execute(
+                f"SELECT domain, -COUNT(*) FROM emails WHERE {orphans} GROUP BY domain").fetchall())
+            removed = self.conn.execute(f"DELETE FROM emails WHERE {orphans}").rowcount
+            self.conn.execute("UPDATE emails SET first_source = "
+                              "(SELECT MIN(source_id) FROM email_sources WHERE email_id = emails.id) "
+                              "WHERE first_source = ? AND id IN (SELECT email_id FROM temp.touched)", (source_id,))
+            self.conn.execute("DROP TABLE temp.touched")
+            self._bump_counters(-removed, -valid, -pairs)
+        return removed
+
+    def add_many(self, emails, source_id):
+        """Bulk-insert a batch from one source in a single transaction; returns new addresses
+
+        Rows go in marked valid and only the ones the table did not have yet
+        are validated afterwards, so a batch of known addresses costs no
+        validation.
+        """
+        canonicalizer = self.canonicalizer
+        rows = []
+        for email in emails:
+            key = canonicalizer(email) if canonicalizer else email
+            rows.append((key, key[key.rfind('@') + 1:], None if key == email else email, source_id))
+        with self.conn:
+            cur = self.conn.cursor()
+            last_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM emails").fetchone()[0]
+            cur.executemany("INSERT OR IGNORE INTO emails(email, domain, original, first_source, valid) "
+                            "VALUES (?, ?, ?, ?, 1)", rows)
+            new = max(cur.rowcount, 0)
+            invalid = []
+            if new:
+                # New rows always get ids past the old maximum
+                added = cur.execute("SELECT id, COALESCE(original, email) FROM emails WHERE id > ?",
+                                    (last_id,)).fetchall()
+                flags = self.validator.validate_many([email for _, email in added])
+                invalid = [(email_id,) for (email_id, _), valid in zip(added, flags) if not valid]
+                cur.executemany("UPDATE emails SET valid = 0 WHERE id = ?", invalid)
+                self._bump_domains(cur.execute("SELECT domain, COUNT(*) FROM emails WHERE id > ? GROUP BY domain",
+                                               (last_id,)).fetchall())
+            cur.executemany(
+                "INSERT OR IGNORE INTO email_sources(email_id, source_id) SELECT id, ? FROM emails WHERE email = ?",
+                [(source_id, row[0]) for row in rows])
+            pairs = max(cur.rowcount, 0)
+            if source_id < len(self.paths) - 1 and pairs > new:
+                # An older source loaded again can be the new lowest source of addresses it shares
+                cur.executemany("UPDATE emails SET first_source = ?1 WHERE email = ?2 AND first_source > ?1",
+                                [(source_id, row[0]) for row in rows])
+            self._bump_counters(new, new - len(invalid), pairs)
+        return new
+
+    def add(self, email, source_id):
+        return self.add_many([email], source_id) == 1
+
+    def __contains__(self, email):
+        return self.conn.execute("SELECT 1 FROM emails WHERE email = ?",
+                                 (self.canonical(email),)).fetchone() is not None
+
+    def _paths_for(self, email_ids):
+        """Map email id -> [source paths] for a small set of ids"""
+        found = {}
+        if not email_ids:
+            return found
+        marks = ",".join("?" * len(email_ids))
+        for email_id, source_id in self.conn.execute(
+                f"SELECT email_id, source_id FROM email_sources WHERE email_id IN ({marks}) "
+                f"ORDER BY source_id", list(email_ids)):
+            found.setdefault(email_id, []).append(self.paths[source_id])
+        return found
+
+    def __getitem__(self, email):
+        row = self.conn.execute("SELECT id FROM emails WHERE email = ?", (self.canonical(email),)).fetchone()
+        if row is None:
+            raise KeyError(email)
+        return self._paths_for([row[0]]).get(row[0], [])
+
+    def __delitem__(self, email):
+        row = self.conn.execute("SELECT id, valid, domain FROM emails WHERE email = ?",
+                                (self.canonical(email),)).fetchone()
+        if row is None:
+            raise KeyError(email)
+        with self.conn:
+            pairs = self.conn.execute("DELETE FROM email_sources WHERE email_id = ?", (row[0],)).rowcount
+            self.conn.execute("DELETE FROM emails WHERE id = ?", (row[0],))
+            self._bump_domains([(row[2], -1)])
+            self._bump_counters(-1, -row[1], -pairs)
+
+    def _seek(self, offset, count, sort_by, domain):
+        """(comparison, sort key) that finds row offset from the last page served, or None if OFFSET must"""
+        last = self._last_page
+        if last is None or last[:3] != (sort_by, domain, self.version):
+            return None
+        start, keys = last[3], last[4]
+        if start <= offset < start + len(keys):
+            return ">=", keys[offset - start]
+        if keys and offset == start + len(keys):
+            return ">", keys[-1]
+        if start <= offset + count < start + len(keys):
+            return "<", keys[offset + count - start]  # scrolled back: read the rows before this one backwards
+        return None
+
+    def page(self, offset, count, sort_by="insertion", domain=None):
+        """Rows [offset, offset + count) (of one domain, if given) in the given order via an indexed query"""
+        order = self.ORDER_BY[sort_by]
+        conditions, params = (["domain = ?"], [domain]) if domain is not None else ([], [])
+        seek = self._seek(offset, count, sort_by, domain)
+        if seek is not None:
+            conditions.append(f"({order}) {seek[0]} ({', '.join('?' * len(seek[1]))})")
+            params += seek[1]
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        select = f"SELECT id, COALESCE(original, email), valid, {order} FROM emails {where}"
+        if seek is None:
+            rows = self.conn.execute(f"{select}ORDER BY {order} LIMIT ? OFFSET ?", (*params, count, offset)).fetchall()
+        elif seek[0] == "<":
+            backwards = ", ".join(f"{column} DESC" for column in order.split(", "))
+            rows = self.conn.execute(f"{select}ORDER BY {backwards} LIMIT ?", (*params, count)).fetchall()[::-1]
+        else:
+            rows = self.conn.execute(f"{select}ORDER BY {order} LIMIT ?", (*params, count)).fetchall()
+        self._last_page = (sort_by, domain, self.version, offset, [row[3:] for row in rows])
+        paths = self._paths_for([row[0] for row in rows])
+        return [(email, bool(valid), paths.get(email_id, [])) for email_id, email, valid, *_ in rows]
+
+    def _stream(self, sql, params=(), batch=10000):
+        cur = self.conn.cursor()
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                break
+            yield from rows
+
+    def entries(self, batch=10000):
+        """Yield (email, valid, [source paths]) in insertion order, keyset-paged by id"""
+        last_id = -1
+        while True:
+            rows = self.conn.execute("SELECT id, COALESCE(original, email), valid FROM emails "
+                                     "WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch)).fetchall()
+            if not rows:
+                break
+            paths = self._paths_for([row[0] for row in rows])
+            for email_id, email, valid in rows:
+                yield email, bool(valid), paths.get(email_id, [])
+            last_id = rows[-1][0]
+
+    def items(self):
+        for email, _, paths in self.entries():
+            yield email, paths
+
+    def __iter__(self):
+        for (email,) in self._stream("SELECT COALESCE(original, email) FROM emails ORDER BY id"):
+            yield email
+
+    def iter_valid(self):
+        for (email,) in self._stream("SELECT COALESCE(original, email) FROM emails WHERE valid = 1 ORDER BY id"):
+            yield email
+
+    def iter_source_bits(self, valid_only=False, domain=None):
+        """Yield (email, source bits) (on one domain, if given) in insertion order, bit i standing for paths[i]"""
+        conditions = (["valid = 1"] if valid_only else []) + (["domain = ?"] if domain is not None else [])
+        sql = ("SELECT COALESCE(original, email), group_concat(source_id) FROM emails "
+               "JOIN email_sources ON email_id = id" + "".join(f" {'AND' if i else 'WHERE'} {condition}"
+                                                              for i, condition in enumerate(conditions))
+               + " GROUP BY id ORDER BY id")
+        masks = {}
+        for email, source_ids in self._stream(sql, () if domain is None else (domain,)):
+            bits = masks.get(source_ids)
+            if bits is None:
+                bits = masks[source_ids] = sum(1 << int(source_id) for source_id in source_ids.split(','))
+            yield email, bits
+
+    def remove_invalid(self):
+        """Delete every entry flagged invalid at insert time; returns how many went"""
+        with self.conn:
+            pairs = self.conn.execute(
+                "DELETE FROM email_sources WHERE email_id IN (SELECT id FROM emails WHERE valid = 0)").rowcount
+            self._bump_domains(self.conn.execute(
+                "SELECT domain, -COUNT(*) FROM emails WHERE valid = 0 GROUP BY domain").fetchall())
+            removed = self.conn.execute("DELETE FROM emails WHERE valid = 0").rowcount
+            self._bump_counters(-removed, 0, -pairs)
+        return removed
+
+    def remove_domain(self, domain):
+        """Delete every address on one domain through the domain index; returns how many went"""
+        with self.conn:
+            pairs = self.conn.execute(
+                "DELETE FROM email_sources WHERE email_id IN (SELECT id FROM emails WHERE domain = ?)",
+                (domain,)).rowcount
+            valid = self.conn.execute("SELECT COUNT(*) FROM emails WHERE domain = ? AND valid = 1",
+                                      (domain,)).fetchone()[0]
+            removed = self.conn.execute("DELETE FROM emails WHERE domain = ?", (domain,)).rowcount
+            self.conn.execute("DELETE FROM domains WHERE domain = ?", (domain,))
+            self._bump_counters(-removed, -valid, -pairs)
+        return removed
+
+    def domain_count(self, domain):
+        row = self.conn.execute("SELECT count FROM domains WHERE domain = ?", (domain,)).fetchone()
+        return row[0] if row else 0
+
+    def domain_counts(self):
+        """Live addresses per domain"""
+        return dict(self.conn.execute("SELECT domain, count FROM domains"))
+
+    def top_domains(self, n=10):
+        """The n domains with the most addresses, as (domain, count) pairs"""
+        return self.conn.execute("SELECT domain, count FROM domains ORDER BY count DESC LIMIT ?", (n,)).fetchall()
+
+    def iter_domain(self, domain, valid_only=False):
+        """Yield the addresses on one domain in insertion order"""
+        sql = "SELECT COALESCE(original, email) FROM emails WHERE domain = ?" + (" AND valid = 1" if valid_only else "")
+        for (email,) in self._stream(sql + " ORDER BY id", (domain,)):
+            yield email
+
+    def compact(self):
+        pass
+
+    def clear_entries(self):
+        """Drop every entry but keep the interned source paths"""
+        with self.conn:
+            self.conn.execute("DELETE FROM email_sources")
+            self.conn.execute("DELETE FROM emails")
+            self.conn.execute("DELETE FROM domains")
+            self.conn.execute("UPDATE meta SET value = 0")
+        self.version += 1
+
+    def clear(self):
+        self.clear_entries()
+        with self.conn:
+            self.conn.execute("DELETE FROM sources")
+            self.conn.execute("DELETE FROM fingerprints")
+            self.conn.execute("DELETE FROM corrections")
+        self.paths = []
+        self.path_ids = {}
+        self.fingerprints = {}
+
+
+def source_ids_field(bits):
+    """Source bits as the comma-separated source ids a spill file stores (b"3", b"3,17")"""
+    if not bits & (bits - 1):
+        return b"%d" % (bits.bit_length() - 1)
+    ids = []
+    while bits:
+        low = bits & -bits
+        ids.append(b"%d" % (low.bit_length() - 1))
+        bits ^= low
+    return b",".join(ids)
+
+
+def field_source_bits(field):
+    """Source bits from a spill file's comma-separated source ids"""
+    if b"," not in field:
+        return 1 << int(field)
+    bits = 0
+    for source_id in field.split(b","):
+        bits |= 1 << int(source_id)
+    return bits
+
+
+class ExternalDedup:
+    """Spill-to-disk dedup for lists larger than the in-memory budget
+
+    Whenever the store outgrows its budget its entries are written out as a
+    sorted run of "key\tsource ids\tvalid\toriginal" lines (source ids
+    comma-separated, original empty unless it differs from the key) and the
+    store is emptied.
+    merge() k-way merges every run into one sorted, deduplicated file in the
+    same format, so list size is bounded by disk rather than RAM. Each run's
+    counts are kept so a spilled load can still report its progress, and
+    remove_source() rewrites the runs a replaced file went into.
+    """
+
+    def __init__(self, spill_dir=None):
+        self.spill_dir = spill_dir
+        self.work_dir = None
+        self.runs = []
+        self.tallies = {}  # run -> [rows, valid rows, (email, source) pairs, OR of every row's source bits]
+        self.collapsed = 0  # duplicates found across runs by the last merge
+
+    @property
+    def rows(self):
+        """Rows across the runs; an address spilled more than once counts each time until merge()"""
+        return sum(tally[0] for tally in self.tallies.values())
+
+    @property
+    def valid_count(self):
+        return sum(tally[1] for tally in self.tallies.values())
+
+    @property
+    def total_count(self):
+        return sum(tally[2] for tally in self.tallies.values())
+
+    def _new_path(self, prefix):
+        if self.work_dir is None:
+            self.work_dir = tempfile.mkdtemp(prefix="qes_spill_", dir=self.spill_dir)
+        fd, path = tempfile.mkstemp(prefix=prefix, suffix=".tsv", dir=self.work_dir)
+        os.close(fd)
+        return path
+
+    def spill(self, store):
+        """Write the store's entries as a sorted run and empty it"""
+        path = self._new_path("run_")
+        self.tallies[path] = self._write_run(path, store.sorted_records())
+        self.runs.append(path)
+        store.clear_entries()
+
+    @staticmethod
+    def _write_run(path, records):
+        """Write sorted records to path as a run; returns its tally"""
+        rows = valid_rows = total = mask = 0
+        with open(path, 'wb') as f:
+            for key, bits, valid, original in records:
+                f.write(b"%s\t%s\t%d\t%s\n" % (key, source_ids_field(bits), valid, original))
+                rows += 1
+                valid_rows += valid
+                total += bin(bits).count('1')
+                mask |= bits
+        return [rows, valid_rows, total, mask]
+
+    def adopt(self, path):
+        """Treat an earlier merged file as one more sorted run"""
+        rows = valid_rows = total = mask = 0
+        for _, bits, valid, _ in self._read_run(path):
+            rows += 1
+            valid_rows += valid
+            total += bin(bits).count('1')
+            mask |= bits
+        self.tallies[path] = [rows, valid_rows, total, mask]
+        self.runs.append(path)
+
+    def remove_source(self, source_id):
+        """Take one source out of every run holding it; returns how many rows went with it
+
+        Each affected run is rewritten in place, so a replaced file costs a
+        pass over the runs it went into rather than leaving its old
+        addresses to come back at merge().
+        """
+        bit = 1 << source_id
+        removed = 0
+        for run in self.runs:
+            if not self.tallies[run][3] & bit:
+                continue
+            records = ((key, bits & ~bit, valid, original)
+                       for key, bits, valid, original in self._read_run(run) if bits != bit)
+            tally = self._write_run(run + ".tmp", records)
+            os.replace(run + ".tmp", run)
+            removed += self.tallies[run][0] - tally[0]
+            self.tallies[run] = tally
+        return removed
+
+    def persist(self, store, directory):
+        """Move every run into directory and write the store beside them, so a crash cannot lose either
+
+        The store is written as a snapshot run but keeps its entries, so a
+        checkpoint does not push a load onto disk. Runs and snapshots
+        already there from an older checkpoint but no longer listed are
+        covered by a later merge or snapshot and are deleted. Returns the
+        run paths, snapshot included.
+        """
+        directory = os.path.abspath(directory)
+        os.makedirs(directory, exist_ok=True)
+        runs = []
+        for run in self.runs:
+            if os.path.dirname(os.path.abspath(run)) != directory:
+                target = os.path.join(directory, os.path.basename(run))
+                shutil.move(run, target)
+                self.tallies[target] = self.tallies.pop(run)
+                run = target
+            runs.append(run)
+        self.runs = runs
+        runs = list(runs)
+        if len(store):
+            fd, snapshot = tempfile.mkstemp(prefix="snapshot_", suffix=".tsv", dir=directory)
+            os.close(fd)
+            self._write_run(snapshot, store.sorted_records())
+            runs.append(snapshot)
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".tsv") and path not in runs:
+                os.remove(path)
+        return runs
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, 'rb') as f:
+            for line in f:
+                key, bits, valid, original = line.rstrip(b"\n").split(b"\t")
+                yield key, field_source_bits(bits), valid == b"1", original
+
+    def _combine(self, records):
+        """Collapse runs of equal keys from a sorted stream, OR-ing their sources
+
+        The first run's original form and validity win, as in the store.
+        """
+        current, current_bits, current_valid, current_original = None, 0, False, b""
+        for key, bits, valid, original in records:
+            if key == current:
+                current_bits |= bits
+                self.collapsed += 1
+                continue
+            if current is not None:
+                yield current, current_bits, current_valid, current_original
+            current, current_bits, current_valid, current_original = key, bits, valid, original
+        if current is not None:
+            yield current, current_bits, current_valid, current_original
+
+    def merge(self, store):
+        """Merge all runs plus the store's remaining entries into a SpilledEmailList"""
+        if len(store):
+            self.spill(store)
+        path = self._new_path("merged_")
+        self.collapsed = 0
+        merged = heapq.merge(*(self._read_run(run) for run in self.runs), key=itemgetter(0))
+        index = array('Q')
+        domains = {}
+        domain_index = {}
+        unique = valid_count = total = 0
+        with open(path, 'wb') as out:
+            for key, bits, valid, original in self._combine(merged):
+                domain = key[key.rfind(b'@') + 1:]
+                seen = domains.get(domain, 0)
+                if unique % SpilledEmailList.INDEX_STRIDE == 0 or seen % SpilledEmailList.DOMAIN_STRIDE == 0:
+                    offset = out.tell()
+                    if unique % SpilledEmailList.INDEX_STRIDE == 0:
+                        index.append(offset)
+                    if seen % SpilledEmailList.DOMAIN_STRIDE == 0:
+                        domain_index.setdefault(domain, array('Q')).append(offset)
+                out.write(b"%s\t%s\t%d\t%s\n" % (key, source_ids_field(bits), valid, original))
+                unique += 1
+                valid_count += valid
+                total += bin(bits).count('1')
+                domains[domain] = seen + 1
+        for run in self.runs:
+            # Checkpointed runs stay put until their checkpoint is discarded
+            if self.work_dir is not None and os.path.dirname(run) == self.work_dir:
+                os.remove(run)
+        self.runs = []
+        self.tallies = {}
+        merged_list = SpilledEmailList(path, list(store.paths), index, unique, valid_count, total, domains,
+                                       domain_index)
+        merged_list.fingerprints = dict(store.fingerprints)
+        merged_list.corrections = dict(store.corrections)
+        merged_list.canonicalizer = store.canonicalizer
+        return merged_list
+
+    def cleanup(self):
+        """Remove the spill directory and everything in it"""
+        if self.work_dir is not None:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.work_dir = None
+        self.runs = []
+        self.tallies = {}
+
+
+class SpilledEmailList:
+    """Read-mostly view over a merged, address-sorted spill file
+
+    Offers the same read surface as EmailStore (counters, page, entries,
+    iter_valid) by streaming the file. A sparse index of every
+    INDEX_STRIDE-th line offset makes paging cost O(stride), not O(n).
+    Rows only come in address order, the order of the file. Per-domain
+    counts and a sparse index of every DOMAIN_STRIDE-th address of each
+    domain are taken while the file is written, so a domain view seeks
+    near its page and stops after the domain's last address; removals
+    stream the whole file.
+    """
+
+    INDEX_STRIDE = 1024
+    DOMAIN_STRIDE = 64
+    SORT_KEYS = ("email",)
+
+    def __init__(self, path, paths, index, unique, valid_count, total_count, domain_counts=None, domain_index=None):
+        self.path = path
+        self.paths = paths
+        self.fingerprints = {}
+        self.corrections = {}
+        self.canonicalizer = None  # the merged store's, so corrections can be looked up by key
+        self.version = 0
+        self._index = index
+        self._unique = unique
+        self._domain_counts = domain_counts or {}  # domain bytes -> addresses on it
+        self._domain_index = domain_index or {}  # domain bytes -> offsets of its every DOMAIN_STRIDE-th line
+        self.valid_count = valid_count
+        self.total_count = total_count
+
+    def __len__(self):
+        return self._unique
+
+    def _source_paths(self, bits):
+        return [path for source_id, path in enumerate(self.paths) if bits >> source_id & 1]
+
+    def _records(self, offset=0):
+        with open(self.path, 'rb') as f:
+            block, skip = divmod(offset, self.INDEX_STRIDE)
+            if block >= len(self._index):
+                return
+            f.seek(self._index[block])
+            for line in f:
+                if skip:
+                    skip -= 1
+                    continue
+                key, bits, valid, original = line.rstrip(b"\n").split(b"\t")
+                yield (original or key).decode('utf-8'), field_source_bits(bits), valid == b"1"
+
+    def _domain_records(self, domain, offset=0):
+        """_records() restricted to one domain, from its offset-th address to its last"""
+        name = domain.encode('utf-8')
+        block, skip = divmod(offset, self.DOMAIN_STRIDE)
+        starts = self._domain_index.get(name, ())
+        if block >= len(starts):
+            return
+        left = self._domain_counts[name] - block * self.DOMAIN_STRIDE  # the domain's lines from there on
+        suffix = b"@" + name
+        with open(self.path, 'rb') as f:
+            f.seek(starts[block])
+            for line in f:
+                key, rest = line.split(b"\t", 1)
+                if not key.endswith(suffix):
+                    continue
+                if skip:
+                    skip -= 1
+                else:
+                    bits, valid, original = rest.rstrip(b"\n").split(b"\t")
+                    yield (original or key).decode('utf-8'), field_source_bits(bits), valid == b"1"
+                left -= 1
+                if not left:
+                    return
+
+    def page(self, offset, count, sort_by="email", domain=None):
+        """Rows [offset, offset + count) (of one domain, if given) in address order, the only one there is"""
+        if sort_by not in self.SORT_KEYS:
+            raise ValueError(f"a spilled list is only in address order, not by {sort_by}")
+        records = self._records(offset) if domain is None else self._domain_records(domain, offset)
+        return [(email, valid, self._source_paths(bits)) for email, bits, valid in islice(records, count)]
+
+    def domain_count(self, domain):
+        return self._domain_counts.get(domain.encode('utf-8'), 0)
+
+    def domain_counts(self):
+        """Addresses per domain"""
+        return {domain.decode('utf-8'): count for domain, count in self._domain_counts.items()}
+
+    def top_domains(self, n=10):
+        """The n domains with the most addresses, as (domain, count) pairs"""
+        return [(domain.decode('utf-8'), count)
+                for domain, count in heapq.nlargest(n, self._domain_counts.items(), key=itemgetter(1))]
+
+    def iter_domain(self, domain, valid_only=False):
+        for email, _, valid in self._domain_records(domain):
+            if valid or not valid_only:
+                yield email
+
+    def entries(self):
+        for email, bits, valid in self._records():
+            yield email, valid, self._source_paths(bits)
+
+    def items(self):
+        for email, bits, _ in self._records():
+            yield email, self._source_paths(bits)
+
+    def __iter__(self):
+        for email, _, _ in self._records():
+            yield email
+
+    def iter_valid(self):
+        for email, _, valid in self._records():
+            if valid:
+                yield email
+
+    def iter_source_bits(self, valid_only=False, domain=None):
+        records = self._records() if domain is None else self._domain_records(domain)
+        for email, bits, valid in records:
+            if valid or not valid_only:
+                yield email, bits
+
+    def fingerprint(self, path):
+        return self.fingerprints.get(path)
+
+    def set_fingerprint(self, path, fingerprint):
+        self.fingerprints[path] = fingerprint
+
+    def correction_of(self, email):
+        return self.corrections.get(self.canonicalizer(email) if self.canonicalizer else email)
+
+    def _rewrite(self, keep_bits, keep_invalid=True, drop_domain=None):
+        """Stream-rewrite the file, masking source bits and dropping emptied entries"""
+        tmp_path = self.path + ".tmp"
+        index = array('Q')
+        domains = {}
+        domain_index = {}
+        drop_domain = None if drop_domain is None else drop_domain.encode('utf-8')
+        kept = valid_count = total = 0
+        with open(self.path, 'rb') as src, open(tmp_path, 'wb') as out:
+            for line in src:
+                key, bits, valid, original = line.rstrip(b"\n").split(b"\t")
+                bits = field_source_bits(bits) & keep_bits
+                if not bits or (valid != b"1" and not keep_invalid):
+                    continue
+                domain = key[key.rfind(b'@') + 1:]
+                if domain == drop_domain:
+                    continue
+                seen = domains.get(domain, 0)
+                if kept % self.INDEX_STRIDE == 0 or seen % self.DOMAIN_STRIDE == 0:
+                    offset = out.tell()
+                    if kept % self.INDEX_STRIDE == 0:
+                        index.append(offset)
+                    if seen % self.DOMAIN_STRIDE == 0:
+                        domain_index.setdefault(domain, array('Q')).append(offset)
+                out.write(b"%s\t%s\t%s\t%s\n" % (key, source_ids_field(bits), valid, original))
+                kept += 1
+                valid_count += valid == b"1"
+                total += bin(bits).count('1')
+                domains[domain] = seen + 1
+        os.replace(tmp_path, self.path)
+        removed = self._unique - kept
+        self._index, self._unique, self.valid_count, self.total_count = index, kept, valid_count, total
+        self._domain_counts, self._domain_index = domains, domain_index
+        self.version += 1
+        return removed
+
+    def remove_invalid(self):
+        """Stream-rewrite the file without invalid entries; returns how many went"""
+        return self._rewrite(-1, keep_invalid=False)
+
+    def remove_domain(self, domain):
+        """Stream-rewrite the file without one domain's addresses"""
+        if not self.domain_count(domain):
+            return 0
+        return self._rewrite(-1, drop_domain=domain)
+
+    def remove_source(self, path):
+        """Stream-rewrite the file without one source's contribution"""
+        self.fingerprints.pop(path, None)
+        if path not in self.paths:
+            return 0
+        source_id = self.paths.index(path)
+        removed = self._rewrite(~(1 << source_id))
+        self.paths[source_id] = None  # free for the next store to reuse
+        return removed
+
+
+class SuppressionList:
+    """Unsubscribe and bounce suppression as a sorted table of 64-bit address hashes
+
+    Addresses are reduced to their mailbox key (the canonicalizer's, else
+    lowercased) and hashed to 8 bytes of BLAKE2b, so tens of millions of
+    entries cost 8 bytes each. The table is mmap'd rather than read in: a
+    bucket index on the top hash bits narrows a lookup to a few dozen
+    neighbours, so membership is O(1). An optional blocked Bloom filter in
+    front keeps all of an address's bits in one 64-bit word and turns most
+    misses away with a single read.
+
+    The file is a cache of the source lists, built by build(); it records
+    their fingerprints so stale() can tell when it needs rebuilding.
+    """
+
+    MAGIC = b"QSUPPRS1"
+    HEADER = struct.Struct("<QIIQQ")  # count, bucket bits, bloom probes, bloom words, metadata bytes
+    BUCKET_SIZE = 32  # target hashes per bucket
+    MAX_BUCKET_BITS = 24
+    BLOOM_PROBES = 5
+    CHUNK = 65536  # addresses hashed and looked up per bulk step
+
+    def __init__(self, path, canonicalizer=None):
+        self.path = path
+        self.canonicalizer = canonicalizer
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(self.MAGIC)] != self.MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a suppression list")
+        offset = len(self.MAGIC)
+        self.count, self.bucket_bits, self.probes, bloom_words, meta_size = self.HEADER.unpack_from(self._mm, offset)
+        offset += self.HEADER.size
+        self.meta = json.loads(self._mm[offset:offset + meta_size])
+        offset += self._padded(meta_size)
+
+        # numpy views serve the bulk path, 'Q' memoryviews the per-address one
+        self._view = memoryview(self._mm)
+        buckets = (1 << self.bucket_bits) + 1
+        self._bucket_start = np.frombuffer(self._mm, np.uint64, buckets, offset)
+        self._starts = self._view[offset:offset + 8 * buckets].cast('Q')
+        offset += 8 * buckets
+        self._hashes = np.frombuffer(self._mm, np.uint64, self.count, offset)
+        self._table = self._view[offset:offset + 8 * self.count].cast('Q')
+        offset += 8 * self.count
+        self._bloom = np.frombuffer(self._mm, np.uint64, bloom_words, offset) if bloom_words else None
+        self._words = self._view[offset:offset + 8 * bloom_words].cast('Q') if bloom_words else None
+        self._shift = 64 - self.bucket_bits
+
+    @staticmethod
+    def _padded(size):
+        return (size + 7) & ~7
+
+    @classmethod
+    def build(cls, sources, path, extractor, canonicalizer=None, bloom_bits=16, progress=None,
+              chunk_rows=50000, chunk_bytes=4 * 1024 * 1024):
+        """Hash every address in the source lists into a suppression file at path and open it
+
+        Sources are read with the extractor, so any format the cleaner loads
+        works. The table is written next to path and swapped in when done;
+        on Windows, close a list still open on path first.
+        """
+        key = canonicalizer or str.lower
+        parts = []
+        fingerprints = []
+        for source in sources:
+            fingerprints.append([source, list(file_fingerprint(source))])
+            for emails in extractor.iter_file(source, chunk_rows, chunk_bytes):
+                parts.append(cls.hash_keys([key(email) for email in emails]))
+            if progress:
+                progress(f"Hashed {sum(map(len, parts)):,} suppressed addresses ({os.path.basename(source)})")
+        hashes = np.concatenate(parts) if parts else np.zeros(0, np.uint64)
+        del parts
+        hashes.sort()
+        if len(hashes):
+            hashes = hashes[np.concatenate(([True], hashes[1:] != hashes[:-1]))]
+        count = len(hashes)
+
+        bucket_bits = min(cls.MAX_BUCKET_BITS, (count // cls.BUCKET_SIZE).bit_length())
+        bounds = np.arange(1 << bucket_bits, dtype=np.uint64) << np.uint64(64 - bucket_bits) if bucket_bits \
+            else np.zeros(1, np.uint64)
+        bucket_start = np.append(np.searchsorted(hashes, bounds), count).astype(np.uint64)
+
+        bloom = np.zeros(max(1, count * bloom_bits // 64) if bloom_bits and count else 0, np.uint64)
+        for start in range(0, count if len(bloom) else 0, 1 << 22):
+            part = hashes[start:start + (1 << 22)]
+            np.bitwise_or.at(bloom, (part & np.uint64(0xFFFFFFFF)) % np.uint64(len(bloom)),
+                             cls._bloom_masks(part, cls.BLOOM_PROBES))
+
+        meta = json.dumps({"sources": fingerprints, "canonical": canonicalizer is not None,
+                           "built": datetime.now().isoformat(timespec='seconds')}).encode('utf-8')
+        partial = path + ".tmp"
+        with open(partial, 'wb') as f:
+            f.write(cls.MAGIC + cls.HEADER.pack(count, bucket_bits, cls.BLOOM_PROBES, len(bloom), len(meta)))
+            f.write(meta.ljust(cls._padded(len(meta))))
+            for table in (bucket_start, hashes, bloom):
+                table.tofile(f)
+        os.replace(partial, path)
+        return cls(path, canonicalizer)
+
+    @staticmethod
+    def hash_keys(keys):
+        """8-byte BLAKE2b of each mailbox key, as a uint64 array"""
+        return np.frombuffer(b"".join([hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+                                       for key in keys]), np.uint64)
+
+    @staticmethod
+    def _bloom_masks(hashes, probes):
+        """Each hash's Bloom bits within its word, taken from the hash's high half"""
+        masks = np.zeros(len(hashes), np.uint64)
+        for i in range(probes):
+            masks |= np.uint64(1) << ((hashes >> np.uint64(32 + 6 * i)) & np.uint64(63))
+        return masks
+
+    def key(self, email):
+        return self.canonicalizer(email) if self.canonicalizer else email.lower()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, email):
+        value = int.from_bytes(hashlib.blake2b(self.key(email).encode('utf-8'), digest_size=8).digest(),
+                               sys.byteorder)
+        if self._words is not None:
+            mask = 0
+            for i in range(self.probes):
+                mask |= 1 << ((value >> (32 + 6 * i)) & 63)
+            if self._words[(value & 0xFFFFFFFF) % len(self._words)] & mask != mask:
+                return False
+        bucket = value >> self._shift
+        end = self._starts[bucket + 1]
+        at = bisect_left(self._table, value, self._starts[bucket], end)
+        return at < end and self._table[at] == value
+
+    def contains_many(self, emails):
+        """Suppressed flags for a list of addresses, as a numpy bool array"""
+        hashes = self.hash_keys([self.key(email) for email in emails])
+        found = np.zeros(len(hashes), bool)
+        if not self.count:
+            return found
+        maybe = slice(None)
+        if self._bloom is not None:
+            words = self._bloom[(hashes & np.uint64(0xFFFFFFFF)) % np.uint64(len(self._bloom))]
+            masks = self._bloom_masks(hashes, self.probes)
+            maybe = np.flatnonzero(words & masks == masks)
+        candidates = hashes[maybe]
+        at = np.minimum(np.searchsorted(self._hashes, candidates), self.count - 1)
+        found[maybe] = self._hashes[at] == candidates
+        return found
+
+    def filter(self, emails, counters=None, key=None):
+        """Yield the addresses in emails that are not suppressed, looked up CHUNK at a time
+
+        counters, if given, is a dict whose "suppressed" entry is bumped by
+        the number dropped. With key, emails can be records and key(record)
+        is the address.
+        """
+        emails = iter(emails)
+        for chunk in iter(lambda: list(islice(emails, self.CHUNK)), []):
+            found = self.contains_many(chunk if key is None else [key(item) for item in chunk])
+            if counters is not None:
+                counters["suppressed"] = counters.get("suppressed", 0) + int(found.sum())
+            yield from compress(chunk, (~found).tolist())
+
+    @property
+    def sources(self):
+        return [path for path, _ in self.meta["sources"]]
+
+    def stale(self, canonicalizer=None):
+        """Source lists changed or gone since the build; all of them if the keying changed"""
+        if self.meta["canonical"] != (canonicalizer is not None):
+            return self.sources
+        return [path for path, fingerprint in self.meta["sources"]
+                if not os.path.exists(path) or list(file_fingerprint(path)) != fingerprint]
+
+    def close(self):
+        """Release the mapping; the list can't be queried afterwards"""
+        for view in (self._starts, self._table, self._words, self._view):
+            if view is not None:
+                view.release()
+        self._bucket_start = self._hashes = self._bloom = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # a caller still holds a numpy view; the mapping goes when it does
+
+
+class PipelineMetrics:
+    """Stage timers and counters for one load or export run
+
+    Counters are bumped from the loader thread and read by the UI's stats
+    panel; plain dict updates are atomic enough for a display. With profile
+    set, the run is also captured with cProfile and tracemalloc.
+    """
+
+    COUNTERS = ("bytes_read", "rows_parsed", "matches", "inserts", "dedupe_hits", "spills", "exported", "suppressed")
+    TIMERS = ("extract", "store", "spill", "merge", "export", "lock_wait", "ui")
+
+    def __init__(self, run="idle", profile=False):
+        self.run = run
+        self.profile = profile
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.timers = dict.fromkeys(self.TIMERS, 0.0)
+        self.created = datetime.now()
+        self.started = time.perf_counter()
+        self.finished = None
+        self.capture = {}
+        self._profiler = None
+
+    def add(self, name, amount=1):
+        self.counters[name] += amount
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - start
+
+    @contextmanager
+    def locked(self, lock):
+        """Acquire lock, booking the time spent waiting for it"""
+        start = time.perf_counter()
+        with lock:
+            self.timers["lock_wait"] += time.perf_counter() - start
+            yield
+
+    def timed(self, iterable, name):
+        """Iterate, booking the time spent producing each item against a timer"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.timers[name] += time.perf_counter() - start
+            yield item
+
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def snapshot(self):
+        """Counters, timers and per-second rates as a JSON-ready dict"""
+        elapsed = self.elapsed()
+        return {
+            "run": self.run,
+            "started": self.created.isoformat(),
+            "seconds": round(elapsed, 3),
+            "counters": dict(self.counters),
+            "timers": {name: round(value, 3) for name, value in self.timers.items()},
+            "rates": {
+                "bytes_per_sec": round(self.counters["bytes_read"] / elapsed) if elapsed else 0,
+                "rows_per_sec": round(self.counters["rows_parsed"] / elapsed) if elapsed else 0,
+                "inserts_per_sec": round(self.counters["inserts"] / elapsed) if elapsed else 0,
+            },
+        }
+
+    def summary(self):
+        """One line for the live stats panel"""
+        elapsed = self.elapsed() or 1e-9
+        c, t = self.counters, self.timers
+        return (f"{self.run}: {elapsed:.1f}s | {c['bytes_read'] / elapsed / (1024 * 1024):.1f} MB/s | "
+                f"{c['rows_parsed']:,} rows | {c['matches']:,} matches | {c['inserts']:,} inserts | "
+                f"{c['dedupe_hits']:,} dupes | lock {t['lock_wait']:.2f}s | ui {t['ui']:.2f}s")
+
+    def start_profile(self):
+        """Begin cProfile (for the calling thread) and tracemalloc capture if profiling"""
+        if not self.profile:
+            return
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop_profile(self, directory, stem):
+        """End the capture, saving a .prof file and the top entries into capture"""
+        if self._profiler is None:
+            return
+        import pstats
+        import tracemalloc
+        self._profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        os.makedirs(directory, exist_ok=True)
+        profile_path = os.path.join(directory, stem + ".prof")
+        self._profiler.dump_stats(profile_path)
+        stats = pstats.Stats(self._profiler)
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:25]
+        self.capture = {
+            "profile_path": profile_path,
+            "top_cumulative": [{"function": f"{func[0]}:{func[1]}({func[2]})", "calls": nc,
+                                "total_s": round(tt, 4), "cumulative_s": round(ct, 4)}
+                               for func, (cc, nc, tt, ct, callers) in top],
+            "tracemalloc_peak_mb": round(peak / (1024 * 1024), 2),
+            "top_allocations": [{"where": str(stat.traceback), "size_kb": round(stat.size / 1024, 1),
+                                 "count": stat.count}
+                                for stat in snapshot.statistics('lineno')[:25]],
+        }
+        self._profiler = None
+
+    def write_report(self, directory, extra=None):
+        """Finish the run and dump snapshot() plus any capture as JSON; returns the path"""
+        self.finished = self.finished or time.perf_counter()
+        stem = f"{self.run}_{self.created:%Y%m%d_%H%M%S}"
+        self.stop_profile(directory, stem)
+        report = self.snapshot()
+        report.update(extra or {})
+        if self.capture:
+            report["profile"] = self.capture
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, stem + ".json")
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return path
+
+
+class QuantumEmailSuite:
+    def __init__(self, root):
+        self.root = root
+        self.style = load_style()(theme='cyborg')
+        self.root.title("Quantum Email Suite Pro")
+        self.root.geometry("1400x900")
+        self.root.minsize(1200, 800)  # Minimum window size
+
+        # Configure grid for main window
+        self.root.grid_rowconfigure(1, weight=1)
+        self.root.grid_columnconfigure(0, weight=1)
+
+        # Header
+        self.header = ttk.Label(
+            root, 
+            text="QUANTUM EMAIL SUITE PRO", 
+            font=('Arial', 16, 'bold'),
+            foreground='#00ff99',
+            background='#1a1a1a')
+        self.header.grid(row=0, column=0, sticky='ew', pady=(0, 5))
+
+        # Border
+        self.style.configure('Border.TFrame', background='#00ff99')
+        border = ttk.Frame(root, height=2, style='Border.TFrame')
+        border.grid(row=1, column=0, sticky='ew', pady=(0, 5))
+
+        # Create main notebook
+        self.notebook = ttk.Notebook(root)
+        self.notebook.grid(row=2, column=0, sticky='nsew', padx=10, pady=(0, 5))
+
+        # Suppression list shared by the cleaner's exports and the sender; the cleaner builds it
+        self.suppression = None
+
+        # Initialize modules
+        self.email_cleaner = EmailCleanerModule(self)
+        self.email_editor = EmailEditorModule(self)
+        self.email_sender = EmailSenderModule(self)
+
+        # Add modules as tabs
+        self.notebook.add(self.email_cleaner.frame, text="Email Cleaner")
+        self.notebook.add(self.email_editor.frame, text="Email Editor")
+        self.notebook.add(self.email_sender.frame, text="Email Sender")
+
+        # Status bar
+        self.status_var = tk.StringVar()
+        self.status_bar = ttk.Label(
+            root, 
+            textvariable=self.status_var, 
+            relief='sunken',
+            background='#1a1a1a',
+            foreground='#00ff99',
+            font=('Helvetica', 9))
+        self.status_bar.grid(row=3, column=0, sticky='ew')
+
+    def update_status(self, message):
+        self.status_var.set(message)
+        self.root.update()
+
+    def on_closing(self):
+        """Handle application closing"""
+        if hasattr(self, 'email_sender'):
+            self.email_sender.save_config()
+        if hasattr(self, 'email_cleaner'):
+            self.email_cleaner.on_closing()
+        self.root.destroy()
+
+
+class EmailCleanerModule:
+    def __init__(self, parent):
+        self.parent = parent
+        self.frame = ttk.Frame(parent.notebook)
+
+        # Configuration
+        self.MAX_EMAILS_IN_MEMORY = 1000000  # in-memory budget; beyond it sorted runs spill to disk
+        self.SPILL_DIR = None  # None uses the system temp directory
+        self.FILE_CHUNK_SIZE = 50000
+        self.TEXT_CHUNK_SIZE = 4 * 1024 * 1024  # bytes per mmap scan window
+        self.PARALLEL_WORKERS = os.cpu_count() or 1
+        self.PARALLEL_SPLIT_SIZE = 64 * 1024 * 1024  # text files above this are split by byte range
+        self.STORE_PATH = "quantum_email_store.db"  # persistent store, reopened on startup if present
+        self.FINGERPRINT_CONTENT_HASH = False  # also hash head/tail bytes, not just size and mtime
+        self.CHECKPOINT_DIR = "quantum_checkpoint"  # resumable load state, removed once a load completes
+        self.CHECKPOINT_INTERVAL = 256 * 1024 * 1024  # bytes read between checkpoints
+        self.METRICS_DIR = "quantum_metrics"  # per-run JSON reports (and .prof captures)
+        self.CANONICAL_DEDUP = True  # dedupe on mailbox keys (case, plus-tags, provider dot rules)
+        self.CANONICAL_RULES_PATH = "quantum_canonical_rules.csv"  # replaces CANONICAL_RULES when present
+        self.TOP_DOMAINS = 5  # domains listed in the stats panel
+        self.KNOWN_DOMAINS_PATH = "quantum_known_domains.txt"  # replaces KNOWN_DOMAINS when present
+        self.CORRECTIONS_LOG = "quantum_corrections.csv"  # every accepted or rejected domain typo fix
+        self.SUPPRESSION_PATH = "quantum_suppression.bin"  # hashed unsubscribe/bounce lists, reopened on startup
+        self.SUPPRESSION_BLOOM_BITS = 16  # Bloom filter bits per suppressed address; 0 for none
+        self.GROUPS_PATH = "quantum_groups.json"  # named file groups for set operations
+        self.WATCH_INTERVAL = 5  # seconds between watch-folder polls
+        self.WATCH_PATTERNS = ("*",)  # file names picked up in watched folders
+
+        # Data storage
+        self.loaded_files = []
+        self.clean_emails = set()
+        self.lock = Lock()
+        self.processing = False
+        self.extractor = EmailExtractor()
+        self.canonicalizer = self.load_canonicalizer()
+        self.corrector = self.load_corrector()
+        self.rejected_domains = self.load_rejected_domains()
+        self.groups = self.load_groups()  # group name -> file paths
+        self.email_db = self.new_store()
+        self.dedup = ExternalDedup(self.SPILL_DIR)
+        self.resume_point = None  # (path, fingerprint, offset) where the last load stopped
+        self.resume_from = None
+        self.metrics = PipelineMetrics()
+        self.watcher = None  # FolderWatcher while watch mode runs
+        self.watch_stop = threading.Event()
+
+        # Virtual results view state
+        self.view_offset = 0
+        self.view_rows = 25
+        self.sort_by = "insertion"
+        self.domain_filter = None  # show only this domain's addresses
+
+        # Create UI
+        self.create_ui()
+
+        # Reopen the persistent store from the last session
+        if os.path.exists(self.STORE_PATH):
+            self.persistent_var.set(True)
+            self.open_persistent_store()
+        self.open_suppression()
+    
+    def create_ui(self):
+        # Configure grid for resizing
+        self.frame.grid_rowconfigure(3, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        # File Loading Section
+        load_frame = ttk.LabelFrame(self.frame, text="File Loading", padding=10)
+        load_frame.grid(row=0, column=0, sticky='ew', pady=5)
+        load_frame.grid_columnconfigure(0, weight=1)
+
+        # File list with scrollbar
+        file_list_container = ttk.Frame(load_frame)
+        file_list_container.grid(row=0, column=0, sticky='nsew', pady=5)
+        file_list_container.grid_columnconfigure(0, weight=1)
+
+        self.file_listbox = tk.Listbox(file_list_container, height=8, selectmode=tk.EXTENDED)
+        self.file_listbox.grid(row=0, column=0, sticky='nsew')
+
+        scrollbar = ttk.Scrollbar(file_list_container, orient='vertical', command=self.file_listbox.yview)
+        scrollbar.grid(row=0, column=1, sticky='ns')
+        self.file_listbox.config(yscrollcommand=scrollbar.set)
+
+        # Load buttons
+        btn_frame = ttk.Frame(load_frame)
+        btn_frame.grid(row=1, column=0, sticky='ew')
+
+        self.add_btn = ttk.Button(btn_frame, text="Add Files", command=self.add_files)
+        self.add_btn.pack(side='left', padx=5)
+
+        self.remove_btn = ttk.Button(btn_frame, text="Remove Selected", command=self.remove_selected_files)
+        self.remove_btn.pack(side='left', padx=5)
+
+        self.clear_btn = ttk.Button(btn_frame, text="Clear All", command=self.clear_files)
+        self.clear_btn.pack(side='left', padx=5)
+
+        ttk.Button(btn_frame, text="Group Selected", command=self.group_selected_files).pack(side='left', padx=5)
+
+        ttk.Button(btn_frame, text="Watch Folder", command=self.watch_folder).pack(side='left', padx=5)
+        self.stop_watch_btn = ttk.Button(btn_frame, text="Stop Watching", command=self.stop_watching, state=tk.DISABLED)
+        self.stop_watch_btn.pack(side='left', padx=5)
+
+        self.stop_btn = ttk.Button(btn_frame, text="Stop", command=self.stop_loading, state=tk.DISABLED)
+        self.stop_btn.pack(side='right', padx=5)
+
+        self.load_btn = ttk.Button(btn_frame, text="Load Emails", command=self.load_emails_thread)
+        self.load_btn.pack(side='right', padx=5)
+
+        self.parallel_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Parallel", variable=self.parallel_var).pack(side='right', padx=5)
+
+        # Column targeting for CSV/Excel inputs
+        self.scan_all_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Scan all columns", variable=self.scan_all_var).pack(side='right', padx=5)
+
+        self.email_columns_entry = ttk.Entry(btn_frame, width=20)
+        self.email_columns_entry.pack(side='right', padx=5)
+        ttk.Label(btn_frame, text="Email columns:").pack(side='right')
+        ttk.Label(load_frame, text="Files yield ASCII addresses only; IDN domains are found in their punycode (xn--) form."
+                  ).grid(row=2, column=0, sticky='w', padx=5)
+
+        # Processing Section
+        process_frame = ttk.LabelFrame(self.frame, text="Email Processing", padding=10)
+        process_frame.grid(row=1, column=0, sticky='ew', pady=5)
+        process_frame.grid_columnconfigure(0, weight=1)
+
+        # Stats display
+        stats_frame = ttk.Frame(process_frame)
+        stats_frame.grid(row=0, column=0, sticky='ew', pady=5)
+
+        # Create stats labels
+        self.total_files_var = tk.StringVar(value="0")
+        self.total_emails_var = tk.StringVar(value="0")
+        self.unique_emails_var = tk.StringVar(value="0")
+        self.valid_emails_var = tk.StringVar(value="0")
+
+        stats_labels = [
+            ("Total Files:", self.total_files_var),
+            ("Total Emails:", self.total_emails_var),
+            ("Unique Emails:", self.unique_emails_var),
+            ("Valid Emails:", self.valid_emails_var)
+        ]
+
+        for i, (text, var) in enumerate(stats_labels):
+            ttk.Label(stats_frame, text=text).grid(row=0, column=i*2, sticky='e', padx=5)
+            ttk.Label(stats_frame, textvariable=var).grid(row=0, column=i*2+1, sticky='w', padx=5)
+
+        # Live pipeline counters, refreshed while a load runs
+        self.metrics_var = tk.StringVar(value="No run yet")
+        ttk.Label(stats_frame, text="Pipeline:").grid(row=1, column=0, sticky='e', padx=5)
+        ttk.Label(stats_frame, textvariable=self.metrics_var).grid(row=1, column=1, columnspan=6, sticky='w', padx=5)
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(stats_frame, text="Profile next run", variable=self.profile_var).grid(row=1, column=7, padx=5)
+
+        self.top_domains_var = tk.StringVar(value="-")
+        ttk.Label(stats_frame, text="Top Domains:").grid(row=2, column=0, sticky='e', padx=5)
+        ttk.Label(stats_frame, textvariable=self.top_domains_var).grid(row=2, column=1, columnspan=7, sticky='w', padx=5)
+
+        self.suppression_var = tk.StringVar(value="Off")
+        ttk.Label(stats_frame, text="Suppression:").grid(row=3, column=0, sticky='e', padx=5)
+        ttk.Label(stats_frame, textvariable=self.suppression_var).grid(row=3, column=1, columnspan=7, sticky='w', padx=5)
+
+        self.watch_var = tk.StringVar(value="Off")
+        ttk.Label(stats_frame, text="Watching:").grid(row=4, column=0, sticky='e', padx=5)
+        ttk.Label(stats_frame, textvariable=self.watch_var).grid(row=4, column=1, columnspan=7, sticky='w', padx=5)
+
+        # Action buttons
+        action_frame = ttk.Frame(process_frame)
+        action_frame.grid(row=1, column=0, sticky='ew', pady=5)
+
+        buttons = [
+            ("Remove Duplicates", self.remove_duplicates),
+            ("Remove Invalid", self.remove_invalid),
+            ("Clean All", self.clean_all),
+            ("Fix Domain Typos", self.fix_domain_typos),
+            ("Remove Domain", self.remove_domain),
+            ("Export Domain", self.export_domain),
+            ("Suppression Lists", self.choose_suppression_lists),
+            ("Set Operation", self.export_set_operation),
+            ("Export Clean List", self.export_clean_list)
+        ]
+
+        for i, (text, command) in enumerate(buttons):
+            if i < len(buttons) - 1:
+                ttk.Button(action_frame, text=text, command=command).pack(side='left', padx=5)
+            else:
+                ttk.Button(action_frame, text=text, command=command).pack(side='right', padx=5)
+
+        self.persistent_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(action_frame, text="Persistent store", variable=self.persistent_var,
+                        command=self.toggle_persistent_store).pack(side='right', padx=5)
+
+        # Export layout: extra columns and sharding; compression follows the file suffix
+        export_frame = ttk.Frame(process_frame)
+        export_frame.grid(row=2, column=0, sticky='ew', pady=5)
+
+        ttk.Label(export_frame, text="Export columns:").pack(side='left', padx=5)
+        self.domain_column_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(export_frame, text="Domain", variable=self.domain_column_var).pack(side='left', padx=5)
+        self.sources_column_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(export_frame, text="Sources", variable=self.sources_column_var).pack(side='left', padx=5)
+
+        ttk.Label(export_frame, text="Shards:").pack(side='left', padx=5)
+        self.shards_spin = ttk.Spinbox(export_frame, from_=1, to=256, width=5)
+        self.shards_spin.set(1)
+        self.shards_spin.pack(side='left', padx=5)
+        self.shard_by_combo = ttk.Combobox(export_frame, values=["By count", "By domain"], width=10, state='readonly')
+        self.shard_by_combo.set("By count")
+        self.shard_by_combo.pack(side='left', padx=5)
+
+        # Results Display
+        results_frame = ttk.LabelFrame(self.frame, text="Email Results", padding=10)
+        results_frame.grid(row=2, column=0, sticky='nsew', pady=5)
+        results_frame.grid_rowconfigure(1, weight=1)
+        results_frame.grid_columnconfigure(0, weight=1)
+
+        # View controls
+        view_frame = ttk.Frame(results_frame)
+        view_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, 5))
+
+        ttk.Label(view_frame, text="Sort by:").pack(side='left', padx=5)
+        self.sort_combo = ttk.Combobox(view_frame, values=[key.title() for key in EmailStore.SORT_KEYS],
+                                       width=10, state='readonly')
+        self.sort_combo.set("Insertion")
+        self.sort_combo.bind('<<ComboboxSelected>>', lambda e: self.set_sort(self.sort_combo.get().lower()))
+        self.sort_combo.pack(side='left', padx=5)
+
+        ttk.Label(view_frame, text="Go to row:").pack(side='left', padx=5)
+        self.jump_entry = ttk.Entry(view_frame, width=10)
+        self.jump_entry.bind('<Return>', lambda e: self.jump_to_row())
+        self.jump_entry.pack(side='left', padx=5)
+        ttk.Button(view_frame, text="Go", command=self.jump_to_row).pack(side='left', padx=5)
+
+        ttk.Label(view_frame, text="Domain:").pack(side='left', padx=5)
+        self.domain_entry = ttk.Entry(view_frame, width=20)
+        self.domain_entry.bind('<Return>', lambda e: self.set_domain_filter(self.domain_entry.get()))
+        self.domain_entry.pack(side='left', padx=5)
+        ttk.Button(view_frame, text="Filter",
+                   command=lambda: self.set_domain_filter(self.domain_entry.get())).pack(side='left', padx=5)
+        ttk.Button(view_frame, text="Show All", command=lambda: self.set_domain_filter("")).pack(side='left', padx=5)
+
+        self.view_range_var = tk.StringVar(value="No emails")
+        ttk.Label(view_frame, textvariable=self.view_range_var).pack(side='right', padx=5)
+
+        # Treeview only ever holds the visible rows; the scrollbar drives view_offset
+        self.tree = ttk.Treeview(results_frame, columns=("email", "status", "sources"), show="headings")
+        self.tree.heading("email", text="Email", command=lambda: self.set_sort("email"))
+        self.tree.heading("status", text="Status")
+        self.tree.heading("sources", text="Source Files", command=lambda: self.set_sort("source"))
+        self.tree.column("email", width=300, stretch=True)
+        self.tree.column("status", width=100, stretch=False)
+        self.tree.column("sources", width=400, stretch=True)
+
+        self.yscroll = ttk.Scrollbar(results_frame, orient="vertical", command=self.scroll_view)
+        xscroll = ttk.Scrollbar(results_frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=xscroll.set)
+
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.yscroll.grid(row=1, column=1, sticky="ns")
+        xscroll.grid(row=2, column=0, sticky="ew")
+
+        self.tree.bind('<Configure>', self.on_tree_resize)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll_view('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda e: self.scroll_view('scroll', -1, 'units'))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_view('scroll', 1, 'units'))
+
+        # Progress bar
+        self.progress = ttk.Progressbar(self.frame, mode="determinate")
+        self.progress.grid(row=3, column=0, sticky='ew', padx=10, pady=5)
+
+    def add_files(self):
+        filetypes = [
+            ("Text files", "*.txt"),
+            ("CSV files", "*.csv"),
+            ("Excel files", "*.xls *.xlsx *.ods"),
+            ("Parquet/Arrow files", "*.parquet *.arrow *.feather *.ipc"),
+            ("Compressed files", "*.gz *.bz2 *.xz *.zip *.tar *.tgz *.tbz2 *.txz"),
+            ("All files", "*.*")
+        ]
+        files = filedialog.askopenfilenames(filetypes=filetypes)
+        if files:
+            for file in files:
+                if file not in self.loaded_files:
+                    self.loaded_files.append(file)
+                    self.file_listbox.insert(tk.END, self.file_label(file))
+            self.update_stats()
+
+    def remove_selected_files(self):
+        if self.processing:
+            messagebox.showwarning("Processing", "Wait for the current load to finish")
+            return
+        if self.watcher is not None:
+            messagebox.showwarning("Watching", "Stop watching folders first")
+            return
+        selected = self.file_listbox.curselection()
+        removed = 0
+        for i in reversed(selected):
+            filepath = self.loaded_files.pop(i)
+            self.file_listbox.delete(i)
+            # Take the file's addresses back out without reloading the others
+            with self.lock:
+                removed += self.remove_source(filepath)
+        self.update_stats()
+        self.update_display()
+        if selected:
+            self.parent.update_status(f"Removed {len(selected)} files and {removed} emails only they contained")
+
+    def file_label(self, path):
+        """A file list entry: the path plus the groups it belongs to"""
+        names = [name for name, paths in self.groups.items() if path in paths]
+        return f"{path}  [{', '.join(names)}]" if names else path
+
+    def group_selected_files(self):
+        """Add the selected files to a named group for set operations"""
+        selected = self.file_listbox.curselection()
+        if not selected:
+            messagebox.showwarning("No Files", "Select the files to group first")
+            return
+        name = simpledialog.askstring("Group Files", "Group name (letters, digits, underscores):",
+                                      parent=self.frame)
+        if name is None:
+            return
+        name = name.strip()
+        if not GROUP_NAME.fullmatch(name):
+            messagebox.showerror("Error", "Group names are letters, digits and underscores only")
+            return
+        paths = self.groups.setdefault(name, [])
+        for i in selected:
+            if self.loaded_files[i] not in paths:
+                paths.append(self.loaded_files[i])
+            self.file_listbox.delete(i)
+            self.file_listbox.insert(i, self.file_label(self.loaded_files[i]))
+        self.save_groups()
+        self.parent.update_status(f"Group {name} has {len(paths)} files")
+
+    def load_groups(self):
+        if not os.path.exists(self.GROUPS_PATH):
+            return {}
+        with open(self.GROUPS_PATH, encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_groups(self):
+        with open(self.GROUPS_PATH, 'w', encoding='utf-8') as f:
+            json.dump(self.groups, f, indent=2)
+
+    def export_set_operation(self):
+        """Export the valid addresses picked out by a group expression such as A - B"""
+        if not self.groups:
+            messagebox.showwarning("No Groups", "Select files and use Group Selected to name some groups first")
+            return
+        listing = "\n".join(f"{name}: {len(paths)} files" for name, paths in self.groups.items())
+        expression = simpledialog.askstring(
+            "Set Operation", f"Combine groups with | (union), & (intersect) and - (subtract), "
+                             f"e.g. A - B\n\n{listing}", parent=self.frame)
+        if not expression:
+            return
+        try:
+            compile_group_expression(expression, self.groups, self.email_db.paths)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.export_clean_list(expression=expression)
+
+    def clear_files(self):
+        if self.watcher is not None:
+            messagebox.showwarning("Watching", "Stop watching folders first")
+            return
+        self.loaded_files = []
+        self.file_listbox.delete(0, tk.END)
+        self.groups = {}
+        self.save_groups()
+        if isinstance(self.email_db, SQLiteEmailStore):
+            self.email_db.clear()
+        else:
+            self.email_db = self.new_store()
+        self.dedup.cleanup()
+        self.discard_checkpoint()
+        self.clean_emails.clear()
+        self.update_stats()
+        self.update_display()
+        self.parent.update_status("Cleared all files and data")
+
+    def update_stats(self):
+        dedup = self.dedup
+        self.total_files_var.set(str(len(self.loaded_files)))
+        self.total_emails_var.set(str(self.email_db.total_count + dedup.total_count))
+        # Spilled rows are only deduplicated against each other when the runs merge
+        self.unique_emails_var.set(f"{len(self.email_db)} (+{dedup.rows} spilled)" if dedup.runs
+                                   else str(len(self.email_db)))
+        self.valid_emails_var.set(str(self.email_db.valid_count + dedup.valid_count))
+        self.top_domains_var.set(", ".join(f"{domain} ({count})" for domain, count
+                                           in self.email_db.top_domains(self.TOP_DOMAINS)) or "-")
+
+    def update_display(self):
+        """Render only the rows currently visible in the results view"""
+        with self.lock:
+            total = self.view_total()
+            self.view_offset = max(0, min(self.view_offset, total - self.view_rows))
+            sort_keys = self.email_db.SORT_KEYS
+            sort_by = self.sort_by if self.sort_by in sort_keys else sort_keys[0]
+            rows = self.email_db.page(self.view_offset, self.view_rows, sort_by, self.domain_filter)
+        # A spilled list only comes in address order: show that, and keep the chosen order for later
+        self.sort_combo.configure(state='readonly' if len(sort_keys) > 1 else 'disabled')
+        self.sort_combo.set(sort_by.title())
+
+        self.tree.delete(*self.tree.get_children())
+        for email, valid, sources in rows:
+            status = "Valid" if valid else "Invalid"
+            sources = ", ".join(sources)
+            original = self.email_db.correction_of(email)
+            if original:
+                sources += f" (corrected from {original})"
+            self.tree.insert("", "end", values=(email, status, sources))
+
+        if total:
+            first, last = self.view_offset / total, (self.view_offset + len(rows)) / total
+            self.view_range_var.set(f"Rows {self.view_offset + 1}-{self.view_offset + len(rows)} of {total}"
+                                    + (f" on {self.domain_filter}" if self.domain_filter else "")
+                                    + ("" if len(sort_keys) > 1 else " (spilled to disk: sorted by email only)"))
+        else:
+            first, last = 0, 1
+            self.view_range_var.set(f"No emails on {self.domain_filter}" if self.domain_filter else "No emails")
+        self.yscroll.set(first, last)
+
+    def view_total(self):
+        """Rows in the results view: the whole store, or the filtered domain's count"""
+        if self.domain_filter:
+            return self.email_db.domain_count(self.domain_filter)
+        return len(self.email_db)
+
+    def scroll_view(self, action, amount, unit=None):
+        """Scrollbar and mouse wheel handler for the virtual results view"""
+        total = self.view_total()
+        if action == 'moveto':
+            self.view_offset = int(float(amount) * total)
+        elif action == 'scroll':
+            step = self.view_rows if unit == 'pages' else 1
+            self.view_offset += int(amount) * step
+        self.update_display()
+
+    def on_tree_resize(self, event):
+        row_height = int(self.parent.style.lookup('Treeview', 'rowheight') or 20)
+        rows = max(1, (event.height - row_height) // row_height)
+        if rows != self.view_rows:
+            self.view_rows = rows
+            self.update_display()
+
+    def set_sort(self, sort_by):
+        """Re-order the results view by email, domain, source or insertion"""
+        if self.processing:
+            return
+        self.sort_by = sort_by
+        self.sort_combo.set(sort_by.title())
+        self.view_offset = 0
+        self.parent.update_status(f"Sorting {len(self.email_db)} emails by {sort_by}...")
+        self.update_display()
+        self.parent.update_status(f"Sorted by {sort_by}")
+
+    def domain_key(self, domain):
+        """A typed domain as the store indexes it: lowercased, IDNA-encoded and canonically aliased"""
+        domain = domain.strip().lower().lstrip('@')
+        if not domain:
+            return None
+        try:
+            domain = domain.encode('idna').decode('ascii')
+        except UnicodeError:
+            pass
+        if self.canonicalizer:
+            domain = self.canonicalizer(f"x@{domain}").rpartition('@')[2]
+        return domain
+
+    def set_domain_filter(self, domain):
+        """Limit the results view to one domain; an empty domain shows everything again"""
+        self.domain_filter = self.domain_key(domain)
+        self.domain_entry.delete(0, tk.END)
+        self.domain_entry.insert(0, self.domain_filter or "")
+        self.view_offset = 0
+        self.update_display()
+        if self.domain_filter:
+            self.parent.update_status(f"{self.view_total()} emails on {self.domain_filter}")
+
+    def jump_to_row(self):
+        try:
+            self.view_offset = max(0, int(self.jump_entry.get()) - 1)
+        except ValueError:
+            messagebox.showerror("Error", "Row must be a number")
+            return
+        self.update_display()
+
+    def is_valid_email(self, email):
+        """RFC/IDN email validation"""
+        return self.extractor.validator.is_valid(email)
+
+    def load_canonicalizer(self):
+        """Canonical-key rules from CANONICAL_RULES_PATH, else the built-in table; None when off"""
+        if not self.CANONICAL_DEDUP:
+            return None
+        if os.path.exists(self.CANONICAL_RULES_PATH):
+            try:
+                return AddressCanonicalizer.from_csv(self.CANONICAL_RULES_PATH)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load {self.CANONICAL_RULES_PATH}, using built-in rules: {str(e)}")
+        return AddressCanonicalizer()
+
+    def load_corrector(self):
+        """Typo corrector over KNOWN_DOMAINS_PATH if present, else the built-in domain list"""
+        if os.path.exists(self.KNOWN_DOMAINS_PATH):
+            try:
+                return DomainCorrector.from_file(self.KNOWN_DOMAINS_PATH)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load {self.KNOWN_DOMAINS_PATH}, using built-in domains: {str(e)}")
+        return DomainCorrector()
+
+    def load_rejected_domains(self):
+        """Domains whose suggested fix was rejected before, from the corrections log"""
+        if not os.path.exists(self.CORRECTIONS_LOG):
+            return set()
+        with open(self.CORRECTIONS_LOG, newline='', encoding='utf-8') as f:
+            return {row["domain"] for row in csv.DictReader(f) if row.get("decision") == "rejected"}
+
+    def log_correction(self, domain, target, count, decision):
+        """Append one accept/reject decision to the corrections log"""
+        new_log = not os.path.exists(self.CORRECTIONS_LOG)
+        with open(self.CORRECTIONS_LOG, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new_log:
+                writer.writerow(["time", "domain", "corrected_to", "emails", "decision"])
+            writer.writerow([datetime.now().isoformat(timespec='seconds'), domain, target, count, decision])
+
+    def open_suppression(self):
+        """Reopen the suppression table left by the last session, if any"""
+        if not os.path.exists(self.SUPPRESSION_PATH):
+            return
+        try:
+            suppression = SuppressionList(self.SUPPRESSION_PATH, self.canonicalizer)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open {self.SUPPRESSION_PATH}: {str(e)}")
+            return
+        self.parent.suppression = suppression
+        self.show_suppression()
+        stale = suppression.stale(self.canonicalizer)
+        if stale:
+            self.parent.update_status(f"{len(stale)} suppression lists changed since the last build; "
+                                      f"pick them again under Suppression Lists to rebuild")
+
+    def show_suppression(self):
+        suppression = self.parent.suppression
+        if suppression is None:
+            self.suppression_var.set("Off")
+        else:
+            self.suppression_var.set(f"{len(suppression):,} addresses from "
+                                     f"{', '.join(map(os.path.basename, suppression.sources)) or 'no lists'} "
+                                     f"(built {suppression.meta['built']})")
+
+    def choose_suppression_lists(self):
+        """Rebuild the suppression table from picked unsubscribe/bounce files, or turn it off"""
+        if self.processing:
+            messagebox.showwarning("Processing", "Wait for the current load to finish")
+            return
+        if self.parent.email_sender.sending_active:
+            messagebox.showwarning("Sending", "Stop sending before changing the suppression lists")
+            return
+        files = filedialog.askopenfilenames(title="Pick suppression lists (unsubscribes, hard bounces)")
+        if not files:
+            if self.parent.suppression is not None and messagebox.askyesno(
+                    "Suppression", "Turn suppression off and delete its table?"):
+                self.parent.suppression.close()
+                self.parent.suppression = None
+                os.remove(self.SUPPRESSION_PATH)
+                self.show_suppression()
+            return
+
+        self.processing = True
+        self.load_btn.config(state=tk.DISABLED)
+        Thread(target=self.build_suppression, args=(list(files),), daemon=True).start()
+
+    def build_suppression(self, files):
+        """Hash the picked lists into SUPPRESSION_PATH and swap the new table in"""
+        try:
+            if self.parent.suppression is not None:
+                self.parent.suppression.close()  # Windows can't replace a mapped file
+                self.parent.suppression = None
+            self.parent.update_status(f"Building suppression table from {len(files)} lists...")
+            self.parent.suppression = SuppressionList.build(
+                files, self.SUPPRESSION_PATH, self.extractor, self.canonicalizer, self.SUPPRESSION_BLOOM_BITS,
+                self.parent.update_status, self.FILE_CHUNK_SIZE, self.TEXT_CHUNK_SIZE)
+            self.parent.update_status(f"Suppressing {len(self.parent.suppression):,} addresses")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to build the suppression table: {str(e)}")
+            self.parent.update_status("Suppression build failed")
+        finally:
+            self.processing = False
+            self.load_btn.config(state=tk.NORMAL)
+            self.show_suppression()
+
+    def new_store(self):
+        """An empty in-memory store keyed the way this cleaner dedupes"""
+        return EmailStore(self.extractor.validator, canonicalizer=self.canonicalizer)
+
+    def load_emails_thread(self):
+        if not self.loaded_files:
+            messagebox.showwarning("No Files", "Please add files first")
+            return
+
+        if self.processing:
+            messagebox.showwarning("Processing", "Already processing files")
+            return
+        if self.watcher is not None:
+            messagebox.showwarning("Watching", "Watched folders are loading already; stop watching first")
+            return
+            
+        self.processing = True
+        self.parent.update_status("Loading emails...")
+        self.progress["value"] = 0
+        self.load_btn.config(state=tk.DISABLED)
+        self.stop_btn.config(state=tk.NORMAL)
+
+        self.extractor.scan_all_columns = self.scan_all_var.get()
+        self.extractor.email_columns = [name for name in self.email_columns_entry.get().split(',') if name.strip()]
+        self.resume_from = self.offer_resume()
+
+        parallel = self.parallel_var.get()
+        self.metrics = PipelineMetrics("load", profile=self.profile_var.get())
+        self.profile_var.set(False)  # profiling is for one run only
+        # Workers get pickled copies of the extractor, so only the serial loader counts rows
+        self.extractor.metrics = None if parallel else self.metrics
+        self.refresh_metrics()
+
+        # Start processing in a separate thread
+        target = self.load_emails_parallel if parallel else self.load_emails
+        Thread(target=target, daemon=True).start()
+
+    def stop_loading(self):
+        """Ask the running load to stop after its current chunk; a serial load can be resumed later"""
+        if self.processing:
+            self.processing = False
+            self.stop_btn.config(state=tk.DISABLED)
+            self.parent.update_status("Stopping load...")
+
+    def refresh_metrics(self):
+        """Redraw the live stats line, re-arming itself while a load or watch runs"""
+        self.metrics_var.set(self.metrics.summary())
+        if self.processing or self.watcher is not None:
+            self.frame.after(500, self.refresh_metrics)
+
+    def report_status(self, message):
+        """update_status, with the time it takes booked against the current run"""
+        with self.metrics.timer("ui"):
+            self.parent.update_status(message)
+
+    def finish_metrics(self, **extra):
+        """Write the current run's JSON report and show its final numbers"""
+        try:
+            path = self.metrics.write_report(self.METRICS_DIR, extra)
+        except Exception as e:
+            self.parent.update_status(f"Could not write metrics report: {str(e)}")
+            return None
+        self.extractor.metrics = None
+        self.metrics_var.set(self.metrics.summary())
+        return path
+
+    def load_emails(self):
+        completed = False
+        metrics = self.metrics
+        metrics.start_profile()
+        try:
+            email_count = 0
+            loaded = 0
+            pending = self.begin_load()
+            total_files = len(pending)
+            unsaved = 0  # bytes read since the last checkpoint
+            # A stop is also written to disk once this load has checkpointed, or when the store is on disk anyway
+            on_disk = isinstance(self.email_db, SQLiteEmailStore) or self.read_checkpoint() is not None
+            
+            for i, (_, filepath, fingerprint, start) in enumerate(pending):
+                if not self.processing:  # Check if stopped
+                    break
+                if unsaved >= self.CHECKPOINT_INTERVAL:
+                    self.save_checkpoint(filepath, fingerprint, 0)
+                    unsaved, on_disk = 0, True
+                    
+                with metrics.timer("ui"):
+                    self.parent.update_status(f"Processing file {i+1}/{total_files}: {os.path.basename(filepath)}")
+                    self.progress["value"] = (i / total_files) * 100
+                    self.parent.root.update()
+                
+                position = start
+                try:
+                    batches = self.extractor.iter_offsets(filepath, self.FILE_CHUNK_SIZE, self.TEXT_CHUNK_SIZE,
+                                                          start, progress=self.report_status)
+                    for offset, emails in metrics.timed(batches, "extract"):
+                        if not self.processing:
+                            break
+                        email_count += self.store_emails(emails, filepath)
+                        if offset is not None:
+                            unsaved += offset - position
+                            metrics.add("bytes_read", offset - position)
+                            position = offset
+                            if unsaved >= self.CHECKPOINT_INTERVAL:
+                                self.save_checkpoint(filepath, fingerprint, offset)
+                                unsaved, on_disk = 0, True
+                    else:
+                        # Only a file read to the end is cached as loaded
+                        self.mark_loaded(filepath, fingerprint)
+                        loaded += 1
+                        unsaved += max(0, os.path.getsize(filepath) - position)
+                        metrics.add("bytes_read", max(0, os.path.getsize(filepath) - position))
+                    
+                    if not self.processing:
+                        # Stopped mid-file: the next load can pick up after the last stored chunk
+                        if on_disk:
+                            self.save_checkpoint(filepath, fingerprint, position)
+                        else:
+                            self.resume_point = (filepath, fingerprint, position)
+                    gc.collect()
+                                    
+                except Exception as e:
+                    self.parent.update_status(f"Error processing {filepath}: {str(e)}")
+                    continue
+                    
+            completed = self.processing
+            skipped = len(self.loaded_files) - total_files
+            self.parent.update_status(f"Loaded {email_count} emails from {loaded} files ({skipped} unchanged skipped)")
+            
+        except Exception as e:
+            self.parent.update_status(f"Error: {str(e)}")
+        finally:
+            self.finish_load()
+            if completed:
+                self.discard_checkpoint()
+            self.processing = False
+            self.finish_metrics(mode="serial", files=len(self.loaded_files), completed=completed)
+            self.load_btn.config(state=tk.NORMAL)
+            self.stop_btn.config(state=tk.DISABLED)
+            self.progress["value"] = 100
+            self.update_stats()
+            self.update_display()
+            gc.collect()
+
+    def load_emails_parallel(self):
+        """Fan files out to a process pool and merge the per-worker shards into email_db
+
+        Shards finish out of order, so there is no single offset to resume
+        from and a parallel load is not checkpointed: files whose shards all
+        merged are cached as loaded, and a stopped or crashed load reads the
+        rest again from the start.
+        """
+        email_count = 0
+        done = 0
+        completed = False
+        executor = None
+        metrics = self.metrics
+        metrics.start_profile()
+        try:
+            pending = self.begin_load()
+            fingerprints = {filepath: fingerprint for _, filepath, fingerprint, _ in pending}
+            tasks = plan_ingest_tasks(pending, self.extractor, self.FILE_CHUNK_SIZE, self.TEXT_CHUNK_SIZE,
+                                      self.PARALLEL_SPLIT_SIZE)
+            total_tasks = len(tasks)
+            shards_left = {}
+            for task in tasks:
+                shards_left[task[1]] = shards_left.get(task[1], 0) + 1
+            if tasks:
+                executor = ProcessPoolExecutor(max_workers=min(self.PARALLEL_WORKERS, total_tasks))
+            futures = {executor.submit(ingest_shard, task): task for task in tasks}
+            
+            # Time spent waiting on workers is booked as extraction
+            for future in metrics.timed(as_completed(futures), "extract"):
+                if not self.processing:  # Check if stopped
+                    break
+                    
+                _, filepath, start, end = futures[future][:4]
+                done += 1
+                try:
+                    file_index, shard, count = future.result()
+                except Exception as e:
+                    self.parent.update_status(f"Error processing {filepath}: {str(e)}")
+                    shards_left[filepath] = -1  # never cache a partly loaded file
+                    continue
+                    
+                email_count += count
+                self.store_emails(shard, filepath)
+                metrics.add("bytes_read", (os.path.getsize(filepath) if end is None else end) - start)
+                del shard
+                shards_left[filepath] -= 1
+                if shards_left[filepath] == 0:
+                    self.mark_loaded(filepath, fingerprints[filepath])
+                
+                with metrics.timer("ui"):
+                    self.parent.update_status(f"Merged shard {done}/{total_tasks}: {os.path.basename(filepath)}")
+                    self.progress["value"] = (done / total_tasks) * 100
+                
+            completed = self.processing
+            if completed:
+                self.parent.update_status(f"Loaded {email_count} emails from {done}/{total_tasks} shards")
+            else:
+                self.parent.update_status(f"Stopped after {done}/{total_tasks} shards; "
+                                          "unfinished files are read from the start next time")
+            
+        except Exception as e:
+            self.parent.update_status(f"Error: {str(e)}")
+        finally:
+            if executor is not None:
+                # Drop queued shards when stopped; running workers finish in the background
+                executor.shutdown(wait=False, cancel_futures=True)
+            self.finish_load()
+            if completed:
+                self.discard_checkpoint()
+            self.processing = False
+            self.finish_metrics(mode="parallel", workers=self.PARALLEL_WORKERS, shards=done,
+                                files=len(self.loaded_files), completed=completed)
+            self.load_btn.config(state=tk.NORMAL)
+            self.stop_btn.config(state=tk.DISABLED)
+            self.progress["value"] = 100
+            self.update_stats()
+            self.update_display()
+            gc.collect()
+
+    def extract_emails(self, text):
+        """Extract unique emails from text"""
+        return self.extractor.extract(text)
+
+    def store_emails(self, emails, filepath):
+        """Record a batch of extracted emails as coming from filepath"""
+        metrics = self.metrics
+        with metrics.locked(self.lock), metrics.timer("store"):
+            added = self.email_db.add_many(emails, self.email_db.intern_path(filepath))
+            spill = isinstance(self.email_db, EmailStore) and len(self.email_db) >= self.MAX_EMAILS_IN_MEMORY
+        metrics.add("matches", len(emails))
+        metrics.add("inserts", added)
+        metrics.add("dedupe_hits", len(emails) - added)
+        if spill:
+            self.report_status(f"Spilling {len(self.email_db)} emails to disk...")
+            with metrics.locked(self.lock), metrics.timer("spill"):
+                self.dedup.spill(self.email_db)
+            metrics.add("spills")
+        return len(emails)
+
+    def toggle_persistent_store(self):
+        """Switch between the in-memory store and the on-disk SQLite store"""
+        if self.processing:
+            self.persistent_var.set(not self.persistent_var.get())
+            messagebox.showwarning("Processing", "Wait for the current load to finish")
+            return
+        if self.persistent_var.get():
+            self.open_persistent_store()
+        else:
+            self.close_persistent_store()
+        self.update_stats()
+        self.update_display()
+
+    def open_persistent_store(self):
+        """Open STORE_PATH, carrying over anything already loaded in memory"""
+        try:
+            store = SQLiteEmailStore(self.STORE_PATH, self.extractor.validator, self.canonicalizer)
+        except Exception as e:
+            self.persistent_var.set(False)
+            messagebox.showerror("Error", f"Failed to open store: {str(e)}")
+            return
+
+        if len(self.email_db):
+            self.parent.update_status(f"Copying {len(self.email_db)} emails into {self.STORE_PATH}...")
+        with self.lock:
+            if len(self.email_db):
+                entries = self.email_db.entries()
+                for chunk in iter(lambda: list(islice(entries, self.FILE_CHUNK_SIZE)), []):
+                    by_path = {}
+                    for email, _, paths in chunk:
+                        for path in paths:
+                            by_path.setdefault(path, []).append(email)
+                    for path, emails in by_path.items():
+                        store.add_many(emails, store.intern_path(path))
+            self.email_db = store
+            self.dedup.cleanup()
+
+        # The store remembers its source files, so the file list comes back too
+        for path in store.paths:
+            if path not in self.loaded_files:
+                self.loaded_files.append(path)
+                self.file_listbox.insert(tk.END, self.file_label(path))
+        self.update_stats()
+        self.update_display()
+        self.parent.update_status(f"Opened persistent store with {len(store)} emails")
+
+    def close_persistent_store(self):
+        store = self.email_db
+        if not isinstance(store, SQLiteEmailStore):
+            return
+        keep = messagebox.askyesno("Persistent Store", f"Keep {store.path} for the next session?")
+        with self.lock:
+            store.close()
+            self.email_db = self.new_store()
+        if not keep:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(store.path + suffix):
+                    os.remove(store.path + suffix)
+        self.parent.update_status("Switched to in-memory store")
+
+    def on_closing(self):
+        """Stop any load or watch and release spill files and the persistent store"""
+        self.processing = False
+        self.watch_stop.set()
+        self.dedup.cleanup()
+        if isinstance(self.email_db, SQLiteEmailStore):
+            self.email_db.close()
+
+    def begin_load(self):
+        """Return (index, path, fingerprint, start offset) for files that need parsing
+
+        Files whose fingerprint matches the cache are skipped; changed ones
+        have their old contribution taken out first, except a file being
+        resumed, which starts at its checkpoint offset. A spilled list is then
+        reopened as a sorted run so newly loaded files merge into it.
+        """
+        pending = []
+        resume, self.resume_from = self.resume_from, None
+        with self.lock:
+            for i, filepath in enumerate(self.loaded_files):
+                try:
+                    fingerprint = file_fingerprint(filepath, self.FINGERPRINT_CONTENT_HASH)
+                except OSError:
+                    fingerprint = None
+                cached = self.email_db.fingerprint(filepath)
+                if fingerprint is not None and tuple(cached or ()) == fingerprint:
+                    continue
+                start = 0
+                if resume is not None and resume[:2] == (filepath, fingerprint):
+                    start = resume[2]
+                else:
+                    self.remove_source(filepath)
+                pending.append((i, filepath, fingerprint, start))
+            self.reopen_spilled()
+        return pending
+
+    def remove_source(self, filepath):
+        """Take filepath's addresses out of the list and any spilled runs; call under the lock"""
+        if filepath not in self.email_db.paths:
+            return 0
+        removed = 0
+        if self.dedup.runs and isinstance(self.email_db, EmailStore):
+            removed = self.dedup.remove_source(self.email_db.path_ids[filepath])
+        return removed + self.email_db.remove_source(filepath)
+
+    def reopen_spilled(self):
+        """Turn a spilled list back into a sorted run under a fresh store, so new emails merge into it"""
+        if isinstance(self.email_db, SpilledEmailList):
+            store = self.new_store()
+            store.adopt_paths(self.email_db.paths)
+            store.fingerprints = dict(self.email_db.fingerprints)
+            store.corrections = dict(self.email_db.corrections)
+            self.dedup.adopt(self.email_db.path)
+            self.email_db = store
+
+    def mark_loaded(self, filepath, fingerprint):
+        """Cache a fully parsed file's fingerprint so the next load can skip it"""
+        if fingerprint is not None:
+            with self.lock:
+                self.email_db.set_fingerprint(filepath, fingerprint)
+
+    def save_checkpoint(self, filepath, fingerprint, offset):
+        """Write what a crashed load needs to resume at offset in filepath
+
+        An in-memory store's spilled runs are moved into CHECKPOINT_DIR and
+        its entries written beside them as one more run, without emptying it;
+        a SQLite store already holds everything, so only the position is saved.
+        """
+        with self.lock:
+            store = self.email_db
+            sqlite = isinstance(store, SQLiteEmailStore)
+            runs = [] if sqlite else self.dedup.persist(store, self.CHECKPOINT_DIR)
+            state = {
+                "files": list(self.loaded_files),
+                "filepath": filepath,
+                "fingerprint": fingerprint,
+                "offset": offset,
+                "store": "sqlite" if sqlite else "memory",
+                "store_path": os.path.abspath(store.path) if sqlite else None,
+                "paths": list(store.paths),
+                "fingerprints": dict(store.fingerprints),
+                "runs": runs,
+                "saved": datetime.now().isoformat(),
+            }
+            os.makedirs(self.CHECKPOINT_DIR, exist_ok=True)
+            path = os.path.join(self.CHECKPOINT_DIR, "checkpoint.json")
+            with open(path + ".tmp", 'w') as f:
+                json.dump(state, f)
+            os.replace(path + ".tmp", path)
+            self.resume_point = (filepath, fingerprint, offset)
+        self.parent.update_status(f"Checkpoint saved at {os.path.basename(filepath)}, {offset / (1024 * 1024):.0f} MB")
+
+    def read_checkpoint(self):
+        """Load the checkpoint a previous session left behind, or None"""
+        path = os.path.join(self.CHECKPOINT_DIR, "checkpoint.json")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def discard_checkpoint(self):
+        self.resume_point = None
+        shutil.rmtree(self.CHECKPOINT_DIR, ignore_errors=True)
+
+    def offer_resume(self):
+        """Ask whether to resume an interrupted load; returns its (path, fingerprint, offset) or None"""
+        state = None
+        point = self.resume_point
+        if point is None:
+            state = self.read_checkpoint()
+            if state is None:
+                return None
+            point = (state["filepath"], tuple(state["fingerprint"] or ()), state["offset"])
+        elif point[0] not in self.loaded_files:
+            self.discard_checkpoint()
+            return None
+
+        filepath, fingerprint, offset = point
+        try:
+            current = file_fingerprint(filepath, self.FINGERPRINT_CONTENT_HASH)
+        except OSError:
+            current = None
+        if current != fingerprint:
+            self.discard_checkpoint()
+            self.parent.update_status(f"{os.path.basename(filepath)} changed since its checkpoint; loading from scratch")
+            return None
+
+        question = f"Resume the interrupted load at {os.path.basename(filepath)}, {offset / (1024 * 1024):.0f} MB in?"
+        if not messagebox.askyesno("Resume Load", question):
+            self.discard_checkpoint()
+            return None
+        if state is not None and not self.restore_checkpoint(state):
+            return None
+        return point
+
+    def restore_checkpoint(self, state):
+        """Rebuild a previous session's partial load from its checkpoint"""
+        if state["store"] == "sqlite":
+            store = self.email_db
+            if not (isinstance(store, SQLiteEmailStore) and os.path.abspath(store.path) == state["store_path"]):
+                messagebox.showwarning("Resume Load", f"Open the persistent store {state['store_path']} first")
+                return False
+        else:
+            if len(self.email_db) or any(path is not None for path in self.email_db.paths):
+                messagebox.showwarning("Resume Load", "Clear the current list before resuming")
+                return False
+            if not all(os.path.exists(run) for run in state["runs"]):
+                self.discard_checkpoint()
+                messagebox.showwarning("Resume Load", "The checkpoint's spill files are gone; loading from scratch")
+                return False
+            store = self.new_store()
+            store.adopt_paths(state["paths"])
+            store.fingerprints = {path: tuple(fp) for path, fp in state["fingerprints"].items()}
+            with self.lock:
+                self.dedup.cleanup()
+                for run in state["runs"]:
+                    self.dedup.adopt(run)
+                self.email_db = store
+
+        for path in state["files"]:
+            if path not in self.loaded_files:
+                self.loaded_files.append(path)
+                self.file_listbox.insert(tk.END, self.file_label(path))
+        self.update_stats()
+        return True
+
+    def finish_load(self):
+        """K-way merge spilled runs, if any, into the list the cleaner works on"""
+        if not self.dedup.runs:
+            return
+        try:
+            self.report_status(f"Merging {len(self.dedup.runs)} spilled runs...")
+            with self.metrics.locked(self.lock), self.metrics.timer("merge"):
+                self.email_db = self.dedup.merge(self.email_db)
+            # Addresses seen again after a spill only meet their earlier copy here
+            self.metrics.add("inserts", -self.dedup.collapsed)
+            self.metrics.add("dedupe_hits", self.dedup.collapsed)
+        except Exception as e:
+            self.parent.update_status(f"Error merging spilled runs: {str(e)}")
+
+    def watch_folder(self):
+        """Add a folder to watch mode, starting it if it is not running"""
+        if self.processing:
+            messagebox.showwarning("Processing", "Wait for the current load to finish")
+            return
+        directory = filedialog.askdirectory(title="Watch Folder")
+        if not directory:
+            return
+        if self.watcher is not None:
+            if directory not in self.watcher.directories:
+                self.watcher.directories.append(directory)
+            self.watch_var.set(", ".join(self.watcher.directories))
+            return
+
+        self.extractor.scan_all_columns = self.scan_all_var.get()
+        self.extractor.email_columns = [name for name in self.email_columns_entry.get().split(',') if name.strip()]
+        with self.lock:
+            self.reopen_spilled()
+            # Files this store has fully loaded are only read on from where they end
+            self.watcher = FolderWatcher([directory], self.WATCH_PATTERNS, known=dict(self.email_db.fingerprints))
+        self.metrics = PipelineMetrics("watch", profile=self.profile_var.get())
+        self.profile_var.set(False)
+        self.extractor.metrics = self.metrics
+        self.watch_stop.clear()
+        self.load_btn.config(state=tk.DISABLED)
+        self.stop_watch_btn.config(state=tk.NORMAL)
+        self.watch_var.set(directory)
+        self.refresh_metrics()
+        Thread(target=self.watch_loop, daemon=True).start()
+
+    def stop_watching(self):
+        self.watch_stop.set()
+        self.parent.update_status("Stopping watch mode...")
+
+    def watch_loop(self):
+        """Poll the watched folders until stopped, loading new files and the grown tails of old ones"""
+        metrics = self.metrics
+        metrics.start_profile()
+        watcher = self.watcher
+        try:
+            while not self.watch_stop.is_set():
+                reads = watcher.poll()
+                self.load_watched(watcher, reads)
+                if reads:
+                    self.update_stats()
+                    self.update_display()
+                    self.parent.update_status(f"Watch: read {len(reads)} new or grown files, "
+                                              f"{len(self.email_db)} unique emails")
+                self.watch_var.set(f"{', '.join(watcher.directories)} (polled {datetime.now():%H:%M:%S})")
+                self.watch_stop.wait(self.WATCH_INTERVAL)
+                
+        except Exception as e:
+            self.parent.update_status(f"Watch error: {str(e)}")
+        finally:
+            # Watching is over, so unterminated last lines are as complete as they will get
+            try:
+                self.load_watched(watcher, watcher.tails(), stoppable=False)
+            except Exception as e:
+                self.parent.update_status(f"Watch error: {str(e)}")
+            self.watcher = None
+            self.finish_load()
+            self.finish_metrics(mode="watch", files=len(self.loaded_files), directories=watcher.directories)
+            self.load_btn.config(state=tk.NORMAL)
+            self.stop_watch_btn.config(state=tk.DISABLED)
+            self.watch_var.set("Off")
+            self.update_stats()
+            self.update_display()
+            self.parent.update_status(f"Stopped watching; {len(self.email_db)} unique emails")
+
+    def load_watched(self, watcher, reads, stoppable=True):
+        """Load a FolderWatcher's reads, replacing what a rewritten file gave before"""
+        metrics = self.metrics
+        for filepath, start, end, replace in reads:
+            if stoppable and self.watch_stop.is_set():
+                break
+            if filepath not in self.loaded_files:
+                self.loaded_files.append(filepath)
+                self.file_listbox.insert(tk.END, self.file_label(filepath))
+            if replace:
+                with self.lock:
+                    self.remove_source(filepath)
+            try:
+                if end is None:
+                    end = os.path.getsize(filepath)
+                    batches = self.extractor.iter_file(filepath, self.FILE_CHUNK_SIZE, self.TEXT_CHUNK_SIZE)
+                else:
+                    batches = self.extractor.iter_appended(filepath, self.FILE_CHUNK_SIZE,
+                                                           self.TEXT_CHUNK_SIZE, start, end)
+                for emails in metrics.timed(batches, "extract"):
+                    self.store_emails(emails, filepath)
+                metrics.add("bytes_read", end - start)
+            except Exception as e:
+                self.parent.update_status(f"Error processing {filepath}: {str(e)}")
+                continue
+            self.mark_loaded(filepath, watcher.fingerprint(filepath, self.FINGERPRINT_CONTENT_HASH))
+
+    def remove_duplicates(self):
+        """Keep only one copy of each email"""
+        if not self.email_db:
+            messagebox.showwarning("No Data", "No emails to process")
+            return
+            
+        self.parent.update_status("Removing duplicates...")
+        self.parent.root.update()
+
+        # Already unique in our database structure
+        self.parent.update_status(f"Found {len(self.email_db)} unique emails")
+        self.update_stats()
+        self.update_display()
+
+    def remove_invalid(self):
+        """Remove emails with invalid syntax"""
+        if not self.email_db:
+            messagebox.showwarning("No Data", "No emails to process")
+            return
+            
+        self.parent.update_status("Removing invalid emails...")
+        self.parent.root.update()
+
+        with self.lock:
+            removed = self.email_db.remove_invalid()
+        self.parent.update_status(f"Removed {removed} invalid emails, kept {len(self.email_db)} valid ones")
+        self.update_stats()
+        self.update_display()
+
+    def clean_all(self):
+        """Remove duplicates and invalid emails in one step"""
+        self.remove_duplicates()
+        self.remove_invalid()
+
+    def fix_domain_typos(self):
+        """Offer each unknown domain's closest known domain as a fix, biggest first"""
+        if not self.email_db:
+            messagebox.showwarning("No Data", "No emails to process")
+            return
+        if self.processing:
+            messagebox.showwarning("Processing", "Wait for the current load to finish")
+            return
+        if isinstance(self.email_db, SpilledEmailList):
+            messagebox.showwarning("Spilled List", "Domain fixes need the list in memory or in the persistent store")
+            return
+
+        with self.lock:
+            counts = self.email_db.domain_counts()
+        suggestions = sorted(((count, domain, target) for domain, count in counts.items()
+                              if domain not in self.rejected_domains
+                              and (target := self.corrector.suggest(domain))), reverse=True)
+        if not suggestions:
+            messagebox.showinfo("No Typos", "No domain looks like a typo of a known one")
+            return
+            
+        fixed = 0
+        for count, domain, target in suggestions:
+            answer = messagebox.askyesnocancel(
+                "Fix Domain Typo", f"{count} emails are at {domain}. Correct them to {target}?")
+            if answer is None:
+                break
+            if answer:
+                self.parent.update_status(f"Correcting {domain} to {target}...")
+                with self.lock:
+                    fixed += correct_domain(self.email_db, domain, target)
+            else:
+                self.rejected_domains.add(domain)
+            self.log_correction(domain, target, count, "accepted" if answer else "rejected")
+
+        self.parent.update_status(f"Corrected {fixed} emails (log: {self.CORRECTIONS_LOG})")
+        self.update_stats()
+        self.update_display()
+
+    def remove_domain(self):
+        """Delete every address on the filtered domain"""
+        domain = self.domain_key(self.domain_entry.get())
+        if not domain:
+            messagebox.showwarning("No Domain", "Enter a domain to remove")
+            return
+        if self.processing:
+            messagebox.showwarning("Processing", "Wait for the current load to finish")
+            return
+        count = self.email_db.domain_count(domain)
+        if not count:
+            messagebox.showinfo("No Emails", f"No emails on {domain}")
+            return
+        if not messagebox.askyesno("Remove Domain", f"Remove all {count} emails on {domain}?"):
+            return
+
+        self.parent.update_status(f"Removing {domain}...")
+        with self.lock:
+            removed = self.email_db.remove_domain(domain)
+        self.domain_filter = None
+        self.domain_entry.delete(0, tk.END)
+        self.parent.update_status(f"Removed {removed} emails on {domain}")
+        self.update_stats()
+        self.update_display()
+
+    def export_domain(self):
+        """Export the valid addresses on the filtered domain"""
+        domain = self.domain_key(self.domain_entry.get())
+        if not domain:
+            messagebox.showwarning("No Domain", "Enter a domain to export")
+            return
+        self.export_clean_list(domain)
+
+    def export_clean_list(self, domain=None, expression=None):
+        if not self.email_db or (domain and not self.email_db.domain_count(domain)):
+            messagebox.showwarning("No Data", "No emails to export")
+            return
+            
+        try:
+            shards = int(self.shards_spin.get())
+        except ValueError:
+            shards = 0
+        if shards < 1:
+            messagebox.showerror("Error", "Shards must be a whole number of at least 1")
+            return
+        columns = ["email"]
+        if self.domain_column_var.get():
+            columns.append("domain")
+        if self.sources_column_var.get():
+            columns.append("sources")
+            
+        filetypes = [
+            ("CSV files", "*.csv"),
+            ("Text files", "*.txt"),
+            ("Gzipped CSV files", "*.csv.gz"),
+            ("Zstandard CSV files", "*.csv.zst"),
+            ("Parquet files", "*.parquet"),
+            ("Arrow files", "*.arrow"),
+            ("All files", "*.*")
+        ]
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=filetypes,
+            title=f"Save {domain or expression} Email List" if domain or expression else "Save Clean Email List"
+        )
+
+        if not filename:
+            return
+            
+        metrics = self.metrics = PipelineMetrics("export", profile=self.profile_var.get())
+        self.profile_var.set(False)
+        metrics.start_profile()
+        try:
+            self.parent.update_status("Exporting clean email list...")
+            self.progress["value"] = 0
+            self.parent.root.update()
+            
+            # Stream straight from the store (or merged spill file), never a full list
+            if expression:
+                total = self.email_db.valid_count  # an upper bound; the result size is known once written
+                records = select_groups(self.email_db, expression, self.groups)
+            else:
+                total = self.email_db.domain_count(domain) if domain else self.email_db.valid_count
+                records = self.email_db.iter_source_bits(valid_only=True, domain=domain)
+            if self.parent.suppression is not None:
+                records = self.parent.suppression.filter(records, metrics.counters, key=itemgetter(0))
+            
+            def progress(written):
+                metrics.counters["exported"] = written
+                with metrics.timer("ui"):
+                    self.progress["value"] = (written / max(total, 1)) * 100
+                    self.metrics_var.set(metrics.summary())
+                    self.parent.root.update()
+                
+            with metrics.timer("export"):
+                metrics.counters["exported"], written = export_records(
+                    records, filename, self.email_db.paths, columns, shards,
+                    "domain" if self.shard_by_combo.get() == "By domain" else "count", progress=progress)
+            report = self.finish_metrics(output=filename, shards=written,
+                                         output_bytes=sum(os.path.getsize(path) for path in written))
+                        
+            self.parent.update_status(f"Exported {metrics.counters['exported']} clean emails to "
+                                      f"{filename if shards == 1 else f'{shards} shards of {filename}'}, "
+                                      f"{metrics.counters['suppressed']} suppressed (report: {report})")
+            self.progress["value"] = 100
+            
+        except Exception as e:
+            self.finish_metrics(output=filename, error=str(e))
+            messagebox.showerror("Export Error", f"Failed to export: {str(e)}")
+            self.parent.update_status("Export failed")
+        finally:
+            gc.collect()
+
+class EmailEditorModule:
+    def __init__(self, parent):
+        self.parent = parent
+        self.frame = ttk.Frame(parent.notebook)
+
+        # Configure grid for resizing
+        self.frame.grid_rowconfigure(1, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        # Current font settings
+        self.current_font_family = 'Arial'
+        self.current_font_size = 12
+        self.current_font_weight = 'normal'
+        self.current_font_slant = 'roman'
+        self.current_font_underline = False
+        self.current_font_color = '#000000'
+        self.current_bg_color = '#ffffff'
+        self.current_align = 'left'
+
+        # Create advanced editor UI
+        self.create_advanced_editor_ui()
+    
+    def create_advanced_editor_ui(self):
+        # Main container with grid configuration
+        main_container = ttk.Frame(self.frame)
+        main_container.pack(fill='both', expand=True, padx=5, pady=5)
+        main_container.grid_rowconfigure(1, weight=1)
+        main_container.grid_columnconfigure(0, weight=1)
+
+        # Toolbar Frame - Ribbon Style
+        toolbar_frame = ttk.Frame(main_container)  # Correct variable name
+        toolbar_frame.grid(row=0, column=0, sticky='ew', pady=(0, 5))
+
+        # Create ribbon tabs - FIXED THE TYPO HERE (tooler_frame -> toolbar_frame)
+        ribbon_notebook = ttk.Notebook(toolbar_frame)  # This is the corrected line
+        ribbon_notebook.pack(fill='x', expand=True)
+
+        # Home Tab
+        home_tab = ttk.Frame(ribbon_notebook)
+        ribbon_notebook.add(home_tab, text="Home")
+
+        # Clipboard group
+        clipboard_group = ttk.LabelFrame(home_tab, text="Clipboard", padding=5)
+        clipboard_group.pack(side='left', fill='y', padx=5)
+
+        ttk.Button(clipboard_group, text="Paste", command=lambda: self.editor.event_generate('<<Paste>>')).pack(side='left', padx=2)
+        ttk.Button(clipboard_group, text="Copy", command=lambda: self.editor.event_generate('<<Copy>>')).pack(side='left', padx=2)
+        ttk.Button(clipboard_group, text="Cut", command=lambda: self.editor.event_generate('<<Cut>>')).pack(side='left', padx=2)
+
+        # Font group
+        font_group = ttk.LabelFrame(home_tab, text="Font", padding=5)
+        font_group.pack(side='left', fill='y', padx=5)
+
+        # Font family
+        font_families = sorted(tkfont.families())
+        self.font_family = ttk.Combobox(font_group, values=font_families, width=15)
+        self.font_family.set('Arial')
+        self.font_family.bind('<<ComboboxSelected>>', self.change_font_family)
+        self.font_family.pack(side='left', padx=2)
+
+        # Font size
+        self.font_size = ttk.Combobox(font_group, values=[8, 9, 10, 11, 12, 14, 16, 18, 20, 22, 24, 26, 28, 36, 48, 72], width=3)
+        self.font_size.set('12')
+        self.font_size.bind('<<ComboboxSelected>>', self.change_font_size)
+        self.font_size.pack(side='left', padx=2)
+
+        # Font style buttons
+        style_btn_frame = ttk.Frame(font_group)
+        style_btn_frame.pack(side='left', padx=5)
+
+        self.bold_btn = ttk.Button(style_btn_frame, text="B", width=2, command=self.toggle_bold)
+        self.bold_btn.pack(side='left', padx=1)
+
+        self.italic_btn = ttk.Button(style_btn_frame, text="I", width=2, command=self.toggle_italic)
+        self.italic_btn.pack(side='left', padx=1)
+
+        self.underline_btn = ttk.Button(style_btn_frame, text="U", width=2, command=self.toggle_underline)
+        self.underline_btn.pack(side='left', padx=1)
+
+        # Font color
+        self.color_btn = ttk.Button(font_group, text="Color", command=self.choose_font_color)
+        self.color_btn.pack(side='left', padx=2)
+
+        # Background color
+        self.bg_color_btn = ttk.Button(font_group, text="BG Color", command=self.choose_bg_color)
+        self.bg_color_btn.pack(side='left', padx=2)
+
+        # Paragraph group
+        paragraph_group = ttk.LabelFrame(home_tab, text="Paragraph", padding=5)
+        paragraph_group.pack(side='left', fill='y', padx=5)
+
+        self.align_left_btn = ttk.Button(paragraph_group, text="Left", command=lambda: self.set_alignment('left'))
+        self.align_left_btn.pack(side='left', padx=1)
+
+        self.align_center_btn = ttk.Button(paragraph_group, text="Center", command=lambda: self.set_alignment('center'))
+        self.align_center_btn.pack(side='left', padx=1)
+
+        self.align_right_btn = ttk.Button(paragraph_group, text="Right", command=lambda: self.set_alignment('right'))
+        self.align_right_btn.pack(side='left', padx=1)
+
+        # Lists
+        self.bullet_list_btn = ttk.Button(paragraph_group, text="• List", command=self.insert_bullet)
+        self.bullet_list_btn.pack(side='left', padx=1)
+
+        # Insert Tab
+        insert_tab = ttk.Frame(ribbon_notebook)
+        ribbon_notebook.add(insert_tab, text="Insert")
+
+        # Insert group
+        insert_group = ttk.LabelFrame(insert_tab, text="Insert", padding=5)
+        insert_group.pack(side='left', fill='y', padx=5)
+
+        ttk.Button(insert_group, text="Image", command=self.insert_image).pack(side='left', padx=2)
+        ttk.Button(insert_group, text="Hyperlink", command=self.insert_hyperlink).pack(side='left', padx=2)
+        ttk.Button(insert_group, text="Table", command=self.insert_table).pack(side='left', padx=2)
+
+        # Text editor with scrollbars
+        editor_frame = ttk.Frame(main_container)
+        editor_frame.grid(row=1, column=0, sticky='nsew')
+        editor_frame.grid_rowconfigure(0, weight=1)
+        editor_frame.grid_columnconfigure(0, weight=1)
+
+        self.editor = scrolledtext.ScrolledText(
+            editor_frame,
+            wrap='word',
+            font=('Arial', 12),
+            undo=True,
+            maxundo=-1,
+            autoseparators=True,
+            padx=10,
+            pady=10
+        )
+        self.editor.grid(row=0, column=0, sticky='nsew')
+
+        # Configure tags for formatting
+        self.editor.tag_configure('bold', font=('Arial', 12, 'bold'))
+        self.editor.tag_configure('italic', font=('Arial', 12, 'italic'))
+        self.editor.tag_configure('underline', underline=True)
+        self.editor.tag_configure('center', justify='center')
+        self.editor.tag_configure('right', justify='right')
+        self.editor.tag_configure('left', justify='left')
+
+        # Status bar
+        status_frame = ttk.Frame(main_container)
+        status_frame.grid(row=2, column=0, sticky='ew', pady=(5, 0))
+
+        self.word_count_label = ttk.Label(status_frame, text="Words: 0")
+        self.word_count_label.pack(side='left', padx=5)
+
+        self.char_count_label = ttk.Label(status_frame, text="Chars: 0")
+        self.char_count_label.pack(side='left', padx=5)
+
+        # Export buttons
+        export_frame = ttk.Frame(main_container)
+        export_frame.grid(row=3, column=0, sticky='e', pady=5)
+
+        ttk.Button(export_frame, text="Export as HTML", command=self.export_html).pack(side='left', padx=5)
+        ttk.Button(export_frame, text="Export as TXT", command=self.export_txt).pack(side='left', padx=5)
+    
+    def update_counts(self, event=None):
+        """Update word and character counts"""
+        content = self.editor.get('1.0', 'end-1c')
+        words = len(content.split())
+        chars = len(content)
+        self.word_count_label.config(text=f"Words: {words}")
+        self.char_count_label.config(text=f"Chars: {chars}")
+    
+    def update_font_display(self, event=None):
+        """Update font display based on current selection"""
+        try:
+            # Get current tags at the insertion cursor
+            tags = self.editor.tag_names("insert")
+            
+            # Update button states based on tags
+            self.bold_btn.state(['!pressed'] if 'bold' in tags else ['pressed'])
+            self.italic_btn.state(['!pressed'] if 'italic' in tags else ['pressed'])
+            self.underline_btn.state(['!pressed'] if 'underline' in tags else ['pressed'])
+            
+            # Update alignment buttons
+            if 'center' in tags:
+                self.current_align = 'center'
+                self.align_center_btn.state(['pressed'])
+                self.align_left_btn.state(['!pressed'])
+                self.align_right_btn.state(['!pressed'])
+            elif 'right' in tags:
+                self.current_align = 'right'
+                self.align_right_btn.state(['pressed'])
+                self.align_left_btn.state(['!pressed'])
+                self.align_center_btn.state(['!pressed'])
+            else:
+                self.current_align = 'left'
+                self.align_left_btn.state(['pressed'])
+                self.align_center_btn.state(['!pressed'])
+                self.align_right_btn.state(['!pressed'])
+                
+        except Exception as e:
+            print(f"Error updating font display: {e}")
+    
+    def change_font_family(self, event=None):
+        """Change font family for selection or new text"""
+        self.current_font_family = self.font_family.get()
+        self.apply_font()
+    
+    def change_font_size(self, event=None):
+        """Change font size for selection or new text"""
+        try:
+            self.current_font_size = int(self.font_size.get())
+            self.apply_font()
+        except ValueError:
+            pass
+    
+    def toggle_bold(self):
+        """Toggle bold style"""
+        self.current_font_weight = 'bold' if self.current_font_weight == 'normal' else 'normal'
+        self.apply_font()
+    
+    def toggle_italic(self):
+        """Toggle italic style"""
+        self.current_font_slant = 'italic' if self.current_font_slant == 'roman' else 'roman'
+        self.apply_font()
+    
+    def toggle_underline(self):
+        """Toggle underline style"""
+        self.current_font_underline = not self.current_font_underline
+        self.apply_font()
+    
+    def choose_font_color(self):
+        """Choose font color"""
+        color = askcolor(title="Select Font Color")
+        if color[1]:  # color[1] is the hex code
+            self.current_font_color = color[1]
+            self.apply_font()
+    
+    def choose_bg_color(self):
+        """Choose background color"""
+        color = askcolor(title="Select Background Color")
+        if color[1]:
+            self.current_bg_color = color[1]
+            self.apply_font()
+    
+    def set_alignment(self, align):
+        """Set text alignment"""
+        self.current_align = align
+        try:
+            # Remove all alignment tags from selection
+            for tag in ['left', 'center', 'right']:
+                self.editor.tag_remove(tag, "sel.first", "sel.last")
+            
+            # Apply new alignment tag
+            if self.current_align != 'left':  # left is default
+                self.editor.tag_add(self.current_align, "sel.first", "sel.last")
+        except:
+            pass
+    
+    def apply_font(self):
+        """Apply current font settings to selection"""
+        try:
+            # Create or update font configuration
+            font_config = (self.current_font_family, self.current_font_size, 
+                          self.current_font_weight, self.current_font_slant)
+            
+            # Create a unique tag name based on font settings
+            tag_name = f"font_{self.current_font_family}_{self.current_font_size}_{self.current_font_weight}_{self.current_font_slant}"
+            
+            # Configure the tag if it doesn't exist
+            if tag_name not in self.editor.tag_names():
+                self.editor.tag_configure(tag_name, 
+                                        font=font_config,
+                                        underline=self.current_font_underline,
+                                        foreground=self.current_font_color,
+                                        background=self.current_bg_color)
+            
+            # Apply the tag to the current selection
+            self.editor.tag_add(tag_name, "sel.first", "sel.last")
+            
+            # Update button states
+            self.update_font_display()
+            
+        except Exception as e:
+            print(f"Error applying font: {e}")
+    
+    def insert_bullet(self):
+        """Insert bullet point at current position"""
+        self.editor.insert('insert', '• ')
+    
+    def insert_image(self):
+        """Insert image placeholder"""
+        file_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.png *.jpg *.jpeg *.gif")])
+        if file_path:
+            self.editor.insert('insert', f'\n[Image: {os.path.basename(file_path)}]\n')
+    
+    def insert_hyperlink(self):
+        """Insert hyperlink"""
+        url = simpledialog.askstring("Insert Hyperlink", "Enter URL:")
+        if url:
+            text = simpledialog.askstring("Insert Hyperlink", "Enter display text:", initialvalue=url)
+            if text:
+                self.editor.insert('insert', f'<a href="{url}">{text}</a>')
+    
+    def insert_table(self):
+        """Insert table placeholder"""
+        rows = simpledialog.askinteger("Insert Table", "Number of rows:", minvalue=1, maxvalue=20)
+        cols = simpledialog.askinteger("Insert Table", "Number of columns:", minvalue=1, maxvalue=10)
+
+        if rows and cols:
+            table = "\n" + "+-----" * cols + "+\n"
+            for _ in range(rows):
+                table += "|     " * cols + "|\n"
+                table += "+-----" * cols + "+\n"
+            self.editor.insert('insert', table)
+    
+    def export_html(self):
+        """Export content as HTML"""
+        text = self.editor.get('1.0', 'end-1c')
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".html",
+            filetypes=[("HTML Files", "*.html")]
+        )
+        if file_path:
+            try:
+                # Enhanced HTML conversion with basic styling
+                html_content = f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>Exported Email</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; }}
+        .bold {{ font-weight: bold; }}
+        .italic {{ font-style: italic; }}
+        .underline {{ text-decoration: underline; }}
+        .center {{ text-align: center; }}
+        .right {{ text-align: right; }}
+    </style>
+</head>
+<body>
+{text}
+</body>
+</html>"""
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+                messagebox.showinfo("Success", f"Exported to {file_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export: {str(e)}")
+    
+    def export_txt(self):
+        """Export content as plain text"""
+        text = self.editor.get('1.0', 'end-1c')
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text Files", "*.txt")]
+        )
+        if file_path:
+            try:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                messagebox.showinfo("Success", f"Exported to {file_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export: {str(e)}")
+
+
+class EmailSenderModule:
+    def __init__(self, parent):
+        self.parent = parent
+        self.frame = ttk.Frame(parent.notebook)
+
+        # Configure grid for resizing
+        self.frame.grid_rowconfigure(2, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        # Initialize variables
+        self.email_list = []
+        self.smtp_accounts = []
+        self.current_account_index = 0
+        self.email_counters = {}
+        self.sending_active = False
+        self.pause_sending = False
+        self.last_sent_times = {}
+
+        # Load configuration
+        self.config_file = "quantum_email_config.json"
+        self.load_config()
+
+        # Create UI with notebook for tabs
+        self.create_ui_with_tabs()
+    
+    def create_ui_with_tabs(self):
+        # Create notebook for tabs
+        self.module_notebook = ttk.Notebook(self.frame)
+        self.module_notebook.pack(fill='both', expand=True, padx=5, pady=5)
+
+        # Create tabs
+        self.create_compose_tab()
+        self.create_smtp_tab()
+        self.create_status_tab()
+
+        # Add tabs to notebook
+        self.module_notebook.add(self.compose_tab, text="Compose")
+        self.module_notebook.add(self.smtp_tab, text="SMTP Accounts")
+        self.module_notebook.add(self.status_tab, text="Sending Status")
+    
+    def create_compose_tab(self):
+        self.compose_tab = ttk.Frame(self.module_notebook)
+
+        # Configure grid
+        self.compose_tab.grid_rowconfigure(1, weight=1)
+        self.compose_tab.grid_columnconfigure(0, weight=1)
+
+        # Email List Section
+        email_list_frame = ttk.LabelFrame(self.compose_tab, text="Email List", padding=10)
+        email_list_frame.grid(row=0, column=0, sticky='ew', pady=5)
+        email_list_frame.grid_columnconfigure(0, weight=1)
+
+        # Email List with scrollbar
+        list_container = ttk.Frame(email_list_frame)
+        list_container.grid(row=0, column=0, sticky='nsew')
+        list_container.grid_columnconfigure(0, weight=1)
+
+        self.email_listbox = tk.Listbox(list_container, height=8, selectmode=tk.EXTENDED)
+        self.email_listbox.grid(row=0, column=0, sticky='nsew')
+
+        scrollbar = ttk.Scrollbar(list_container, orient='vertical', command=self.email_listbox.yview)
+        scrollbar.grid(row=0, column=1, sticky='ns')
+        self.email_listbox.config(yscrollcommand=scrollbar.set)
+
+        # Load button
+        ttk.Button(
+            email_list_frame, 
+            text="Load Email List (CSV)", 
+            command=self.load_email_list,
+            cursor="hand2"
+        ).grid(row=1, column=0, sticky='w', pady=5)
+
+        # Email Content Section
+        content_frame = ttk.LabelFrame(self.compose_tab, text="Email Content", padding=10)
+        content_frame.grid(row=1, column=0, sticky='nsew', pady=5)
+        content_frame.grid_rowconfigure(1, weight=1)
+        content_frame.grid_columnconfigure(0, weight=1)
+
+        # Subject Field
+        ttk.Label(content_frame, text="Subject:").grid(row=0, column=0, sticky='w', pady=2)
+        self.subject_entry = ttk.Entry(content_frame)
+        self.subject_entry.grid(row=0, column=1, sticky='ew', pady=2)
+        content_frame.grid_columnconfigure(1, weight=1)
+
+        # Message Body with scrollbars
+        editor_frame = ttk.Frame(content_frame)
+        editor_frame.grid(row=1, column=0, columnspan=2, sticky='nsew', pady=5)
+        editor_frame.grid_rowconfigure(0, weight=1)
+        editor_frame.grid_columnconfigure(0, weight=1)
+
+        self.message_text = scrolledtext.ScrolledText(
+            editor_frame, 
+            wrap='word', 
+            height=15,
+            font=('Arial', 11)
+        )
+        self.message_text.grid(row=0, column=0, sticky='nsew')
+
+        # Control Buttons
+        btn_frame = ttk.Frame(self.compose_tab)
+        btn_frame.grid(row=2, column=0, sticky='e', pady=5)
+
+        self.btn_start = ttk.Button(
+            btn_frame, 
+            text="Start Sending", 
+            command=self.start_sending,
+            style='success.TButton',
+            cursor="hand2"
+        )
+        self.btn_start.pack(side='left', padx=5)
+
+        self.btn_pause = ttk.Button(
+            btn_frame, 
+            text="Pause", 
+            command=self.toggle_pause,
+            style='warning.TButton',
+            cursor="hand2",
+            state='disabled'
+        )
+        self.btn_pause.pack(side='left', padx=5)
+
+        self.btn_stop = ttk.Button(
+            btn_frame, 
+            text="Stop", 
+            command=self.stop_sending,
+            style='danger.TButton',
+            cursor="hand2",
+            state='disabled'
+        )
+        self.btn_stop.pack(side='left', padx=5)
+    
+    def create_smtp_tab(self):
+        self.smtp_tab = ttk.Frame(self.module_notebook)
+
+        # Configure grid
+        self.smtp_tab.grid_rowconfigure(1, weight=1)
+        self.smtp_tab.grid_columnconfigure(0, weight=1)
+
+        # SMTP Accounts List
+        list_frame = ttk.LabelFrame(self.smtp_tab, text="SMTP Accounts", padding=10)
+        list_frame.grid(row=0, column=0, sticky='nsew', pady=5)
+        list_frame.grid_rowconfigure(0, weight=1)
+        list_frame.grid_columnconfigure(0, weight=1)
+
+        # Listbox with scrollbar
+        list_container = ttk.Frame(list_frame)
+        list_container.grid(row=0, column=0, sticky='nsew')
+        list_container.grid_rowconfigure(0, weight=1)
+        list_container.grid_columnconfigure(0, weight=1)
+
+        self.smtp_listbox = tk.Listbox(list_container, height=10, selectmode=tk.SINGLE)
+        self.smtp_listbox.grid(row=0, column=0, sticky='nsew')
+
+        scrollbar = ttk.Scrollbar(list_container, orient='vertical', command=self.smtp_listbox.yview)
+        scrollbar.grid(row=0, column=1, sticky='ns')
+        self.smtp_listbox.config(yscrollcommand=scrollbar.set)
+
+        # Account Management Buttons
+        btn_frame = ttk.Frame(list_frame)
+        btn_frame.grid(row=1, column=0, sticky='ew', pady=5)
+
+        ttk.Button(
+            btn_frame, 
+            text="Add Account", 
+            command=self.add_smtp_account
+        ).pack(side='left', padx=2)
+
+        ttk.Button(
+            btn_frame, 
+            text="Remove Account", 
+            command=self.remove_smtp_account
+        ).pack(side='left', padx=2)
+
+        ttk.Button(
+            btn_frame, 
+            text="Edit Account", 
+            command=self.edit_smtp_account
+        ).pack(side='left', padx=2)
+
+        ttk.Button(
+            btn_frame, 
+            text="Test Connection", 
+            command=self.test_connection,
+            style='info.TButton'
+        ).pack(side='right', padx=2)
+
+        # SMTP Configuration Fields
+        config_frame = ttk.LabelFrame(self.smtp_tab, text="SMTP Configuration", padding=10)
+        config_frame.grid(row=1, column=0, sticky='nsew', pady=5)
+        config_frame.grid_columnconfigure(1, weight=1)
+
+        # Server
+        ttk.Label(config_frame, text="SMTP Server:").grid(row=0, column=0, sticky='e', padx=5, pady=2)
+        self.smtp_server = ttk.Entry(config_frame)
+        self.smtp_server.grid(row=0, column=1, sticky='ew', padx=5, pady=2)
+
+        # Port
+        ttk.Label(config_frame, text="Port:").grid(row=1, column=0, sticky='e', padx=5, pady=2)
+        self.smtp_port = ttk.Entry(config_frame)
+        self.smtp_port.grid(row=1, column=1, sticky='ew', padx=5, pady=2)
+        self.smtp_port.insert(0, "587")  # Default port
+
+        # Email
+        ttk.Label(config_frame, text="Email:").grid(row=2, column=0, sticky='e', padx=5, pady=2)
+        self.smtp_email = ttk.Entry(config_frame)
+        self.smtp_email.grid(row=2, column=1, sticky='ew', padx=5, pady=2)
+
+        # Display Name
+        ttk.Label(config_frame, text="Display Name:").grid(row=3, column=0, sticky='e', padx=5, pady=2)
+        self.smtp_display_name = ttk.Entry(config_frame)
+        self.smtp_display_name.grid(row=3, column=1, sticky='ew', padx=5, pady=2)
+
+        # Password
+        ttk.Label(config_frame, text="Password:").grid(row=4, column=0, sticky='e', padx=5, pady=2)
+        self.smtp_password = ttk.Entry(config_frame, show="•")
+        self.smtp_password.grid(row=4, column=1, sticky='ew', padx=5, pady=2)
+
+        # Daily Limit
+        ttk.Label(config_frame, text="Daily Limit:").grid(row=5, column=0, sticky='e', padx=5, pady=2)
+        self.daily_limit = ttk.Entry(config_frame)
+        self.daily_limit.grid(row=5, column=1, sticky='ew', padx=5, pady=2)
+        self.daily_limit.insert(0, "100")  # Default limit
+
+        # Delay between emails
+        ttk.Label(config_frame, text="Delay (seconds):").grid(row=6, column=0, sticky='e', padx=5, pady=2)
+        self.email_delay = ttk.Entry(config_frame)
+        self.email_delay.grid(row=6, column=1, sticky='ew', padx=5, pady=2)
+        self.email_delay.insert(0, "5")  # Default delay
+    
+    def create_status_tab(self):
+        self.status_tab = ttk.Frame(self.module_notebook)
+
+        # Configure grid
+        self.status_tab.grid_rowconfigure(0, weight=1)
+        self.status_tab.grid_columnconfigure(0, weight=1)
+
+        # Status Treeview
+        columns = ("#", "Email", "Status", "Timestamp", "SMTP Account", "Details")
+        self.status_tree = ttk.Treeview(
+            self.status_tab, 
+            columns=columns, 
+            show="headings",
+            selectmode='extended',
+            height=20
+        )
+
+        for col in columns:
+            self.status_tree.heading(col, text=col)
+            self.status_tree.column(col, width=100, anchor='w')
+
+        self.status_tree.column("#", width=40)
+        self.status_tree.column("Email", width=180)
+        self.status_tree.column("Status", width=100)
+        self.status_tree.column("Timestamp", width=140)
+        self.status_tree.column("SMTP Account", width=150)
+        self.status_tree.column("Details", width=300)
+
+        # Add scrollbars
+        yscroll = ttk.Scrollbar(self.status_tab, orient="vertical", command=self.status_tree.yview)
+        xscroll = ttk.Scrollbar(self.status_tab, orient="horizontal", command=self.status_tree.xview)
+        self.status_tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+
+        self.status_tree.grid(row=0, column=0, sticky="nsew")
+        yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+
+        # Action buttons
+        btn_frame = ttk.Frame(self.status_tab)
+        btn_frame.grid(row=2, column=0, columnspan=2, sticky='ew', pady=5)
+
+        ttk.Button(
+            btn_frame, 
+            text="Clear Status", 
+            command=self.clear_status
+        ).pack(side='left', padx=5)
+
+        ttk.Button(
+            btn_frame, 
+            text="Export to CSV", 
+            command=self.export_status
+        ).pack(side='left', padx=5)
+
+        # Progress bar
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(
+            self.status_tab, 
+            variable=self.progress_var, 
+            maximum=100
+        )
+        self.progress_bar.grid(row=3, column=0, columnspan=2, sticky='ew', padx=5, pady=5)
+
+        # Progress label
+        self.progress_label = ttk.Label(self.status_tab, text="Ready")
+        self.progress_label.grid(row=4, column=0, columnspan=2, sticky='ew', padx=5, pady=2)
+    
+    def load_config(self):
+        if os.path.exists(self.config_file):
+            try:
+                with open(self.config_file, 'r') as f:
+                    config = json.load(f)
+                    self.smtp_accounts = config.get('smtp_accounts', [])
+                    self.last_sent_times = config.get('last_sent_times', {})
+                    
+                    # Initialize counters
+                    for i, account in enumerate(self.smtp_accounts):
+                        self.email_counters[i] = account.get('sent_today', 0)
+                        self.smtp_listbox.insert('end', self.format_account_display(account))
+                    
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load config: {str(e)}")
+
+    def save_config(self):
+        try:
+            # Update sent counts in accounts before saving
+            for i, account in enumerate(self.smtp_accounts):
+                account['sent_today'] = self.email_counters.get(i, 0)
+            
+            config = {
+                'smtp_accounts': self.smtp_accounts,
+                'last_sent_times': self.last_sent_times
+            }
+            
+            with open(self.config_file, 'w') as f:
+                json.dump(config, f, indent=2)
+                
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save config: {str(e)}")
+
+    def format_account_display(self, account):
+        return f"{account['email']} (Limit: {account['limit']}/day, Sent: {account.get('sent_today', 0)})"
+
+    def load_email_list(self):
+        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv"), ("Text Files", "*.txt")])
+        if file_path:
+            try:
+                with open(file_path, 'r') as f:
+                    reader = csv.reader(f)
+                    self.email_list = [row[0].strip() for row in reader if row and row[0].strip()]
+                
+                # Update listbox
+                self.email_listbox.delete(0, 'end')
+                for email in self.email_list[:100]:  # Show first 100 as preview
+                    self.email_listbox.insert('end', email)
+                if len(self.email_list) > 100:
+                    self.email_listbox.insert('end', f"... and {len(self.email_list) - 100} more")
+                
+                message = f"Loaded {len(self.email_list)} emails from {os.path.basename(file_path)}"
+                if self.parent.suppression is not None:
+                    suppressed = int(self.parent.suppression.contains_many(self.email_list).sum())
+                    message += f" ({suppressed} suppressed, will be skipped)"
+                self.parent.update_status(message)
+                self.update_progress()
+                
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+
+    def add_smtp_account(self):
+        # Get all field values
+        server = self.smtp_server.get().strip()
+        port = self.smtp_port.get().strip()
+        email = self.smtp_email.get().strip()
+        display_name = self.smtp_display_name.get().strip()
+        password = self.smtp_password.get().strip()
+        limit = self.daily_limit.get().strip()
+        delay = self.email_delay.get().strip()
+
+        # Validate fields
+        if not all([server, port, email, password, limit, delay]):
+            messagebox.showerror("Error", "All fields are required!")
+            return
+            
+        try:
+            limit = int(limit)
+            if limit <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Daily limit must be a positive number")
+            return
+            
+        try:
+            port = int(port)
+            if port <= 0 or port > 65535:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Port must be a valid number (1-65535)")
+            return
+            
+        try:
+            delay = int(delay)
+            if delay < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Delay must be a positive number")
+            return
+            
+        # Add account
+        account = {
+            'server': server,
+            'port': port,
+            'email': email,
+            'display_name': display_name,
+            'password': password,
+            'limit': limit,
+            'delay': delay,
+            'sent_today': 0
+        }
+
+        self.smtp_accounts.append(account)
+        index = len(self.smtp_accounts) - 1
+        self.email_counters[index] = 0
+        self.smtp_listbox.insert('end', self.format_account_display(account))
+
+        # Clear fields
+        self.smtp_password.delete(0, 'end')
+
+        # Save config
+        self.save_config()
+
+    def remove_smtp_account(self):
+        if selected := self.smtp_listbox.curselection():
+            index = selected[0]
+            self.smtp_listbox.delete(index)
+            del self.smtp_accounts[index]
+            
+            # Rebuild counters
+            new_counters = {}
+            for i, account in enumerate(self.smtp_accounts):
+                new_counters[i] = self.email_counters.get(i, 0)
+            self.email_counters = new_counters
+            
+            self.save_config()
+
+    def edit_smtp_account(self):
+        if selected := self.smtp_listbox.curselection():
+            index = selected[0]
+            account = self.smtp_accounts[index]
+            
+            # Fill fields with selected account
+            self.smtp_server.delete(0, 'end')
+            self.smtp_server.insert(0, account['server'])
+            
+            self.smtp_port.delete(0, 'end')
+            self.smtp_port.insert(0, str(account['port']))
+            
+            self.smtp_email.delete(0, 'end')
+            self.smtp_email.insert(0, account['email'])
+            
+            self.smtp_display_name.delete(0, 'end')
+            self.smtp_display_name.insert(0, account.get('display_name', ''))
+            
+            self.smtp_password.delete(0, 'end')
+            self.smtp_password.insert(0, account['password'])
+            
+            self.daily_limit.delete(0, 'end')
+            self.daily_limit.insert(0, str(account['limit']))
+            
+            self.email_delay.delete(0, 'end')
+            self.email_delay.insert(0, str(account.get('delay', 5)))
+            
+            # Remove the account (will be re-added if save is clicked)
+            self.smtp_listbox.delete(index)
+            del self.smtp_accounts[index]
+            del self.email_counters[index]
+
+    def test_connection(self):
+        # Get current values
+        server = self.smtp_server.get().strip()
+        port = self.smtp_port.get().strip()
+        email = self.smtp_email.get().strip()
+        password = self.smtp_password.get().strip()
+
+        if not all([server, port, email, password]):
+            messagebox.showerror("Error", "All fields are required to test connection")
+            return
+            
+        try:
+            port = int(port)
+        except ValueError:
+            messagebox.showerror("Error", "Port must be a valid number")
+            return
+            
+        server_obj = None
+        try:
+            if port == 465:
+                server_obj = smtplib.SMTP_SSL(server, port, timeout=10)
+            else:
+                server_obj = smtplib.SMTP(server, port, timeout=10)
+                server_obj.starttls()
+                
+            server_obj.login(email, password)
+            messagebox.showinfo("Success", "Connection successful!")
+        except smtplib.SMTPAuthenticationError:
+            messagebox.showerror("Error", "Authentication failed. Check your email and password.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Connection failed: {str(e)}")
+        finally:
+            if server_obj:
+                server_obj.quit()
+
+    def start_sending(self):
+        if not self.email_list:
+            messagebox.showerror("Error", "Please load email list first!")
+            return
+        if not self.smtp_accounts:
+            messagebox.showerror("Error", "Please add SMTP accounts first!")
+            return
+        if not self.subject_entry.get().strip():
+            messagebox.showerror("Error", "Please enter a subject!")
+            return
+        if not self.message_text.get("1.0", "end-1c").strip():
+            messagebox.showerror("Error", "Please enter a message!")
+            return
+
+        # Check if any accounts have available quota
+        available_accounts = False
+        for i, account in enumerate(self.smtp_accounts):
+            if self.check_account_limit(i):
+                available_accounts = True
+                break
+
+        if not available_accounts:
+            messagebox.showinfo("Limit Reached", 
+                "All accounts have reached their daily limits. Please add more accounts or wait 24 hours.")
+            return
+
+        # Update UI
+        self.btn_start['state'] = 'disabled'
+        self.btn_pause['state'] = 'normal'
+        self.btn_stop['state'] = 'normal'
+        self.sending_active = True
+        self.pause_sending = False
+
+        # Start sending thread
+        thread = threading.Thread(target=self.send_emails)
+        thread.daemon = True
+        thread.start()
+
+    def toggle_pause(self):
+        self.pause_sending = not self.pause_sending
+        if self.pause_sending:
+            self.btn_pause.config(text="Resume", style='success.TButton')
+            self.parent.update_status("Sending paused")
+        else:
+            self.btn_pause.config(text="Pause", style='warning.TButton')
+            self.parent.update_status("Resuming sending...")
+
+    def stop_sending(self):
+        self.sending_active = False
+        self.btn_start['state'] = 'normal'
+        self.btn_pause['state'] = 'disabled'
+        self.btn_stop['state'] = 'disabled'
+        self.parent.update_status("Sending stopped by user")
+
+    def send_emails(self):
+        total_sent = 0
+        total_suppressed = 0
+        total_emails = len(self.email_list)
+        suppression = self.parent.suppression
+
+        try:
+            for i, email in enumerate(self.email_list):
+                if not self.sending_active:
+                    break
+                
+                while self.pause_sending and self.sending_active:
+                    time.sleep(1)
+                
+                # Never mail an unsubscribed or hard-bounced address
+                if suppression is not None and email in suppression:
+                    total_suppressed += 1
+                    self.status_tree.insert('', 'end', values=(
+                        i + 1,
+                        email,
+                        "Suppressed",
+                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "",
+                        "On a suppression list"
+                    ))
+                    self.update_progress(i + 1, total_emails)
+                    continue
+                
+                # Find next available account
+                account_index = self.get_next_available_account()
+                if account_index is None:
+                    messagebox.showinfo("Limit Reached", 
+                        "All accounts have reached their daily limits. Please add more accounts or wait 24 hours.")
+                    break
+                
+                account = self.smtp_accounts[account_index]
+                
+                # Create message
+                msg = MIMEMultipart('alternative')
+                msg['Subject'] = self.subject_entry.get()
+                
+                # Set From address
+                if account.get('display_name'):
+                    msg['From'] = f"{account['display_name']} <{account['email']}>"
+                else:
+                    msg['From'] = account['email']
+                
+                msg['To'] = email
+                
+                # Add message body
+                text_content = self.message_text.get("1.0", "end-1c").strip()
+                msg.attach(MIMEText(text_content, 'plain'))
+                
+                try:
+                    # Connect to server
+                    if account['port'] == 465:
+                        server = smtplib.SMTP_SSL(account['server'], account['port'])
+                    else:
+                        server = smtplib.SMTP(account['server'], account['port'])
+                        server.starttls()
+                    
+                    server.login(account['email'], account['password'])
+                    server.sendmail(account['email'], [email], msg.as_string())
+                    server.quit()
+                    
+                    # Update counters
+                    total_sent += 1
+                    self.email_counters[account_index] += 1
+                    
+                    # Update last sent time
+                    self.last_sent_times[account_index] = datetime.now().timestamp()
+                    
+                    # Update status
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    self.status_tree.insert('', 'end', values=(
+                        i + 1,
+                        email,
+                        "Sent",
+                        timestamp,
+                        account['email'],
+                        ""
+                    ))
+                    
+                    # Update UI
+                    self.parent.update_status(f"Sent: {total_sent}/{total_emails} | Using: {account['email']} ({self.email_counters[account_index]}/{account['limit']})")
+                    self.update_progress(i + 1, total_emails)
+                    
+                    # Update account display
+                    self.smtp_listbox.delete(account_index)
+                    self.smtp_listbox.insert(account_index, self.format_account_display(account))
+                    
+                    # Save progress
+                    self.save_config()
+                    
+                    # Apply delay between emails
+                    time.sleep(account.get('delay', 5))
+                    
+                except Exception as e:
+                    error_msg = str(e)
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    self.status_tree.insert('', 'end', values=(
+                        i + 1,
+                        email,
+                        "Failed",
+                        timestamp,
+                        account['email'],
+                        error_msg
+                    ))
+                    continue
+            
+            # Sending complete
+            self.parent.update_status(f"Finished sending {total_sent} emails, skipped {total_suppressed} suppressed")
+            self.btn_start['state'] = 'normal'
+            self.btn_pause['state'] = 'disabled'
+            self.btn_stop['state'] = 'disabled'
+            self.sending_active = False
+            
+            if total_sent + total_suppressed == total_emails:
+                messagebox.showinfo("Complete", f"Successfully sent all {total_sent} emails!"
+                                    + (f" ({total_suppressed} suppressed addresses skipped)" if total_suppressed else ""))
+            else:
+                messagebox.showinfo("Stopped", f"Sent {total_sent} out of {total_emails} emails")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Sending failed: {str(e)}")
+            self.btn_start['state'] = 'normal'
+            self.btn_pause['state'] = 'disabled'
+            self.btn_stop['state'] = 'disabled'
+            self.sending_active = False
+
+    def get_next_available_account(self):
+        """Find the next available account that hasn't reached its daily limit"""
+        for i in range(len(self.smtp_accounts)):
+            if self.check_account_limit(i):
+                return i
+
+        # If all accounts are at limit, check if any have passed 24 hours
+        for i in range(len(self.smtp_accounts)):
+            last_sent = self.last_sent_times.get(i, 0)
+            if datetime.now().timestamp() - last_sent > 24 * 60 * 60:
+                # Reset counter for this account
+                self.email_counters[i] = 0
+                account = self.smtp_accounts[i]
+                account['sent_today'] = 0
+                self.smtp_listbox.delete(i)
+                self.smtp_listbox.insert(i, self.format_account_display(account))
+                return i
+
+        return None
+
+    def check_account_limit(self, account_index):
+        """Check if account hasn't reached its daily limit"""
+        account = self.smtp_accounts[account_index]
+        sent_today = self.email_counters.get(account_index, 0)
+
+        # Check if we've passed 24 hours since last send
+        last_sent = self.last_sent_times.get(account_index, 0)
+        if datetime.now().timestamp() - last_sent > 24 * 60 * 60:
+            # Reset counter
+            self.email_counters[account_index] = 0
+            account['sent_today'] = 0
+            self.smtp_listbox.delete(account_index)
+            self.smtp_listbox.insert(account_index, self.format_account_display(account))
+            return True
+
+        return sent_today < account['limit']
+
+    def update_progress(self, current=0, total=1):
+        """Update progress bar and label"""
+        if total == 0:
+            percent = 0
+        else:
+            percent = (current / total) * 100
+
+        self.progress_var.set(percent)
+        self.progress_label.config(text=f"{current}/{total} ({percent:.1f}%)")
+
+    def clear_status(self):
+        """Clear the status treeview"""
+        for item in self.status_tree.get_children():
+            self.status_tree.delete(item)
+        self.update_progress(0, 1)
+
+    def export_status(self):
+        """Export status to CSV file"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv")]
+        )
+
+        if file_path:
+            try:
+                with open(file_path, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["#", "Email", "Status", "Timestamp", "SMTP Account", "Details"])
+                    
+                    for item in self.status_tree.get_children():
+                        writer.writerow(self.status_tree.item(item)['values'])
+                
+                messagebox.showinfo("Success", f"Status exported to {file_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export status: {str(e)}")
+
+    def on_closing(self):
+        """Handle module closing"""
+        self.save_config()
+
+
+def benchmark_extraction(num_emails=500000, seed=42):
+    """Compare emails/sec of the legacy per-line scan against EmailExtractor.scan_file"""
+    import random
+
+    rng = random.Random(seed)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "contact", "sales", "info", "---", "|", "tel:555-0100"]
+    domains = ["gmail.com", "yahoo.com", "example.org", "mail.co.uk", "corp.example.net"]
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for n in range(num_emails):
+                noise = " ".join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+                email = f"User{rng.randint(0, num_emails // 2)}.{n % 97}@{rng.choice(domains)}"
+                f.write(f"{noise} {email} {noise}\n")
+
+        def legacy():
+            found = 0
+            regex = EMAIL_PATTERN
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    emails = set()
+                    for match in re.finditer(regex, line):
+                        emails.add(match.group(0).lower().strip())
+                    found += len(emails)
+            return found
+
+        def engine():
+            extractor = EmailExtractor()
+            return sum(len(emails) for _, emails in extractor.scan_file(path, 4 * 1024 * 1024))
+
+        results = {}
+        for name, run in (("legacy", legacy), ("engine", engine)):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            results[name] = num_emails / elapsed
+            print(f"{name:>7}: {elapsed:.2f}s  {results[name]:,.0f} emails/sec")
+        print(f"speedup: {results['engine'] / results['legacy']:.1f}x")
+        return results
+    finally:
+        os.remove(path)
+
+
+def benchmark_csv(num_rows=2000000, num_cols=20, seed=42):
+    """Compare the legacy per-cell CSV loop against EmailExtractor.extract_frame"""
+    import random
+
+    rng = random.Random(seed)
+    chunk_size = 50000
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([f"col{c}" for c in range(num_cols)])
+            for n in range(num_rows):
+                row = [f"note {rng.randint(0, 10**6)}" for _ in range(num_cols)]
+                row[1] = f"Lead{rng.randint(0, num_rows // 2)}@Example{n % 40}.com"
+                if n % 3 == 0:
+                    row[num_cols - 1] = f"cc: alt{rng.randint(0, num_rows)}@mail.example.org"
+                writer.writerow(row)
+
+        def legacy():
+            extractor = EmailExtractor()
+            found = set()
+            for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str, engine='c'):
+                for col in chunk.columns:
+                    for item in chunk[col].dropna():
+                        if isinstance(item, str):
+                            found |= extractor.extract(item)
+            return found
+
+        def vectorized():
+            extractor = EmailExtractor()
+            found = set()
+            for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str, engine='c'):
+                found |= extractor.extract_frame(chunk)
+            return found
+
+        results = {}
+        for name, run in (("legacy", legacy), ("vectorized", vectorized)):
+            start = time.perf_counter()
+            found = run()
+            elapsed = time.perf_counter() - start
+            results[name] = elapsed
+            print(f"{name:>10}: {elapsed:.2f}s  {num_rows / elapsed:,.0f} rows/sec  {len(found):,} unique")
+        print(f"speedup: {results['legacy'] / results['vectorized']:.1f}x")
+        return results
+    finally:
+        os.remove(path)
+
+
+def benchmark_validation(num_emails=1000000, seed=42):
+    """Compare EmailValidator.validate_many against the legacy pattern full-match
+
+    The list mixes short addresses, valid ones longer than 64 characters and
+    ones past the local-part or total length limits; the batch verdicts are
+    checked against is_valid() address by address before anything is timed.
+    """
+    import random
+
+    rng = random.Random(seed)
+    domains = ["gmail.com", "example.org", "mail.co.uk", "a-very-long-subdomain-name.corp.example.net"]
+    emails = []
+    for n in range(num_emails):
+        kind = n % 10
+        if kind < 6:
+            local = f"user{n}"
+        elif kind < 9:
+            local = f"first.middle.lastname.department{n}"  # with the longer domains, well past 64 characters
+        else:
+            local = "x" * rng.choice((64, 65, 200))  # at and past the local-part limit
+        emails.append(f"{local}@{rng.choice(domains)}")
+
+    validator = EmailValidator()
+    flags = validator.validate_many(emails)
+    mismatched = [email for email, flag in zip(emails, flags) if flag != validator.is_valid(email)]
+    if mismatched:
+        raise AssertionError(f"validate_many disagrees with is_valid on {len(mismatched)} addresses, "
+                             f"e.g. {mismatched[0]}")
+    if not any(flag and len(email) > EmailValidator.MAX_LOCAL for email, flag in zip(emails, flags)):
+        raise AssertionError("no valid address longer than 64 characters was accepted")
+
+    def legacy():
+        regex = re.compile(EMAIL_PATTERN)
+        return sum(regex.fullmatch(email) is not None for email in emails)
+
+    def batch():
+        return sum(EmailValidator().validate_many(emails))
+
+    results = {}
+    for name, run in (("legacy", legacy), ("batch", batch)):
+        start = time.perf_counter()
+        valid = run()
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed
+        print(f"{name:>7}: {elapsed:.2f}s  {num_emails / elapsed:,.0f} emails/sec  {valid:,} valid")
+    print(f"speedup: {results['legacy'] / results['batch']:.1f}x")
+    return results
+
+
+CORPUS_FIRST = ("anna", "ben", "carla", "dmitri", "elif", "farah", "gus", "hana", "ivan", "jun", "kemal")
+CORPUS_LAST = ("smith", "garcia", "nguyen", "okafor", "rossi", "tanaka", "weber", "kowalski", "silva")
+CORPUS_DOMAINS = ("gmail.com", "yahoo.com", "outlook.com", "example.org", "mail.co.uk", "corp.example.net", "web.de")
+CORPUS_NOISE = ("lorem", "ipsum", "contact", "sales", "---", "|", "tel:555-0100", "http://example.com/a?b=c",
+                "ref#8812", "n/a", "see notes", "2024-05-01")
+XLSX_SHEET_ROWS = 1000000  # stay under Excel's 1,048,576-row sheet limit
+
+
+def corpus_address(index):
+    """Deterministic unique address for an index, so duplicates never need a lookup table"""
+    return (f"{CORPUS_FIRST[index % 11]}.{CORPUS_LAST[(index // 11) % 9]}{index}"
+            f"@{CORPUS_DOMAINS[(index * 31) % 7]}")
+
+
+def iter_corpus_rows(size, duplicate_ratio=0.3, invalid_ratio=0.05, noise=3, seed=42, counts=None):
+    """Yield (name, address, note) rows for a synthetic list; a pure function of its arguments
+
+    duplicate_ratio of rows repeat an earlier address, invalid_ratio carry a
+    malformed one the extractor must reject, and noise is the mean number of
+    filler tokens in the note. counts, if given, gets "unique_valid" once the
+    rows run out.
+    """
+    import random
+
+    rng = random.Random(seed)
+    unique = 0
+    for _ in range(size):
+        roll = rng.random()
+        if roll < invalid_ratio:
+            index = rng.randrange(size)
+            local = corpus_address(index).split('@')[0]
+            address = rng.choice((f"{local}@localhost", f"{local}(at)example.com", f"@{CORPUS_DOMAINS[index % 7]}",
+                                  f"{local}.example.com"))
+        elif unique and roll < invalid_ratio + duplicate_ratio:
+            address = corpus_address(rng.randrange(unique))
+        else:
+            address = corpus_address(unique)
+            unique += 1
+        note = " ".join(rng.choice(CORPUS_NOISE) for _ in range(rng.randint(0, 2 * noise)))
+        yield address.split('@')[0].split('.')[0].title(), address, note
+    if counts is not None:
+        counts["unique_valid"] = unique
+
+
+def generate_corpus(directory, sizes=(100000, 1000000, 10000000), formats=("txt", "csv", "xlsx"),
+                    duplicate_ratio=0.3, invalid_ratio=0.05, noise=3, seed=42):
+    """Write txt/csv/xlsx corpora of each size into directory; returns a manifest list
+
+    Files are named after their parameters and reused when already present,
+    so repeated runs benchmark byte-identical inputs.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = []
+    for size in sizes:
+        params = (size, duplicate_ratio, invalid_ratio, noise, seed)
+        stem = f"corpus_{size}_d{duplicate_ratio}_i{invalid_ratio}_n{noise}_s{seed}"
+        for fmt in formats:
+            path = os.path.join(directory, f"{stem}.{fmt}")
+            meta_path = path + ".json"
+            if os.path.exists(path) and os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    entry = json.load(f)
+            else:
+                counts = {}
+                write_corpus(path, fmt, iter_corpus_rows(*params, counts=counts))
+                entry = {"path": path, "format": fmt, "size": size, "unique_valid": counts["unique_valid"],
+                         "duplicate_ratio": duplicate_ratio, "invalid_ratio": invalid_ratio,
+                         "noise": noise, "seed": seed}
+                with open(meta_path, 'w') as f:
+                    json.dump(entry, f)
+            entry["bytes"] = os.path.getsize(path)
+            manifest.append(entry)
+    return manifest
+
+
+def write_corpus(path, fmt, rows):
+    """Write corpus rows as free text, a CSV, a (multi-sheet) write-only xlsx or Parquet"""
+    if fmt == "txt":
+        with open(path, 'w', encoding='utf-8') as f:
+            for name, address, note in rows:
+                f.write(f"{name} <{address}> {note}\n")
+    elif fmt == "csv":
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "email", "notes"])
+            writer.writerows(rows)
+    elif fmt == "xlsx":
+        import openpyxl
+        wb = openpyxl.Workbook(write_only=True)
+        ws = None
+        for n, row in enumerate(rows):
+            if n % XLSX_SHEET_ROWS == 0:
+                ws = wb.create_sheet(f"Sheet{n // XLSX_SHEET_ROWS + 1}")
+                ws.append(["name", "email", "notes"])
+            ws.append(row)
+        wb.save(path)
+    elif fmt == "parquet":
+        pa = load_pyarrow()
+        columns = ("name", "email", "notes")
+        rows = iter(rows)
+        with pa.parquet.ParquetWriter(path, pa.schema([(column, pa.string()) for column in columns])) as writer:
+            for chunk in iter(lambda: list(islice(rows, 100000)), []):
+                writer.write_table(pa.table(dict(zip(columns, map(list, zip(*chunk))))))
+    else:
+        raise ValueError(f"Unknown corpus format: {fmt}")
+
+
+def measure_stage(stage, run, track_memory=True):
+    """Run one pipeline stage; returns (its result, {stage, seconds, peak_mb})
+
+    tracemalloc slows allocation-heavy code several times over, so the stage
+    is timed on a clean run and its peak memory taken from a second one.
+    """
+    import tracemalloc
+
+    gc.collect()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+    return result, {"stage": stage, "seconds": round(elapsed, 4), "peak_mb": peak}
+
+
+def benchmark_suite(output, directory="benchmark_corpus", sizes=(100000, 1000000, 10000000),
+                    formats=("txt", "csv", "xlsx"), track_memory=True, memory_limit=1000000, **corpus):
+    """Time and measure each cleaner stage over a generated corpus; writes the results to output as JSON
+
+    Stages are extract (parse only), load (extract + dedupe into the store,
+    spilling past memory_limit), validate and export. With track_memory each
+    stage runs a second time under tracemalloc for its peak.
+    """
+    import platform
+
+    manifest = generate_corpus(directory, sizes, formats, **corpus)
+    extractor = EmailExtractor()
+    results = []
+    for entry in manifest:
+        path = entry["path"]
+        stages = []
+
+        found, stats = measure_stage("extract", lambda: sum(
+            len(emails) for emails in extractor.iter_file(path, 50000, 4 * 1024 * 1024)), track_memory)
+        stats["items"] = found
+        stages.append(stats)
+
+        dedups = []  # one per load run, so the timed run's spill files outlive the memory run
+        store = None
+        try:
+            def load():
+                dedups.append(ExternalDedup())
+                return ingest_files([path], extractor, EmailStore(extractor.validator), dedups[-1], memory_limit)
+            store, stats = measure_stage("load", load, track_memory)
+            stats["items"] = len(store)
+            stages.append(stats)
+            
+            valid, stats = measure_stage("validate", lambda: sum(extractor.validator.validate_many(list(store))),
+                                         track_memory)
+            stats["items"] = valid
+            stages.append(stats)
+            
+            fd, export_path = tempfile.mkstemp(suffix=".csv")
+            os.close(fd)
+            try:
+                def export():
+                    with open(export_path, 'w', newline='', encoding='utf-8') as f:
+                        return write_emails(store.iter_valid(), f, True)
+                written, stats = measure_stage("export", export, track_memory)
+                stats["items"] = written
+                stages.append(stats)
+            finally:
+                os.remove(export_path)
+        finally:
+            store = None  # let the store go before its spill files do
+            for dedup in dedups:
+                dedup.cleanup()
+            
+        for stats in stages:
+            stats["rate"] = round(entry["size"] / stats["seconds"]) if stats["seconds"] else None
+            print(f"{entry['format']:>4} {entry['size']:>9,} {stats['stage']:>8}: {stats['seconds']:8.2f}s  "
+                  f"{stats['rate'] or 0:>12,} rows/sec  peak {stats['peak_mb'] or 0:8.1f} MB")
+        results.append({**entry, "correct": valid == entry["unique_valid"], "stages": stages})
+
+    report = {
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "track_memory": track_memory,
+        "memory_limit": memory_limit,
+        "results": results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+    return report
+
+
+def compare_benchmarks(old_path, new_path):
+    """Print per-stage speed and memory ratios between two benchmark_suite reports"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    baseline = {(r["format"], r["size"], s["stage"]): s for r in old["results"] for s in r["stages"]}
+    for result in new["results"]:
+        for stage in result["stages"]:
+            before = baseline.get((result["format"], result["size"], stage["stage"]))
+            if before is None:
+                continue
+            speedup = before["seconds"] / stage["seconds"] if stage["seconds"] else float('inf')
+            memory = ""
+            if before["peak_mb"] and stage["peak_mb"]:
+                memory = f"  memory {stage['peak_mb'] / before['peak_mb']:.2f}x"
+            print(f"{result['format']:>4} {result['size']:>9,} {stage['stage']:>8}: "
+                  f"{before['seconds']:.2f}s -> {stage['seconds']:.2f}s  ({speedup:.2f}x faster){memory}")
+
+
+def expand_inputs(patterns):
+    """Expand shell-style globs; '-' stands for stdin and is passed through"""
+    paths = []
+    for pattern in patterns:
+        if pattern == '-':
+            paths.append(pattern)
+            continue
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            print(f"warning: no files match {pattern}", file=sys.stderr)
+        paths.extend(path for path in matches if os.path.isfile(path))
+    return paths
+
+
+def ingest_files(files, extractor, store, dedup, memory_limit, workers=1, chunk_rows=50000,
+                 chunk_bytes=4 * 1024 * 1024, split_size=64 * 1024 * 1024, stream=None,
+                 watcher=None, interval=5.0, duration=0, progress=None):
+    """Load files, and an optional binary stream such as stdin, into store
+
+    Past memory_limit unique addresses an in-memory store is spilled as a
+    sorted run; the runs are merged at the end. Returns the final store.
+    With a FolderWatcher, its reads are then loaded every interval seconds
+    until duration seconds have passed (0: until Ctrl-C), and progress, if
+    given, is called with the store after each poll that read anything.
+    Unterminated last lines are only read once watching stops.
+    """
+    def add(emails, path):
+        store.add_many(emails, store.intern_path(path))
+        if isinstance(store, EmailStore) and len(store) >= memory_limit:
+            dedup.spill(store)
+            
+    if stream is not None:
+        for emails in extractor.scan_stream(stream, chunk_bytes):
+            add(emails, "<stdin>")
+            
+    if workers > 1 and files:
+        pending = [(i, path, None, 0) for i, path in enumerate(files)]
+        tasks = plan_ingest_tasks(pending, extractor, chunk_rows, chunk_bytes, split_size)
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            futures = {executor.submit(ingest_shard, task): task for task in tasks}
+            for future in as_completed(futures):
+                filepath = futures[future][1]
+                try:
+                    _, shard, _ = future.result()
+                except Exception as e:
+                    print(f"error: {filepath}: {e}", file=sys.stderr)
+                    continue
+                add(shard, filepath)
+    else:
+        for filepath in files:
+            try:
+                for emails in extractor.iter_file(filepath, chunk_rows, chunk_bytes):
+                    add(emails, filepath)
+            except Exception as e:
+                print(f"error: {filepath}: {e}", file=sys.stderr)
+                
+    def load_reads(reads):
+        for filepath, start, end, replace in reads:
+            if replace and filepath in store.paths:
+                # Spilled runs hold the file's older addresses too
+                if dedup.runs:
+                    dedup.remove_source(store.path_ids[filepath])
+                store.remove_source(filepath)
+            try:
+                batches = (extractor.iter_file(filepath, chunk_rows, chunk_bytes) if end is None else
+                           extractor.iter_appended(filepath, chunk_rows, chunk_bytes, start, end))
+                for emails in batches:
+                    add(emails, filepath)
+            except Exception as e:
+                print(f"error: {filepath}: {e}", file=sys.stderr)
+                continue
+            fingerprint = watcher.fingerprint(filepath)
+            if fingerprint is not None:
+                store.set_fingerprint(filepath, fingerprint)
+
+    if watcher is not None:
+        started = time.monotonic()
+        try:
+            while True:
+                reads = watcher.poll()
+                load_reads(reads)
+                if reads and progress:
+                    progress(store)
+                if duration and time.monotonic() - started + interval > duration:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        load_reads(watcher.tails())
+            
+    if dedup.runs:
+        store = dedup.merge(store)
+    return store
+
+
+def fix_domain_typos(store, args):
+    """Apply every suggested domain typo fix within --fix-distance edits, reporting each on stderr"""
+    if isinstance(store, SpilledEmailList):
+        print("warning: list spilled to disk, domain fixes skipped (raise --memory-limit or use --store)",
+              file=sys.stderr)
+        return
+    corrector = DomainCorrector.from_file(args.known_domains) if args.known_domains else DomainCorrector()
+    for domain, count in sorted(store.domain_counts().items(), key=itemgetter(1), reverse=True):
+        target = corrector.suggest(domain, args.fix_distance)
+        if target:
+            moved = correct_domain(store, domain, target)
+            if not args.quiet:
+                print(f"corrected {moved} emails from {domain} to {target}", file=sys.stderr)
+
+
+def load_suppression(args, extractor, canonicalizer):
+    """The --suppress lists as a SuppressionList, reusing --suppression-cache while they are unchanged
+
+    Without a cache the table is built in a temporary file, which the
+    caller removes when done.
+    """
+    sources = expand_inputs(args.suppress)
+    path = args.suppression_cache
+    if path and os.path.exists(path):
+        try:
+            suppression = SuppressionList(path, canonicalizer)
+        except ValueError as e:
+            print(f"warning: {e}, rebuilding", file=sys.stderr)
+        else:
+            if sorted(suppression.sources) == sorted(sources) and not suppression.stale(canonicalizer):
+                return suppression
+            suppression.close()
+    if not path:
+        fd, path = tempfile.mkstemp(suffix=".sup", dir=args.spill_dir)
+        os.close(fd)
+    return SuppressionList.build(sources, path, extractor, canonicalizer, args.suppression_bloom_bits,
+                                 None if args.quiet else lambda message: print(message, file=sys.stderr),
+                                 args.chunk_rows, args.chunk_bytes)
+
+
+def run_cleaner(args):
+    """Headless load -> validate -> dedupe -> export, the same pipeline as the Cleaner tab"""
+    started = time.perf_counter()
+    extractor = EmailExtractor(EMAIL_PATTERN, args.scan_all_columns,
+                               [name.strip() for name in args.email_columns.split(',') if name.strip()])
+    canonicalizer = None
+    if not args.exact_dedup:
+        canonicalizer = (AddressCanonicalizer.from_csv(args.canonical_rules) if args.canonical_rules
+                         else AddressCanonicalizer())
+    store = (SQLiteEmailStore(args.store, extractor.validator, canonicalizer) if args.store
+             else EmailStore(extractor.validator, canonicalizer=canonicalizer))
+    dedup = ExternalDedup(args.spill_dir)
+    groups = {}
+    for spec in args.group:
+        name, _, pattern = spec.partition('=')
+        groups.setdefault(name.strip(), []).extend(expand_inputs([pattern]))
+    paths = expand_inputs(args.inputs or ([] if groups or args.watch else ['-']))
+    paths += [path for group in groups.values() for path in group if path not in paths]
+    files = [path for path in paths if path != '-']
+    if args.select:
+        try:
+            compile_group_expression(args.select, groups, files)
+        except ValueError as e:
+            print(f"error: --select: {e}", file=sys.stderr)
+            return 2
+    suppression = load_suppression(args, extractor, canonicalizer) if args.suppress else None
+    counters = {"suppressed": 0}
+    watcher = None
+    if args.watch:
+        # Inputs, and files a persistent store has already loaded, are only read on from where they end
+        known = dict(store.fingerprints)
+        known.update((path, file_fingerprint(path)) for path in files)
+        watcher = FolderWatcher(args.watch, args.watch_pattern or ("*",), args.watch_recursive, known)
+
+    def report_watch(store):
+        if not args.quiet:
+            # Spilled rows are only deduplicated against each other at the final merge
+            spilled = f" (+{dedup.rows} spilled)" if dedup.runs else ""
+            print(f"{datetime.now():%H:%M:%S} watch: {store.total_count + dedup.total_count} emails found, "
+                  f"{len(store)} unique{spilled}, {store.valid_count + dedup.valid_count} valid", file=sys.stderr)
+    
+    try:
+        store = ingest_files(files, extractor, store, dedup, args.memory_limit, args.workers, args.chunk_rows,
+                             args.chunk_bytes, args.split_size, sys.stdin.buffer if '-' in paths else None,
+                             watcher, args.watch_interval, args.watch_for, report_watch)
+            
+        if args.fix_domains:
+            fix_domain_typos(store, args)
+            
+        domain = args.domain.strip().lower() if args.domain else None
+        if domain and canonicalizer:
+            domain = canonicalizer(f"x@{domain}").rpartition('@')[2]
+        if args.select:
+            records = select_groups(store, args.select, groups)
+        else:
+            records = store.iter_source_bits(valid_only=True, domain=domain)
+        if suppression is not None:
+            records = suppression.filter(records, counters, key=itemgetter(0))
+        written, _ = export_records(records, args.output or '-', store.paths, args.columns, args.shards,
+                                    args.shard_by, None if args.format is None else args.format == 'csv',
+                                    args.compress, args.chunk_rows)
+        sys.stdout.flush()
+            
+        if not args.quiet:
+            print(f"{len(files) + ('-' in paths)} inputs, {store.total_count} emails found, "
+                  f"{len(store)} unique, {written} valid written in {time.perf_counter() - started:.1f}s"
+                  + (f", {counters['suppressed']} suppressed" if suppression is not None else ""),
+                  file=sys.stderr)
+            for name, count in store.top_domains(args.top_domains):
+                print(f"{count:>12,}  {name}", file=sys.stderr)
+    finally:
+        if isinstance(store, SQLiteEmailStore):
+            store.close()
+        if suppression is not None:
+            suppression.close()
+            if not args.suppression_cache:
+                os.remove(suppression.path)
+        dedup.cleanup()
+    return 0
+
+
+def main(argv=None):
+    """Run the GUI, or the headless cleaner when inputs or options are given or stdin is piped"""
+    parser = argparse.ArgumentParser(description="Quantum Email Suite. With no arguments and stdin on a terminal "
+                                                 "the GUI starts; otherwise the cleaner runs headless.")
+    parser.add_argument("inputs", nargs="*", help="files or globs to clean; '-' (or none) reads stdin")
+    parser.add_argument("-o", "--output", help="write the clean list here instead of stdout; "
+                                               ".parquet/.arrow paths are written columnar")
+    parser.add_argument("--format", choices=("txt", "csv"), help="output format (default: from --output, else txt)")
+    parser.add_argument("--compress", choices=("gzip", "zstd"), help="compress the output (default: from a .gz/.zst suffix)")
+    parser.add_argument("--columns", default="email", help=f"comma-separated output columns from {','.join(EXPORT_COLUMNS)}")
+    parser.add_argument("--shards", type=int, default=1, help="split the output into this many files")
+    parser.add_argument("--shard-by", choices=("count", "domain"), default="count",
+                        help="deal chunks round-robin, or keep each domain on one shard")
+    parser.add_argument("--workers", type=int, default=1, help="process-pool workers for file inputs")
+    parser.add_argument("--scan-all-columns", action="store_true", help="scan every CSV/Excel column, not just email-like ones")
+    parser.add_argument("--email-columns", default="", help="comma-separated columns to always scan")
+    parser.add_argument("--memory-limit", type=int, default=1000000, help="unique emails held in memory before spilling to disk")
+    parser.add_argument("--spill-dir", help="directory for spill files (default: system temp)")
+    parser.add_argument("--store", help="use a persistent SQLite store at this path")
+    parser.add_argument("--exact-dedup", action="store_true", help="dedupe on exact addresses, not mailbox keys")
+    parser.add_argument("--canonical-rules", help="CSV of domain,alias_of,strip_dots,tag_separator rules")
+    parser.add_argument("--domain", help="write only the valid addresses on this domain")
+    parser.add_argument("--group", action="append", default=[], metavar="NAME=GLOB",
+                        help="name a group of input files for --select; repeatable, files are loaded too")
+    parser.add_argument("--select", metavar="EXPR",
+                        help="write only the addresses matching a group expression, e.g. 'a - b', 'a & b', 'a | b'")
+    parser.add_argument("--fix-domains", action="store_true", help="correct domains that look like typos of known ones")
+    parser.add_argument("--known-domains", help="known-good domains for --fix-domains, one per line")
+    parser.add_argument("--fix-distance", type=int, choices=(1, 2), default=1,
+                        help="most edits --fix-domains applies unasked; 2 also fixes double typos (default: 1)")
+    parser.add_argument("--suppress", action="append", default=[], metavar="FILE",
+                        help="unsubscribe/bounce list (or glob) whose addresses are left out; repeatable")
+    parser.add_argument("--suppression-cache", help="keep the hashed suppression table here and reuse it "
+                                                    "while the lists are unchanged")
+    parser.add_argument("--suppression-bloom-bits", type=int, default=16,
+                        help="Bloom filter bits per suppressed address (0 for none)")
+    parser.add_argument("--watch", action="append", default=[], metavar="DIR",
+                        help="after the inputs, keep loading new and grown files from this directory "
+                             "until Ctrl-C, then write the output; repeatable")
+    parser.add_argument("--watch-pattern", action="append", default=[], metavar="GLOB",
+                        help="only watch file names matching this pattern; repeatable (default: all)")
+    parser.add_argument("--watch-recursive", action="store_true", help="also watch subdirectories")
+    parser.add_argument("--watch-interval", type=float, default=5.0, help="seconds between directory polls")
+    parser.add_argument("--watch-for", type=float, default=0, metavar="SECONDS",
+                        help="stop watching after this long instead of at Ctrl-C")
+    parser.add_argument("--top-domains", type=int, default=0, metavar="N", help="list the N largest domains on stderr")
+    parser.add_argument("--chunk-rows", type=int, default=50000, help="rows per CSV/Excel batch")
+    parser.add_argument("--chunk-bytes", type=int, default=4 * 1024 * 1024, help="bytes per text scan window")
+    parser.add_argument("--split-size", type=int, default=64 * 1024 * 1024, help="text files above this are split across workers")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no summary on stderr")
+    parser.add_argument("--benchmark-extract", action="store_true", help="run the extraction benchmark and exit")
+    parser.add_argument("--benchmark-csv", action="store_true", help="run the CSV extraction benchmark and exit")
+    parser.add_argument("--benchmark-validate", action="store_true",
+                        help="check and time batch validation, long addresses included, and exit")
+    parser.add_argument("--benchmark-suite", metavar="REPORT.json", help="run the per-stage benchmark suite and exit")
+    parser.add_argument("--benchmark-sizes", default="100000,1000000,10000000", help="corpus sizes for the suite")
+    parser.add_argument("--benchmark-formats", default="txt,csv,xlsx", help="corpus formats for the suite (txt, csv, xlsx, parquet)")
+    parser.add_argument("--corpus-dir", default="benchmark_corpus", help="where generated corpora are kept")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="time the suite without memory tracking")
+    parser.add_argument("--benchmark-compare", nargs=2, metavar=("OLD", "NEW"), help="compare two suite reports")
+    
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv and sys.stdin is not None and sys.stdin.isatty():
+        if tk is None:
+            parser.error("the GUI needs Tk; pass inputs or pipe stdin to run the cleaner headless")
+        root = tk.Tk()
+        app = QuantumEmailSuite(root)
+        root.protocol("WM_DELETE_WINDOW", app.on_closing)
+        root.mainloop()
+        return 0
+
+    args = parser.parse_args(argv)
+    if any(not GROUP_NAME.fullmatch(spec.partition('=')[0].strip()) or '=' not in spec for spec in args.group):
+        parser.error("--group takes NAME=GLOB with a name of letters, digits and underscores")
+    if args.select and args.domain:
+        parser.error("--select and --domain cannot be combined")
+    if any(not os.path.isdir(directory) for directory in args.watch):
+        parser.error("--watch takes an existing directory")
+    if args.watch_interval <= 0 or args.watch_for < 0:
+        parser.error("--watch-interval must be positive and --watch-for not negative")
+    args.columns = [column.strip() for column in args.columns.split(',') if column.strip()]
+    if "email" not in args.columns or set(args.columns) - set(EXPORT_COLUMNS):
+        parser.error(f"--columns must include email and come from {','.join(EXPORT_COLUMNS)}")
+    if args.shards < 1 or (args.shards > 1 and args.output in (None, '-')):
+        parser.error("--shards takes a count of at least 1, and more than 1 needs --output")
+    columnar = (args.output or "").lower().endswith(COLUMNAR_SUFFIXES)
+    if columnar:
+        try:
+            load_pyarrow()
+        except RuntimeError as e:
+            parser.error(str(e))
+        if args.compress == "gzip" and not args.output.lower().endswith('.parquet'):
+            parser.error("Arrow IPC output supports zstd compression only")
+    elif "zstd" in (args.compress, EXPORT_COMPRESSION.get(split_compression(args.output or "")[1].lower())):
+        if importlib.util.find_spec("zstandard") is None:
+            parser.error("zstd output needs the zstandard package (pip install zstandard)")
+    if args.benchmark_extract:
+        benchmark_extraction()
+        return 0
+    if args.benchmark_csv:
+        benchmark_csv()
+        return 0
+    if args.benchmark_validate:
+        benchmark_validation()
+        return 0
+    if args.benchmark_suite:
+        benchmark_suite(args.benchmark_suite, args.corpus_dir,
+                        [int(size) for size in args.benchmark_sizes.split(',')],
+                        [fmt.strip() for fmt in args.benchmark_formats.split(',')],
+                        track_memory=not args.no_tracemalloc, memory_limit=args.memory_limit)
+        return 0
+    if args.benchmark_compare:
+        compare_benchmarks(*args.benchmark_compare)
+        return 0
+    return run_cleaner(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())